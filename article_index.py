@@ -0,0 +1,203 @@
+# ============================================================
+# article_index.py — Haber İndeksi (Artımlı İşleme)
+# ============================================================
+# Bu modül:
+# 1) Daha önce skorlanmış haberleri SQLite'ta saklar (URL hash → sonuç)
+# 2) Yeni gelen haberlerden sadece görülmemiş olanları ayırır
+# 3) Sektör skorlarını zamanla sönümlenen (decay) toplamlar olarak tutar
+# 4) Eski kayıtları budar, indeks sınırlı boyutta kalır
+# ============================================================
+
+import sqlite3
+import hashlib
+import json
+import time
+from datetime import datetime, timezone
+from typing import List, Dict
+import config
+from sentiment_aggregator import SectorSentimentAggregator
+
+
+def url_hash(article: dict) -> str:
+    """Haber için kalıcı anahtar: normalize URL'nin SHA1 özeti."""
+    url = (article.get("url") or "").strip().rstrip("/").lower()
+    if not url:
+        url = "title:" + (article.get("title") or "").strip().lower()
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+
+def parse_published_at(value: str) -> float:
+    """NewsAPI 'publishedAt' alanını unix zamanına çevirir (yoksa şimdi)."""
+    if value:
+        try:
+            dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+            if dt.tzinfo is None:
+                dt = dt.replace(tzinfo=timezone.utc)
+            return dt.timestamp()
+        except ValueError:
+            pass
+    return time.time()
+
+
+class ArticleIndex:
+    """
+    Skorlanmış haberlerin kalıcı indeksi.
+    Sektör skorları SectorSentimentAggregator durumu olarak
+    sector_aggregates tablosunda saklanır ve her yeni haberde O(1) güncellenir.
+    """
+
+    def __init__(self, db_path: str = None, half_life_hours: float = None):
+        self.db_path = db_path or config.NEWS_INDEX_DB
+        self.half_life_hours = half_life_hours or config.NEWS_DECAY_HALF_LIFE_HOURS
+        self.init_database()
+
+    def init_database(self):
+        """Veritabanı tablolarını oluştur."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        # Skorlanmış haberler
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS articles (
+                url_hash TEXT PRIMARY KEY,
+                url TEXT,
+                title TEXT,
+                source TEXT,
+                published_at TEXT,
+                published_ts REAL NOT NULL,
+                score REAL NOT NULL,
+                label TEXT,
+                sectors TEXT,
+                indexed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_articles_published
+            ON articles (published_ts)
+        """)
+
+        # Sektörel sönümlü toplamlar (anchor_ts anındaki değerler)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS sector_aggregates (
+                sector TEXT PRIMARY KEY,
+                weighted_sum REAL NOT NULL,
+                weight_total REAL NOT NULL,
+                article_count INTEGER NOT NULL,
+                anchor_ts REAL NOT NULL
+            )
+        """)
+
+        conn.commit()
+        conn.close()
+
+    def lookup(self, hashes: List[str]) -> Dict[str, Dict]:
+        """Verilen hash'lerden indekste olanların kayıtlarını döndürür."""
+        found = {}
+        if not hashes:
+            return found
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        # SQLite parametre limitine takılmamak için parça parça sorgula
+        for i in range(0, len(hashes), 500):
+            chunk = hashes[i:i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            cursor.execute(f"""
+                SELECT url_hash, title, source, url, published_at, score, label, sectors
+                FROM articles
+                WHERE url_hash IN ({placeholders})
+            """, chunk)
+
+            for row in cursor.fetchall():
+                found[row[0]] = {
+                    "title": row[1],
+                    "source": row[2],
+                    "url": row[3],
+                    "published_at": row[4],
+                    "sentiment": {"score": row[5], "label": row[6]},
+                    "sectors": json.loads(row[7]) if row[7] else ["genel"],
+                }
+
+        conn.close()
+        return found
+
+    def load_aggregator(self) -> SectorSentimentAggregator:
+        """Saklanan sektör toplamlarından bir toplayıcı oluşturur."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT sector, weighted_sum, weight_total, article_count, anchor_ts
+            FROM sector_aggregates
+        """)
+        rows = cursor.fetchall()
+        conn.close()
+
+        aggregator = SectorSentimentAggregator(half_life_hours=self.half_life_hours)
+        aggregator.load_rows(rows)
+        return aggregator
+
+    def add(self, records: List[Dict]):
+        """
+        Yeni skorlanmış haberleri indekse ekler ve sektör toplamlarını günceller.
+        records: [{"url_hash", "title", "source", "url", "published_at",
+                   "sentiment": {"score", "label"}, "sectors": [...]}, ...]
+        """
+        if not records:
+            return
+
+        aggregator = self.load_aggregator()
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        for rec in records:
+            published_ts = parse_published_at(rec.get("published_at"))
+            score = rec["sentiment"]["score"]
+
+            cursor.execute("""
+                INSERT OR IGNORE INTO articles (
+                    url_hash, url, title, source, published_at,
+                    published_ts, score, label, sectors
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                rec["url_hash"],
+                rec.get("url", ""),
+                rec.get("title", ""),
+                rec.get("source", ""),
+                rec.get("published_at", ""),
+                published_ts,
+                score,
+                rec["sentiment"].get("label"),
+                json.dumps(rec.get("sectors", []), ensure_ascii=False)
+            ))
+
+            if cursor.rowcount == 0:
+                continue  # Zaten indekste
+
+            aggregator.add(score, rec.get("sectors", []), published_ts,
+                           source=rec.get("source"))
+
+        cursor.executemany("""
+            INSERT OR REPLACE INTO sector_aggregates (
+                sector, weighted_sum, weight_total, article_count, anchor_ts
+            ) VALUES (?, ?, ?, ?, ?)
+        """, aggregator.to_rows())
+
+        conn.commit()
+        conn.close()
+
+    def sector_scores(self, at_ts: float = None) -> Dict[str, float]:
+        """Sektörlerin at_ts anındaki sönümlü, kaynak ağırlıklı ortalama skorları."""
+        return self.load_aggregator().scores(at_ts)
+
+    def prune(self, retention_days: int = None):
+        """Saklama süresini aşan haber kayıtlarını siler."""
+        retention_days = retention_days or config.NEWS_INDEX_RETENTION_DAYS
+        cutoff = time.time() - retention_days * 86400
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM articles WHERE published_ts < ?", (cutoff,))
+        conn.commit()
+        conn.close()
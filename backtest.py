@@ -7,29 +7,39 @@
 # Kullanım:
 #   python backtest.py --start 2024-01-01 --end 2025-01-01
 #   python backtest.py --days 90
+#   python backtest.py --days 90 --news-archive news_archive
+#   python backtest.py --walk-forward --start 2020-01-01 --end 2025-01-01
+#   python backtest.py --portfolio --start 2015-01-01 --end 2025-01-01
 # ============================================================
 
 import argparse
 from datetime import datetime, timedelta
-import yfinance as yf
-import pandas as pd
 import sys
 import os
 
 # Module imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 import config
-from technical_analyzer import download_stock_data, score_technical
+from technical_analyzer import download_stock_data, score_technical_batch
 from scorer import calculate_final_score
+from news_archive import NewsArchive
+from price_cache import load_prices, prefetch
 
 
-def backtest_single_day(test_date: str, tickers: list) -> dict:
+def backtest_single_day(test_date: str, tickers: list,
+                        news_archive: NewsArchive = None) -> dict:
     """
     Tek bir gün için backtest yap.
     O günkü sinyallere göre öneri üretir, 7 gün sonraki performansı hesaplar.
+    news_archive verilirse o tarih itibarıyla sektör skorları arşivden alınır
+    ve nihai skor calculate_final_score formülüyle hesaplanır.
     """
     
     print(f"\n📅 Test Tarihi: {test_date}")
+
+    sector_scores = None
+    if news_archive is not None:
+        sector_scores = news_archive.sector_scores_asof(test_date)
     
     # O tarihteki analizi yap (200 gün öncesinden itibaren veri al)
     start = datetime.strptime(test_date, "%Y-%m-%d") - timedelta(days=200)
@@ -37,33 +47,33 @@ def backtest_single_day(test_date: str, tickers: list) -> dict:
     
     recommendations = []
     
+    # Veriyi çek (run_backtest tüm aralığı önceden cache'ler)
+    frames = {}
     for ticker in tickers:
         try:
-            # Veriyi çek
-            df = yf.download(
-                ticker,
-                start=start.strftime("%Y-%m-%d"),
-                end=end.strftime("%Y-%m-%d"),
-                progress=False,
-                auto_adjust=True
-            )
-            
-            if df.empty or len(df) < 60:
-                continue
-            
-            # Column flatten
-            if isinstance(df.columns, pd.MultiIndex):
-                df.columns = df.columns.get_level_values(0)
-            
-            # Teknik analiz
-            analysis = score_technical(df)
-            
+            df = load_prices(ticker, start, end)
+        except Exception as e:
+            continue
+        if not df.empty and len(df) >= 60:
+            frames[ticker] = df
+    
+    # Teknik analiz (tüm hisseler tek seferde)
+    analyses = score_technical_batch(list(frames.values()))
+    
+    for ticker, analysis in zip(frames, analyses):
+        try:
             if analysis["score"] == 0:
                 continue
             
-            # Skor hesapla (haber analizi olmadan, sadece teknik)
-            # Basitleştirilmiş skor: teknik * 0.7 + momentum * 0.3
-            final_score = analysis["score"] * 0.7 + 50 * 0.3
+            if sector_scores is not None:
+                # Arşivden gelen haber skorlarıyla tam formül
+                final_score = calculate_final_score(
+                    ticker, analysis["score"], sector_scores
+                )["final_score"]
+            else:
+                # Skor hesapla (haber analizi olmadan, sadece teknik)
+                # Basitleştirilmiş skor: teknik * 0.7 + momentum * 0.3
+                final_score = analysis["score"] * 0.7 + 50 * 0.3
             
             if final_score >= 55:  # Alım sinyali threshold
                 recommendations.append({
@@ -97,20 +107,11 @@ def backtest_single_day(test_date: str, tickers: list) -> dict:
         future_end = future_start + timedelta(days=10)  # 7 iş günü için 10 takvim günü
         
         try:
-            future_df = yf.download(
-                ticker,
-                start=future_start.strftime("%Y-%m-%d"),
-                end=future_end.strftime("%Y-%m-%d"),
-                progress=False,
-                auto_adjust=True
-            )
+            future_df = load_prices(ticker, future_start, future_end)
             
             if future_df.empty or len(future_df) < 5:
                 continue
             
-            if isinstance(future_df.columns, pd.MultiIndex):
-                future_df.columns = future_df.columns.get_level_values(0)
-            
             # 7. günün (veya mevcut son günün) fiyatı
             exit_price = float(future_df["Close"].iloc[min(6, len(future_df)-1)])
             
@@ -127,6 +128,7 @@ def backtest_single_day(test_date: str, tickers: list) -> dict:
             
             results.append({
                 "ticker": ticker,
+                "date": test_date,
                 "entry": entry,
                 "exit": exit_price,
                 "return": return_pct,
@@ -144,17 +146,24 @@ def backtest_single_day(test_date: str, tickers: list) -> dict:
     return results
 
 
-def run_backtest(start_date: str, end_date: str, tickers: list = None) -> dict:
+def run_backtest(start_date: str, end_date: str, tickers: list = None,
+                 news_archive: NewsArchive = None, bootstrap: int = None) -> dict:
     """
     Belirli bir tarih aralığında backtest yap.
+    bootstrap: güven aralığı örneklem sayısı (None → config, 0 → kapalı)
     """
     if tickers is None:
         tickers = config.ALL_STOCKS
+
+    if news_archive is not None and not news_archive.available():
+        print(f"  ⚠️  Haber arşivi bulunamadı ({news_archive.root}), sadece teknik skor kullanılacak")
+        news_archive = None
     
     print("\n" + "=" * 70)
     print(f"  🔬 BACKTEST BAŞLATILIYOR")
     print(f"  📅 Tarih Aralığı: {start_date} → {end_date}")
     print(f"  📊 Hisse Sayısı: {len(tickers)}")
+    print(f"  📰 Haber Arşivi: {news_archive.root if news_archive else 'Yok (nötr 50)'}")
     print("=" * 70)
     
     # Tarih listesi oluştur (hafta içi günler)
@@ -170,6 +179,11 @@ def run_backtest(start_date: str, end_date: str, tickers: list = None) -> dict:
             test_dates.append(current.strftime("%Y-%m-%d"))
         current += timedelta(days=1)
     
+    # Tüm tarih aralığını hisse başına tek indirmeyle cache'le;
+    # günlük döngü sonra sadece memory-mapped cache'ten okur
+    print(f"\n  💾 Fiyat verisi önbelleğe alınıyor ({len(tickers)} hisse)...")
+    prefetch(tickers, start - timedelta(days=200), end + timedelta(days=11))
+
     print(f"\n  🗓️  Test edilecek gün sayısı: {len(test_dates)}")
     print(f"  ⏱️  Tahmini süre: {len(test_dates) * 2} dakika")
     print("\n" + "-" * 70)
@@ -179,7 +193,7 @@ def run_backtest(start_date: str, end_date: str, tickers: list = None) -> dict:
     for i, test_date in enumerate(test_dates, 1):
         print(f"\n[{i}/{len(test_dates)}]", end=" ")
         
-        results = backtest_single_day(test_date, tickers)
+        results = backtest_single_day(test_date, tickers, news_archive)
         all_results.extend(results)
     
     # Sonuçları analiz et
@@ -229,6 +243,13 @@ def run_backtest(start_date: str, end_date: str, tickers: list = None) -> dict:
     if abs(avg_loss_return) > 0:
         rr_ratio = abs(avg_success_return / avg_loss_return)
         print(f"     Risk/Reward Ratio  : {rr_ratio:.2f}")
+
+    # Günde ~3 seçimle başarı oranı çok gürültülü → güven aralığı
+    confidence = {}
+    if bootstrap != 0:
+        from bootstrap import bootstrap_trades, print_confidence
+        confidence = bootstrap_trades(all_results, n_resamples=bootstrap)
+        print_confidence(confidence)
     
     # En iyi ve en kötü performanslar
     best = max(all_results, key=lambda x: x["return"])
@@ -264,12 +285,12 @@ def run_backtest(start_date: str, end_date: str, tickers: list = None) -> dict:
     )
     
     for ticker, stats in sorted_tickers[:10]:
-        total = stats["total"]
-        success = stats["success"]
-        success_rate = (success / total * 100) if total > 0 else 0
+        t_total = stats["total"]
+        t_success = stats["success"]
+        success_rate = (t_success / t_total * 100) if t_total > 0 else 0
         avg_ret = sum(stats["returns"]) / len(stats["returns"]) if stats["returns"] else 0
         
-        print(f"     {ticker:<12} {total:<8} {success_rate:>6.1f}%     {avg_ret:>+7.2f}%")
+        print(f"     {ticker:<12} {t_total:<8} {success_rate:>6.1f}%     {avg_ret:>+7.2f}%")
     
     print("\n" + "=" * 70)
     
@@ -280,6 +301,7 @@ def run_backtest(start_date: str, end_date: str, tickers: list = None) -> dict:
         "loss": loss,
         "win_rate": win_rate,
         "avg_return": avg_return,
+        "confidence": confidence,
         "all_results": all_results
     }
 
@@ -290,6 +312,40 @@ def main():
     parser.add_argument("--end", type=str, help="Bitiş tarihi (YYYY-MM-DD)")
     parser.add_argument("--days", type=int, help="Bugünden geriye kaç gün test edilsin")
     parser.add_argument("--tickers", type=str, nargs="+", help="Test edilecek hisseler (boş ise tümü)")
+    parser.add_argument("--news-archive", type=str, nargs="?", const=config.NEWS_ARCHIVE_DIR,
+                        help="Offline haber arşivi dizini (news_archive.py ile oluşturulur)")
+    parser.add_argument("--walk-forward", action="store_true",
+                        help="Kayan eğitim/test pencereleriyle parametre optimizasyonu")
+    parser.add_argument("--train-days", type=int, default=None,
+                        help=f"Walk-forward eğitim penceresi, işlem günü (varsayılan: {config.WALK_FORWARD_TRAIN_DAYS})")
+    parser.add_argument("--test-days", type=int, default=None,
+                        help=f"Walk-forward test penceresi, işlem günü (varsayılan: {config.WALK_FORWARD_TEST_DAYS})")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Paralel pencere işçisi sayısı (varsayılan: CPU sayısı)")
+    parser.add_argument("--portfolio", action="store_true",
+                        help="Sermaye, komisyon ve pozisyon limitli portföy simülasyonu")
+    parser.add_argument("--capital", type=float, default=None,
+                        help=f"Portföy başlangıç sermayesi (varsayılan: {config.PORTFOLIO_INITIAL_CAPITAL:,.0f})")
+    parser.add_argument("--max-positions", type=int, default=None,
+                        help=f"Eş zamanlı en fazla pozisyon (varsayılan: {config.PORTFOLIO_MAX_POSITIONS})")
+    parser.add_argument("--commission", type=float, default=None,
+                        help=f"İşlem başına komisyon, yüzde (varsayılan: {config.PORTFOLIO_COMMISSION_PCT})")
+    parser.add_argument("--slippage", type=float, default=None,
+                        help=f"İşlem başına kayma, yüzde (varsayılan: {config.PORTFOLIO_SLIPPAGE_PCT})")
+    parser.add_argument("--holding-days", type=int, default=None,
+                        help=f"En uzun tutma süresi, işlem günü (varsayılan: {config.PORTFOLIO_HOLDING_DAYS})")
+    parser.add_argument("--entry", choices=["next_open", "close"], default=None,
+                        help=f"Giriş fiyatı (varsayılan: {config.PORTFOLIO_ENTRY})")
+    parser.add_argument("--no-level-exits", action="store_true",
+                        help="Fibonacci destek/direnç çıkışlarını kapat (sadece süre)")
+    parser.add_argument("--stop-loss", type=float, default=None,
+                        help="Sabit stop, girişten yüzde aşağı")
+    parser.add_argument("--take-profit", type=float, default=None,
+                        help="Sabit kâr al, girişten yüzde yukarı")
+    parser.add_argument("--bootstrap", type=int, default=None,
+                        help=f"Güven aralığı için bootstrap örneklem sayısı, 0 = kapalı (varsayılan: {config.BOOTSTRAP_RESAMPLES})")
+    parser.add_argument("--output", type=str, default=None,
+                        help="Walk-forward / portföy sonucunu JSON olarak kaydet")
     
     args = parser.parse_args()
     
@@ -313,7 +369,29 @@ def main():
     tickers = args.tickers if args.tickers else config.ALL_STOCKS
     
     # Backtest çalıştır
-    results = run_backtest(start_str, end_str, tickers)
+    news_archive = NewsArchive(args.news_archive) if args.news_archive else None
+    if args.walk_forward:
+        from walk_forward import run_walk_forward
+        try:
+            run_walk_forward(start_str, end_str, tickers, news_archive,
+                             train_days=args.train_days, test_days=args.test_days,
+                             workers=args.workers, output=args.output, bootstrap=args.bootstrap)
+        except ValueError as e:
+            # Örn. varsayılan 30 günlük aralık eğitim penceresinden kısa
+            print(f"\n❌ {e}")
+            print("   Daha uzun bir aralık (--start/--end, --days) veya daha kısa --train-days verin")
+            sys.exit(1)
+    elif args.portfolio:
+        from portfolio_backtest import run_portfolio_backtest
+        run_portfolio_backtest(start_str, end_str, tickers, news_archive, output=args.output,
+                               capital=args.capital, max_positions=args.max_positions,
+                               commission_pct=args.commission, slippage_pct=args.slippage,
+                               holding_days=args.holding_days, entry=args.entry,
+                               level_exits=False if args.no_level_exits else None,
+                               stop_loss_pct=args.stop_loss, take_profit_pct=args.take_profit,
+                               bootstrap=args.bootstrap)
+    else:
+        results = run_backtest(start_str, end_str, tickers, news_archive, bootstrap=args.bootstrap)
     
     print(f"\n✅ Backtest tamamlandı!")
 
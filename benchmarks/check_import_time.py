@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# ============================================================
+# benchmarks/check_import_time.py — Başlangıç (Import) Bütçesi
+# ============================================================
+# Giriş noktalarını (main_bot, check_performance) temiz bir Python
+# sürecinde `-X importtime` ile yükler ve:
+# 1. Ağır bağımlılıkların (pandas, yfinance, matplotlib, sendgrid...)
+#    modül yüklenirken çekilmediğini,
+# 2. Toplam import süresinin bütçe içinde kaldığını kontrol eder.
+#
+# Kullanım:
+#   python benchmarks/check_import_time.py
+#   python benchmarks/check_import_time.py --budget-ms 150 --repeat 5
+# ============================================================
+
+import argparse
+import os
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+ENTRY_POINTS = ["main_bot", "check_performance"]
+
+# Giriş noktası import edilirken yüklenmemesi gereken paketler
+HEAVY_MODULES = [
+    "pandas", "numpy", "yfinance", "matplotlib", "sendgrid",
+    "requests", "schedule",
+]
+
+DEFAULT_BUDGET_MS = 200.0
+
+
+def measure_import(module: str) -> dict:
+    """
+    Modülü yeni bir süreçte -X importtime ile yükler
+
+    Returns:
+        {"total_ms": giriş modülünün kümülatif süresi,
+         "modules": {modül_adı: kümülatif_ms}}
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{module} import edilemedi:\n{result.stderr}")
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue  # başlık satırı
+        name = parts[2].strip()
+        modules[name] = int(parts[1]) / 1000.0
+
+    return {"total_ms": modules.get(module, 0.0), "modules": modules}
+
+
+def check_entry_point(module: str, budget_ms: float, repeat: int) -> list:
+    """Tek giriş noktasını ölçer, ihlalleri döndürür"""
+    runs = [measure_import(module) for _ in range(repeat)]
+    best_ms = min(r["total_ms"] for r in runs)
+    loaded = runs[0]["modules"]
+
+    problems = []
+    for name in sorted(n for n in HEAVY_MODULES if n in loaded):
+        problems.append(f"{module}: '{name}' modül yüklenirken import ediliyor "
+                        f"({loaded[name]:.1f} ms)")
+    if best_ms > budget_ms:
+        problems.append(f"{module}: import süresi {best_ms:.1f} ms > bütçe {budget_ms:.0f} ms")
+
+    status = "✅" if not problems else "❌"
+    print(f"  {status} {module:<20} {best_ms:8.1f} ms  ({len(loaded)} modül)")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Giriş noktası import süresi bütçesi")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help=f"Giriş noktası başına en fazla import süresi (varsayılan: {DEFAULT_BUDGET_MS:.0f})")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Ölçüm tekrar sayısı, en iyisi alınır (varsayılan: 3)")
+    parser.add_argument("--only", type=str, nargs="+", choices=ENTRY_POINTS,
+                        help="Sadece belirtilen giriş noktalarını ölç")
+    args = parser.parse_args()
+
+    print(f"\n⏱️ Import bütçesi: {args.budget_ms:.0f} ms")
+    problems = []
+    for module in args.only or ENTRY_POINTS:
+        problems.extend(check_entry_point(module, args.budget_ms, args.repeat))
+
+    if problems:
+        print("\n❌ Import bütçesi aşıldı:")
+        for problem in problems:
+            print(f"   - {problem}")
+        sys.exit(1)
+
+    print("\n✅ Tüm giriş noktaları bütçe içinde")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+# ============================================================
+# benchmarks/run_benchmarks.py — Sıcak Yol Benchmark'ları
+# ============================================================
+# Teknik analiz, skorlama, haber ve grafik sıcak yollarını sentetik
+# veriyle (ağ erişimi olmadan) ölçer, throughput raporlar ve kayıtlı
+# baseline ile karşılaştırır.
+#
+# Kullanım:
+#   python benchmarks/run_benchmarks.py
+#   python benchmarks/run_benchmarks.py --sizes 10 100 1000 10000
+#   python benchmarks/run_benchmarks.py --only score_technical calculate_rsi
+#   python benchmarks/run_benchmarks.py --save-baseline
+#   python benchmarks/run_benchmarks.py --no-baseline --sizes 10
+# ============================================================
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+import matplotlib
+matplotlib.use("Agg")
+
+import config
+from synthetic import generate_universe, generate_headlines
+from technical_analyzer import (
+    score_technical, score_technical_batch, calculate_rsi, calculate_macd, calculate_bollinger_bands,
+    calculate_fibonacci_levels, calculate_momentum,
+)
+from scorer import select_top_stocks
+from news_analyzer import calculate_sentiment, classify_sector, score_texts_batch
+from chart_generator import create_stock_chart
+from performance_tracker import PerformanceTracker
+
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+DEFAULT_BASELINE = os.path.join(HERE, "baseline.json")
+
+
+# ─── Benchmark vakaları ──────────────────────────────────────
+# Her vaka: setup(size, ctx) → state, run(state) → işlenen eleman sayısı
+
+
+def _universe(ctx, size):
+    key = ("universe", size)
+    if key not in ctx:
+        ctx[key] = generate_universe(size, n_bars=200, seed=42)
+    return ctx[key]
+
+
+def _closes(ctx, size):
+    return [df["Close"] for df in _universe(ctx, size).values()]
+
+
+def _indicator_case(func):
+    def setup(size, ctx):
+        return _closes(ctx, size)
+
+    def run(closes):
+        for close in closes:
+            func(close)
+        return len(closes)
+
+    return setup, run
+
+
+def _setup_frames(size, ctx):
+    return list(_universe(ctx, size).values())
+
+
+def _run_score_technical(frames):
+    for df in frames:
+        score_technical(df)
+    return len(frames)
+
+
+def _run_score_technical_batch(frames):
+    score_technical_batch(frames)
+    return len(frames)
+
+
+def _run_fibonacci(frames):
+    for df in frames:
+        calculate_fibonacci_levels(df)
+    return len(frames)
+
+
+def _setup_select(size, ctx):
+    analysis = []
+    for ticker, df in _universe(ctx, size).items():
+        result = score_technical(df)
+        result["ticker"] = ticker
+        result["dataframe"] = df
+        analysis.append(result)
+    return analysis
+
+
+def _run_select(analysis):
+    # select_top_stocks listeyi yerinde günceller → her turda kopya ver
+    select_top_stocks([dict(a) for a in analysis], {"genel": 0.1}, max_count=3)
+    return len(analysis)
+
+
+def _setup_headlines(size, ctx):
+    return generate_headlines(size, seed=7)
+
+
+def _run_sentiment(texts):
+    for text in texts:
+        calculate_sentiment(text)
+    return len(texts)
+
+
+def _run_classify(texts):
+    for text in texts:
+        classify_sector(text)
+    return len(texts)
+
+
+def _run_batch(texts):
+    score_texts_batch(texts, workers=1)
+    return len(texts)
+
+
+def _setup_charts(size, ctx):
+    out_dir = tempfile.mkdtemp(prefix="bench_charts_")
+    items = []
+    for i, (ticker, df) in enumerate(_universe(ctx, size).items()):
+        analysis = score_technical(df)
+        items.append((ticker, df, analysis, os.path.join(out_dir, f"{i}.png")))
+    return items
+
+
+def _run_charts(items):
+    for ticker, df, analysis, path in items:
+        # Render maliyeti ölçülüyor → cache devre dışı
+        create_stock_chart(ticker, df, analysis, save_path=path, use_cache=False)
+    return len(items)
+
+
+def _setup_tracker(size, ctx):
+    db_path = os.path.join(tempfile.mkdtemp(prefix="bench_db_"), "performance.db")
+    tracker = PerformanceTracker(db_path)
+
+    import sqlite3
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    today = datetime.now()
+    rec_rows = []
+    for i in range(size):
+        day = (today.toordinal() - (i % 120))
+        date = datetime.fromordinal(day).strftime("%Y-%m-%d")
+        rec_rows.append((date, f"SYN{i % 500:05d}", 100.0, 60.0, 62.0, "📈 AL",
+                         "genel", 95.0, 110.0, 5.0, 10.0, 2.0, "[]"))
+    cursor.executemany("""
+        INSERT INTO recommendations (
+            date, ticker, entry_price, technical_score, final_score,
+            rating, sector, support_price, resistance_price,
+            risk_pct, reward_pct, rr_ratio, signals
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, rec_rows)
+    outcomes = ["SUCCESS", "NEUTRAL", "LOSS"]
+    cursor.executemany("""
+        INSERT INTO performance_results (
+            recommendation_id, check_date, days_held, exit_price, return_pct,
+            hit_resistance, hit_support, max_price, min_price, volatility, outcome
+        ) VALUES (?, ?, 7, 101.0, ?, 0, 0, 105.0, 97.0, 1.5, ?)
+    """, [(i + 1, today.strftime("%Y-%m-%d"), (i % 11) - 5.0, outcomes[i % 3])
+          for i in range(size)])
+    conn.commit()
+    conn.close()
+    return tracker
+
+
+def _run_tracker_report(tracker):
+    tracker.generate_report(90)
+    return 1
+
+
+def _run_tracker_history(tracker):
+    return len(tracker.get_detailed_history(limit=100))
+
+
+CASES = {
+    "score_technical": (_setup_frames, _run_score_technical),
+    "score_technical_batch": (_setup_frames, _run_score_technical_batch),
+    "calculate_rsi": _indicator_case(lambda c: calculate_rsi(c, config.RSI_PERIOD)),
+    "calculate_macd": _indicator_case(
+        lambda c: calculate_macd(c, config.MACD_FAST, config.MACD_SLOW, config.MACD_SIGNAL)),
+    "calculate_bollinger_bands": _indicator_case(
+        lambda c: calculate_bollinger_bands(c, config.BOLLINGER_PERIOD)),
+    "calculate_momentum": _indicator_case(lambda c: calculate_momentum(c, 10)),
+    "calculate_fibonacci_levels": (_setup_frames, _run_fibonacci),
+    "select_top_stocks": (_setup_select, _run_select),
+    "calculate_sentiment": (_setup_headlines, _run_sentiment),
+    "classify_sector": (_setup_headlines, _run_classify),
+    "score_texts_batch": (_setup_headlines, _run_batch),
+    "create_stock_chart": (_setup_charts, _run_charts),
+    "tracker_generate_report": (_setup_tracker, _run_tracker_report),
+    "tracker_detailed_history": (_setup_tracker, _run_tracker_history),
+}
+
+# Yavaş vakalar için varsayılan üst boyut (--max-size ile değiştirilebilir)
+SIZE_CAPS = {
+    "create_stock_chart": 10,
+}
+
+
+def time_case(name: str, size: int, ctx: dict, repeat: int) -> dict:
+    """Bir vakayı verilen boyutta çalıştırır, en iyi süreyi döndürür."""
+    setup, run = CASES[name]
+    state = setup(size, ctx)
+
+    best = None
+    items = 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        items = run(state)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+
+    return {
+        "case": name,
+        "size": size,
+        "seconds": round(best, 6),
+        "items": items,
+        "throughput": round(items / best, 2) if best > 0 else None,
+    }
+
+
+def compare_with_baseline(results: list, baseline: dict, tolerance: float) -> int:
+    """Sonuçları baseline ile karşılaştırır, gerileme sayısını döndürür."""
+    regressions = 0
+    print(f"\n  {'Vaka':<28} {'Boyut':>6} {'Şimdi/sn':>12} {'Baseline/sn':>12} {'Oran':>7}")
+    print("  " + "-" * 70)
+    for res in results:
+        key = f"{res['case']}@{res['size']}"
+        base = baseline.get("results", {}).get(key)
+        if not base or not res["throughput"]:
+            continue
+        ratio = res["throughput"] / base["throughput"]
+        mark = "✅"
+        if ratio < 1 - tolerance:
+            mark = "❌"
+            regressions += 1
+        elif ratio > 1 + tolerance:
+            mark = "🚀"
+        print(f"  {res['case']:<28} {res['size']:>6} {res['throughput']:>12.1f} "
+              f"{base['throughput']:>12.1f} {ratio:>6.2f}x {mark}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Borsa Bot benchmark'ları (sentetik veri)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="Evren boyutları (default: 10 100 1000 10000)")
+    parser.add_argument("--only", type=str, nargs="+", choices=sorted(CASES),
+                        help="Sadece bu vakaları çalıştır")
+    parser.add_argument("--max-size", type=int, default=None,
+                        help="Yavaş vakalar (grafik) için üst boyut sınırını değiştir")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Küçük boyutlarda tekrar sayısı (en iyi süre alınır)")
+    parser.add_argument("--baseline", type=str, default=DEFAULT_BASELINE,
+                        help="Baseline JSON dosyası")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Sonuçları baseline olarak kaydet")
+    parser.add_argument("--no-baseline", action="store_true",
+                        help="Baseline karşılaştırması yapmadan sadece ölç")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Gerileme toleransı (0.2 = %%20 yavaşlama)")
+    parser.add_argument("--json", type=str, default=None,
+                        help="Sonuçları bu JSON dosyasına yaz")
+    args = parser.parse_args()
+
+    # Eksik baseline sessizce "gerileme yok" sayılmasın
+    if not (args.save_baseline or args.no_baseline or os.path.exists(args.baseline)):
+        print(f"❌ Baseline bulunamadı: {args.baseline}")
+        print("   Oluşturmak için --save-baseline, sadece ölçüm için --no-baseline kullanın")
+        sys.exit(2)
+
+    names = args.only or list(CASES)
+    ctx = {}
+    results = []
+
+    print("\n" + "=" * 72)
+    print("  ⏱️  BORSA BOT BENCHMARK")
+    print(f"  🐍 Python {platform.python_version()} | {platform.machine()} | Boyutlar: {args.sizes}")
+    print("=" * 72)
+    print(f"\n  {'Vaka':<28} {'Boyut':>6} {'Süre (sn)':>12} {'Eleman/sn':>14}")
+    print("  " + "-" * 64)
+
+    for name in names:
+        cap = args.max_size or SIZE_CAPS.get(name)
+        for size in args.sizes:
+            if cap and size > cap:
+                continue
+            repeat = args.repeat if size <= 1000 else 1
+            res = time_case(name, size, ctx, repeat)
+            results.append(res)
+            print(f"  {name:<28} {size:>6} {res['seconds']:>12.4f} {res['throughput'] or 0:>14.1f}")
+
+    record = {
+        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": {f"{r['case']}@{r['size']}": r for r in results},
+    }
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False, indent=2)
+
+    exit_code = 0
+    if not (args.save_baseline or args.no_baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n  ❌ {regressions} vakada %{args.tolerance * 100:.0f}'den fazla yavaşlama")
+            exit_code = 1
+        else:
+            print("\n  ✅ Baseline'a göre gerileme yok")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False, indent=2)
+        print(f"\n  💾 Baseline kaydedildi: {args.baseline}")
+
+    print("\n" + "=" * 72)
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# ============================================================
+# benchmarks/synthetic.py — Sentetik Veri Üreticileri
+# ============================================================
+# Ağ erişimi olmadan benchmark çalıştırmak için:
+# 1) Tohumlu (seeded) geometrik Brownian hareketiyle OHLCV üretir
+# 2) Sözlükteki kelimelerden rastgele haber başlıkları üretir
+# Aynı tohum her zaman aynı veriyi verir.
+# ============================================================
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from news_analyzer import SECTOR_KEYWORDS, POSITIVE_WORDS, NEGATIVE_WORDS, NEUTRAL_INTENSIFIERS
+
+FILLER_WORDS = [
+    "the", "market", "shares", "today", "investors", "report", "quarter",
+    "analysts", "week", "company", "global", "price", "outlook", "borsa",
+    "piyasa", "hisse", "yatırımcı", "bugün",
+]
+
+
+def generate_ohlcv(n_bars: int = 200, seed: int = 0,
+                   end: str = "2025-01-01", start_price: float = 100.0) -> pd.DataFrame:
+    """Tek bir hisse için iş günü indeksli sentetik OHLCV üretir."""
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end=end, periods=n_bars)
+
+    returns = rng.normal(0.0004, 0.02, n_bars)
+    close = start_price * np.exp(np.cumsum(returns))
+    open_ = close * (1 + rng.normal(0, 0.005, n_bars))
+    spread = np.abs(rng.normal(0, 0.01, n_bars))
+    high = np.maximum(open_, close) * (1 + spread)
+    low = np.minimum(open_, close) * (1 - spread)
+    volume = rng.lognormal(13, 0.5, n_bars).round()
+
+    return pd.DataFrame({
+        "Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume
+    }, index=index)
+
+
+def generate_universe(n_tickers: int, n_bars: int = 200, seed: int = 0) -> dict:
+    """n_tickers adet sentetik hisse üretir: {ticker: DataFrame}."""
+    return {
+        f"SYN{i:05d}": generate_ohlcv(n_bars, seed=seed * 1_000_003 + i)
+        for i in range(n_tickers)
+    }
+
+
+def generate_headlines(n: int, seed: int = 0, min_words: int = 6,
+                       max_words: int = 24) -> list:
+    """Sözlük + dolgu kelimelerinden n adet sentetik başlık üretir."""
+    rng = np.random.default_rng(seed)
+    keywords = [kw for kws in SECTOR_KEYWORDS.values() for kw in kws]
+    pools = [FILLER_WORDS, keywords, POSITIVE_WORDS, NEGATIVE_WORDS, NEUTRAL_INTENSIFIERS]
+    pool_probs = np.array([0.55, 0.2, 0.1, 0.1, 0.05])
+
+    headlines = []
+    for _ in range(n):
+        length = int(rng.integers(min_words, max_words + 1))
+        picks = rng.choice(len(pools), size=length, p=pool_probs)
+        words = [pools[p][int(rng.integers(len(pools[p])))] for p in picks]
+        headlines.append(" ".join(words))
+    return headlines
@@ -0,0 +1,233 @@
+# ============================================================
+# bootstrap.py — Backtest Sonuçları için Bootstrap Güven Aralıkları
+# ============================================================
+# Bu modül:
+# 1) İşlem listesini (run_backtest, walk-forward, portföy) binlerce kez
+#    yeniden örnekler; başarı oranı, ortalama getiri ve maks. drawdown
+#    için güven aralığı verir
+# 2) Varsayılan olarak GÜN BLOKLARI örneklenir (hareketli blok
+#    bootstrap): aynı gün seçilen hisseler ve ardışık günler birbiriyle
+#    ilişkilidir, tek tek işlem örneklemek aralığı olduğundan dar gösterir
+# 3) Portföy özkaynak eğrisinin günlük getirilerini aynı şekilde
+#    örnekleyip toplam getiri, drawdown ve Sharpe aralığı verir
+# 4) Örneklemler NumPy ile (örneklem × birim) matrisler halinde hesaplanır;
+#    büyük işler parçalara bölünüp ProcessPool ile paralel çalışır
+#
+# Aynı tohum (seed) işçi sayısından bağımsız olarak aynı sonucu verir.
+# ============================================================
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import config
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+def _resample_indices(rng, n_units: int, size: int, block: int) -> np.ndarray:
+    """
+    (size, n_units) birim indeksi. block > 1 ise hareketli blok bootstrap:
+    rastgele başlangıçlı `block` uzunluğunda ardışık bloklar uç uca eklenir.
+    """
+    block = max(1, min(block, n_units))
+    if block == 1:
+        return rng.integers(0, n_units, size=(size, n_units))
+    n_blocks = math.ceil(n_units / block)
+    starts = rng.integers(0, n_units - block + 1, size=(size, n_blocks))
+    idx = starts[:, :, None] + np.arange(block)
+    return idx.reshape(size, -1)[:, :n_units]
+
+
+def _max_drawdown(paths: np.ndarray) -> np.ndarray:
+    """Her satırın (yol) en büyük tepe-dip düşüşü; paths kümülatif değerler."""
+    peak = np.maximum.accumulate(paths, axis=1)
+    return (paths - peak).min(axis=1)
+
+
+def _trade_chunk(units: dict, idx: np.ndarray) -> dict:
+    """
+    İşlem birimlerinden (gün veya tek işlem) örneklem istatistikleri.
+    Drawdown: her işleme sabit tutar yatırılmış gibi kümülatif getiri
+    (yüzde puan) yolunun en büyük düşüşü.
+    """
+    counts = units["count"][idx].sum(axis=1)
+    sums = units["sum"][idx]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return {
+            "win_rate": units["wins"][idx].sum(axis=1) / counts * 100,
+            "avg_return": sums.sum(axis=1) / counts,
+            "max_drawdown": _max_drawdown(np.cumsum(sums, axis=1)),
+        }
+
+
+def _equity_chunk(units: dict, idx: np.ndarray) -> dict:
+    """Günlük portföy getirilerinden örneklem istatistikleri (bileşik)."""
+    daily = units["daily"][idx]
+    paths = np.cumprod(1 + daily, axis=1)
+    std = daily.std(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sharpe = np.where(std > 0, daily.mean(axis=1) / std * math.sqrt(TRADING_DAYS_PER_YEAR), 0.0)
+    return {
+        "total_return": (paths[:, -1] - 1) * 100,
+        "max_drawdown": (paths / np.maximum.accumulate(paths, axis=1) - 1).min(axis=1) * 100,
+        "sharpe": sharpe,
+    }
+
+
+_CHUNK_FUNCS = {"trades": _trade_chunk, "equity": _equity_chunk}
+
+
+def _run_chunk(task: tuple) -> dict:
+    kind, units, size, block, seed_seq = task
+    rng = np.random.default_rng(seed_seq)
+    n_units = len(next(iter(units.values())))
+    return _CHUNK_FUNCS[kind](units, _resample_indices(rng, n_units, size, block))
+
+
+def _resample(kind: str, units: dict, n_resamples: int, block: int,
+              seed: int, workers: int = None) -> dict:
+    """Örneklemleri parçalara bölüp (gerekirse paralel) çalıştırır."""
+    n_units = len(next(iter(units.values())))
+    chunk = config.BOOTSTRAP_CHUNK_SIZE
+    sizes = [min(chunk, n_resamples - i) for i in range(0, n_resamples, chunk)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(kind, units, size, block, s) for size, s in zip(sizes, seeds)]
+
+    if workers is None:
+        workers = (1 if n_resamples * n_units < config.BOOTSTRAP_PARALLEL_MIN
+                   else (os.cpu_count() or 1))
+    workers = min(workers, len(tasks))
+
+    if workers <= 1:
+        parts = [_run_chunk(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_run_chunk, tasks))
+
+    return {key: np.concatenate([p[key] for p in parts]) for key in parts[0]}
+
+
+def _summarize(point: dict, samples: dict, confidence: float) -> dict:
+    alpha = (1 - confidence) / 2 * 100
+    metrics = {}
+    for key, values in samples.items():
+        values = values[np.isfinite(values)]
+        if values.size == 0:
+            continue
+        low, high = np.percentile(values, [alpha, 100 - alpha])
+        metrics[key] = {
+            "value": float(point[key]),
+            "low": float(low),
+            "high": float(high),
+            "std": float(values.std()),
+        }
+    return metrics
+
+
+def _trade_units(trades: list, block_days: int) -> tuple:
+    """
+    İşlemleri örnekleme birimlerine çevirir. Tarih varsa birim = gün
+    (o günün işlem sayısı, getiri toplamı, başarılı sayısı); yoksa tek işlem.
+    """
+    returns = np.array([t["return"] for t in trades], dtype="float64")
+    dates = [t.get("date") or t.get("entry_date") for t in trades]
+
+    if block_days > 1 and all(dates):
+        days, inverse = np.unique(np.array(dates), return_inverse=True)
+        units = {
+            "count": np.bincount(inverse, minlength=len(days)).astype("float64"),
+            "sum": np.bincount(inverse, weights=returns, minlength=len(days)),
+            "wins": np.bincount(inverse, weights=(returns >= 5), minlength=len(days)),
+        }
+        return units, block_days, "gün blokları"
+
+    order = np.argsort(np.array([d or "" for d in dates]), kind="stable")
+    returns = returns[order]
+    units = {"count": np.ones(len(returns)), "sum": returns, "wins": (returns >= 5).astype("float64")}
+    return units, 1, "işlemler"
+
+
+def bootstrap_trades(trades: list, n_resamples: int = None, block_days: int = None,
+                     confidence: float = None, seed: int = 0, workers: int = None) -> dict:
+    """
+    İşlem listesinin başarı oranı / ortalama getiri / maks. drawdown güven aralıkları.
+    trades: {"return": %, "date" veya "entry_date": "YYYY-MM-DD", ...} listesi
+
+    Döndürür: {"metrics": {ad: {"value", "low", "high", "std"}},
+               "p_avg_return_le_0": ortalama getirinin ≤ 0 çıktığı örneklem oranı, ...}
+    """
+    n_resamples = n_resamples or config.BOOTSTRAP_RESAMPLES
+    confidence = confidence or config.BOOTSTRAP_CONFIDENCE
+    block_days = config.BOOTSTRAP_BLOCK_DAYS if block_days is None else block_days
+    if not trades:
+        return {}
+
+    units, block, unit_name = _trade_units(trades, block_days)
+    point = _trade_chunk(units, np.arange(len(units["sum"]))[None, :])
+    point = {k: v[0] for k, v in point.items()}
+    samples = _resample("trades", units, n_resamples, block, seed, workers)
+
+    return {
+        "kind": "trades",
+        "n_resamples": n_resamples,
+        "confidence": confidence,
+        "unit": unit_name,
+        "block": block,
+        "metrics": _summarize(point, samples, confidence),
+        "p_avg_return_le_0": float((samples["avg_return"] <= 0).mean()),
+    }
+
+
+def bootstrap_equity(equity_curve, n_resamples: int = None, block_days: int = None,
+                     confidence: float = None, seed: int = 0, workers: int = None) -> dict:
+    """Portföy özkaynak eğrisinin toplam getiri / drawdown / Sharpe güven aralıkları."""
+    n_resamples = n_resamples or config.BOOTSTRAP_RESAMPLES
+    confidence = confidence or config.BOOTSTRAP_CONFIDENCE
+    block_days = config.BOOTSTRAP_BLOCK_DAYS if block_days is None else block_days
+
+    equity = np.asarray(equity_curve, dtype="float64")
+    if equity.size < 3:
+        return {}
+    units = {"daily": np.diff(equity) / equity[:-1]}
+    point = _equity_chunk(units, np.arange(len(units["daily"]))[None, :])
+    point = {k: v[0] for k, v in point.items()}
+    samples = _resample("equity", units, n_resamples, block_days, seed, workers)
+
+    return {
+        "kind": "equity",
+        "n_resamples": n_resamples,
+        "confidence": confidence,
+        "unit": "gün blokları" if block_days > 1 else "günler",
+        "block": block_days,
+        "metrics": _summarize(point, samples, confidence),
+        "p_total_return_le_0": float((samples["total_return"] <= 0).mean()),
+    }
+
+
+METRIC_LABELS = {
+    "win_rate": ("Başarı Oranı", "%"),
+    "avg_return": ("Ortalama Getiri", "%"),
+    "max_drawdown": ("Maks. Drawdown", "%"),
+    "total_return": ("Toplam Getiri", "%"),
+    "sharpe": ("Sharpe", ""),
+}
+
+
+def print_confidence(result: dict):
+    if not result:
+        return
+    pct = result["confidence"] * 100
+    print(f"\n  🎲 BOOTSTRAP GÜVEN ARALIKLARI (%{pct:.0f}, {result['n_resamples']} örneklem, "
+          f"{result['unit']}" + (f", blok {result['block']}" if result["block"] > 1 else "") + "):")
+    for key, m in result["metrics"].items():
+        label, unit = METRIC_LABELS.get(key, (key, ""))
+        if key == "max_drawdown" and result["kind"] == "trades":
+            unit = " puan"  # sabit tutarlı işlemlerin kümülatif getirisi
+        print(f"     {label:<19}: {m['value']:+8.2f}{unit}   [{m['low']:+.2f}{unit}, {m['high']:+.2f}{unit}]")
+    if "p_avg_return_le_0" in result:
+        print(f"     P(ort. getiri ≤ 0) : {result['p_avg_return_le_0']:.3f}")
+    if "p_total_return_le_0" in result:
+        print(f"     P(toplam getiri ≤ 0): {result['p_total_return_le_0']:.3f}")
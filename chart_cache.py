@@ -0,0 +1,133 @@
+# ============================================================
+# chart_cache.py — Grafik Render Cache'i
+# ============================================================
+# Bu modül:
+# 1) Üretilmiş grafik dosyalarını diskte saklar
+# 2) Anahtar: hisse + grafiğe verilen tüm fiyat verisi (çizilen son 90
+#    bar ve göstergelerin ısındığı önceki barlar) + grafikte kullanılan
+#    analiz alanları (skor, Fibonacci, sinyaller) + gün
+#    → veri değişmediyse gün içi tekrar çalıştırmalar render etmez
+# 3) Toplam boyut limiti aşılınca en az kullanılanları siler (LRU)
+# ============================================================
+
+import hashlib
+import json
+import os
+import shutil
+import config
+
+# Grafik görünümü değiştiğinde artırılır; eski cache kayıtları geçersiz olur
+RENDER_VERSION = 3
+
+
+class ChartCache:
+    """
+    Disk üzerinde boyut sınırlı grafik cache'i.
+    Dosyanın mtime'ı son erişim zamanı olarak kullanılır (LRU).
+    """
+
+    def __init__(self, cache_dir: str = None, max_mb: float = None):
+        self.cache_dir = cache_dir or config.CHART_CACHE_DIR
+        max_mb = max_mb if max_mb is not None else config.CHART_CACHE_MAX_MB
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(ticker: str, df, analysis: dict, day: str, extra=None) -> str:
+        """
+        Grafiğin içeriğini belirleyen her şeyden anahtar üretir.
+        df: grafiğe verilen tüm OHLCV verisi; sadece çizilen 90 bar değil,
+        göstergeler önceki barlarla ısındığı için tamamı hash'lenir
+        """
+        h = hashlib.sha1()
+        h.update(json.dumps([RENDER_VERSION, ticker, day, extra], default=str).encode("utf-8"))
+        h.update(df.index.asi8.tobytes())
+        columns = [c for c in ("High", "Low", "Close", "Volume") if c in df]
+        h.update(df[columns].to_numpy(dtype="float64").tobytes())
+        fields = {
+            "score": analysis.get("score", 0),
+            "fibonacci": analysis.get("fibonacci", {}),
+            "signals": analysis.get("signals", [])[:5],
+        }
+        h.update(json.dumps(fields, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"))
+        return h.hexdigest()
+
+    def _path(self, key: str, ext: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}{ext}")
+
+    def get(self, key: str, save_path: str) -> bool:
+        """Cache'teki grafiği save_path'e kopyalar. Kayıt yoksa False döner."""
+        path = self._path(key, os.path.splitext(save_path)[1])
+        if not os.path.exists(path):
+            return False
+
+        try:
+            if os.path.abspath(path) != os.path.abspath(save_path):
+                shutil.copyfile(path, save_path)
+            # LRU: son erişim zamanını güncelle
+            os.utime(path, None)
+        except OSError:
+            return False
+        return True
+
+    def put(self, key: str, rendered_path: str):
+        """Render edilmiş dosyayı cache'e kopyalar (atomik), gerekirse eski kayıtları siler."""
+        path = self._path(key, os.path.splitext(rendered_path)[1])
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            shutil.copyfile(rendered_path, tmp_path)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[ChartCache] Yazma hatası: {e}")
+            self._remove(tmp_path)
+            return
+
+        self._evict()
+
+    def clear(self):
+        """Tüm cache kayıtlarını siler."""
+        for name in os.listdir(self.cache_dir):
+            self._remove(os.path.join(self.cache_dir, name))
+
+    def _evict(self):
+        """Toplam boyut limiti aşıldıysa en uzun süredir kullanılmayanları siler."""
+        entries = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".tmp"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+
+        if total <= self.max_bytes:
+            return
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+_default_cache = None
+
+
+def get_chart_cache() -> ChartCache:
+    """Modül genelinde paylaşılan cache nesnesini döndürür."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ChartCache()
+    return _default_cache
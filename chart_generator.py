@@ -3,10 +3,13 @@
 # ============================================================
 # Bu modül:
 # 1) Her hisse için çok katmanlı teknik analiz grafiği üretir
-# 2) Fiyat grafiği + RSI + MACD → 3 satırlı dashboard
+# 2) Fiyat grafiği + Hacim (OBV, A/D) + MACD + RSI → 4 satırlı dashboard
 # 3) Fibonacci seviyeler overlay olarak gösterilir
 # 4) Bollinger Bands gösterilir
-# 5) PNG olarak kaydedilir (mail'e eklenir)
+#    (göstergeler analizle aynı kayıttan gelir: indicators.py)
+# 5) Çıktı profiline göre PNG/WebP/SVG olarak kaydedilir
+#    (config.CHART_PROFILES: tam çözünürlük, mail içi küçük görsel, ...)
+# 6) Verisi değişmeyen grafikler render cache'inden kopyalanır (chart_cache.py)
 # ============================================================
 
 import matplotlib.pyplot as plt
@@ -16,6 +19,9 @@ import numpy as np
 import pandas as pd
 from datetime import datetime
 import os
+import config
+from chart_cache import get_chart_cache
+from indicators import compute_frame
 
 # Karanlık tema için matplotlib
 plt.rcParams.update({
@@ -43,38 +49,70 @@ COLOR_SIGNAL_LINE = '#f59e0b'
 COLOR_HIST_POS = '#10b981'
 COLOR_HIST_NEG = '#ef4444'
 COLOR_RSI = '#a78bfa'
+COLOR_VWAP = '#38bdf8'
+COLOR_VOLUME_AVG = '#94a3b8'
+COLOR_OBV = '#f472b6'
+COLOR_AD = '#facc15'
 COLOR_FIB = '#fbbf24'
 COLOR_SUPPORT = '#10b981'
 COLOR_RESISTANCE = '#ef4444'
 
 
 def create_stock_chart(ticker: str, df: pd.DataFrame, analysis: dict,
-                       save_path: str = None) -> str:
+                       save_path: str = None, use_cache: bool = True,
+                       profile: str = "full") -> str:
     """
     Bir hisse için tam teknik analiz grafiği üretir.
 
     Layout:
     ┌─────────────────────────────────────┐
-    │  Fiyat + Bollinger + SMA + Fibonacci │  (70% yükseklik)
+    │  Fiyat + Bollinger + SMA + VWAP + Fib │  (55% yükseklik)
+    ├─────────────────────────────────────┤
+    │  Hacim + 20g ortalama | OBV, A/D     │  (15%)
     ├─────────────────────────────────────┤
     │  MACD + Signal + Histogram           │  (15%)
     ├─────────────────────────────────────┤
     │  RSI                                 │  (15%)
     └─────────────────────────────────────┘
+
+    profile: config.CHART_PROFILES anahtarı (format, dpi, boyut)
+
+    Aynı veri ve analizle aynı gün tekrar çağrılırsa grafik render
+    edilmez, cache'ten kopyalanır.
     """
     if df.empty:
         return ""
 
-    # Son 90 gün göster
+    settings = config.CHART_PROFILES[profile]
+    fmt = settings.get("format", "png")
+
+    # Son 90 gün göster; göstergeler ısınmış olsun diye tüm veri üzerinde hesaplanır
     df_plot = df.tail(90).copy()
+
+    if save_path is None:
+        os.makedirs("charts", exist_ok=True)
+        suffix = "" if profile == "full" else f"_{profile}"
+        save_path = f"charts/{ticker.replace('.', '_')}_{datetime.now().strftime('%Y%m%d')}{suffix}.{fmt}"
+
+    # Başlıkta analiz günü yazdığı için gün de anahtarın parçası
+    cache = get_chart_cache() if use_cache and config.CHART_CACHE_ENABLED else None
+    if cache is not None:
+        cache_key = cache.make_key(ticker, df, analysis, datetime.now().strftime("%Y%m%d"),
+                                   extra=settings)
+        if cache.get(cache_key, save_path):
+            print(f"  📊 Grafik cache'ten alındı: {save_path}")
+            return save_path
+
     close = df_plot["Close"].squeeze()
     high = df_plot["High"].squeeze()
     low = df_plot["Low"].squeeze()
     dates = df_plot.index
+    ind = {key: series.tail(90)
+           for key, series in compute_frame(df, ["bollinger", "sma", "vwap", "macd", "rsi", "obv", "ad"]).items()}
 
-    fig, (ax1, ax2, ax3) = plt.subplots(
-        3, 1, figsize=(14, 10),
-        gridspec_kw={'height_ratios': [4, 1.5, 1.5]},
+    fig, (ax1, ax_vol, ax2, ax3) = plt.subplots(
+        4, 1, figsize=settings.get("figsize", (14, 10)),
+        gridspec_kw={'height_ratios': [4, 1.2, 1.2, 1.2]},
         sharex=True
     )
 
@@ -84,22 +122,22 @@ def create_stock_chart(ticker: str, df: pd.DataFrame, analysis: dict,
     ax1.plot(dates, close, color=COLOR_PRICE, linewidth=1.8, label='Kapanış Fiyatı', zorder=3)
 
     # Bollinger Bands
-    period = 20
-    sma_bb = close.rolling(window=period).mean()
-    std = close.rolling(window=period).std()
-    upper = sma_bb + (std * 2)
-    lower = sma_bb - (std * 2)
+    upper, lower = ind["bb_upper"], ind["bb_lower"]
 
     ax1.plot(dates, upper, color=COLOR_BOLLINGER_UPPER, linewidth=0.8, alpha=0.7, linestyle='--', label='Bollinger Üst')
     ax1.plot(dates, lower, color=COLOR_BOLLINGER_LOWER, linewidth=0.8, alpha=0.7, linestyle='--', label='Bollinger Alt')
     ax1.fill_between(dates, upper, lower, color='#e11d48', alpha=0.05)
 
     # SMA 20 ve 50
-    sma20 = close.rolling(window=20).mean()
-    sma50 = close.rolling(window=50).mean()
+    sma20, sma50 = ind["sma_short"], ind["sma_long"]
     ax1.plot(dates, sma20, color=COLOR_SMA_SHORT, linewidth=1.0, alpha=0.8, label='SMA 20')
     ax1.plot(dates, sma50, color=COLOR_SMA_LONG, linewidth=1.0, alpha=0.8, label='SMA 50')
 
+    # Kayan VWAP (hacim verisi olmayan serilerde NaN, çizilmez)
+    if ind["vwap"].notna().any():
+        ax1.plot(dates, ind["vwap"], color=COLOR_VWAP, linewidth=1.0, alpha=0.8,
+                 linestyle='-.', label=f'VWAP {config.VWAP_PERIOD}')
+
     # Fibonacci Seviyeler (Yatay çizgiler)
     fib = analysis.get("fibonacci", {})
     fib_levels_to_draw = [
@@ -153,13 +191,38 @@ def create_stock_chart(ticker: str, df: pd.DataFrame, analysis: dict,
             transform=ax1.transAxes, color=score_color,
             fontsize=9, fontweight='bold', ha='center', va='center')
 
+    # ─── AX_VOL: HACİM + OBV / A/D ───────────────────────────
+
+    volume = df_plot["Volume"].squeeze() if "Volume" in df_plot else pd.Series(0.0, index=dates)
+    if volume.fillna(0).sum() > 0:
+        up_day = close.diff().fillna(0) >= 0
+        ax_vol.bar(dates, volume, color=[COLOR_HIST_POS if up else COLOR_HIST_NEG for up in up_day],
+                   alpha=0.5, width=1, label='Hacim')
+        ax_vol.plot(dates, volume.rolling(window=config.VOLUME_AVERAGE_PERIOD, min_periods=1).mean(),
+                    color=COLOR_VOLUME_AVG, linewidth=0.9, label=f'Ort. {config.VOLUME_AVERAGE_PERIOD}g')
+
+        # OBV ve A/D kümülatif; görünen aralığın başına göre sıfırlanıp ikinci eksende
+        ax_flow = ax_vol.twinx()
+        ax_flow.plot(dates, ind["obv"] - ind["obv"].iloc[0], color=COLOR_OBV, linewidth=1.1, label='OBV')
+        ax_flow.plot(dates, ind["ad"] - ind["ad"].iloc[0], color=COLOR_AD, linewidth=1.1, label='A/D')
+        ax_flow.axhline(y=0, color='#475569', linewidth=0.6)
+        ax_flow.tick_params(labelright=False)
+        ax_flow.grid(False)
+        ax_flow.legend(loc='upper right', fontsize=7, frameon=True, facecolor='#1e293b',
+                       edgecolor='#334155', labelcolor='white')
+        ax_vol.legend(loc='upper left', fontsize=7, frameon=True, facecolor='#1e293b',
+                      edgecolor='#334155', labelcolor='white')
+    else:
+        ax_vol.text(0.5, 0.5, 'Hacim verisi yok', transform=ax_vol.transAxes,
+                    color='#94a3b8', fontsize=8, ha='center', va='center')
+
+    ax_vol.set_ylabel('Hacim', color='#94a3b8')
+    ax_vol.yaxis.set_major_formatter(plt.FuncFormatter(
+        lambda value, _: f'{value / 1e6:.1f}M' if value >= 1e6 else f'{value / 1e3:.0f}K'))
+
     # ─── AX2: MACD ───────────────────────────────────────────
 
-    ema_fast = close.ewm(span=12, adjust=False).mean()
-    ema_slow = close.ewm(span=26, adjust=False).mean()
-    macd_line = ema_fast - ema_slow
-    signal_line = macd_line.ewm(span=9, adjust=False).mean()
-    histogram = macd_line - signal_line
+    macd_line, signal_line, histogram = ind["macd_line"], ind["macd_signal"], ind["hist"]
 
     ax2.plot(dates, macd_line, color=COLOR_MACD_LINE, linewidth=1.2, label='MACD')
     ax2.plot(dates, signal_line, color=COLOR_SIGNAL_LINE, linewidth=1.0, label='Signal')
@@ -175,13 +238,7 @@ def create_stock_chart(ticker: str, df: pd.DataFrame, analysis: dict,
 
     # ─── AX3: RSI ─────────────────────────────────────────────
 
-    delta = close.diff()
-    gain = delta.where(delta > 0, 0.0)
-    loss = (-delta).where(delta < 0, 0.0)
-    avg_gain = gain.rolling(window=14).mean()
-    avg_loss = loss.rolling(window=14).mean()
-    rs = avg_gain / avg_loss
-    rsi = 100 - (100 / (1 + rs))
+    rsi = ind["rsi"]
 
     ax3.plot(dates, rsi, color=COLOR_RSI, linewidth=1.2, label='RSI 14')
 
@@ -223,22 +280,24 @@ def create_stock_chart(ticker: str, df: pd.DataFrame, analysis: dict,
     plt.tight_layout(pad=1.5)
 
     # Kaydet
-    if save_path is None:
-        os.makedirs("charts", exist_ok=True)
-        save_path = f"charts/{ticker.replace('.', '_')}_{datetime.now().strftime('%Y%m%d')}.png"
-
-    plt.savefig(save_path, dpi=150, bbox_inches='tight',
-               facecolor='#1a1a2e', edgecolor='none')
+    save_kwargs = {"pil_kwargs": settings["pil"]} if settings.get("pil") else {}
+    with plt.rc_context(settings.get("rc", {})):
+        plt.savefig(save_path, format=fmt, dpi=settings.get("dpi", 150), bbox_inches='tight',
+                    facecolor='#1a1a2e', edgecolor='none', **save_kwargs)
     plt.close()
 
+    if cache is not None:
+        cache.put(cache_key, save_path)
+
     print(f"  📊 Grafik kaydedildi: {save_path}")
     return save_path
 
 
-def generate_all_charts(top_stocks: list) -> list:
+def generate_all_charts(top_stocks: list, profile: str = "full") -> list:
     """
     En iyi hisselerin grafiklerini üretir.
     top_stocks: [{"ticker": ..., "dataframe": ..., "analysis": ...}, ...]
+    profile: config.CHART_PROFILES anahtarı
     Döndürür: kaydedilen dosya yolları listesi
     """
     chart_paths = []
@@ -250,7 +309,7 @@ def generate_all_charts(top_stocks: list) -> list:
         if df is None or df.empty:
             continue
 
-        path = create_stock_chart(ticker, df, stock)
+        path = create_stock_chart(ticker, df, stock, profile=profile)
         if path:
             chart_paths.append(path)
 
@@ -8,11 +8,11 @@
 #   python check_performance.py --days 30
 #   python check_performance.py --report
 #   python check_performance.py --history
+#   python check_performance.py --export exports/ --format parquet
 # ============================================================
 
 import argparse
 from performance_tracker import PerformanceTracker, generate_performance_email
-from mail_sender import send_email
 from datetime import datetime
 import sys
 
@@ -105,6 +105,12 @@ def main():
     parser.add_argument("--check", action="store_true", help="Geçmiş önerilerin performansını hesapla")
     parser.add_argument("--email", action="store_true", help="Raporu email olarak gönder")
     parser.add_argument("--limit", type=int, default=20, help="Geçmişte gösterilecek öneri sayısı")
+    parser.add_argument("--export", type=str, metavar="DIR",
+                        help="Geçmişi DIR altına aylık bölümlenmiş dosyalara aktar (artımlı)")
+    parser.add_argument("--format", choices=["parquet", "csv"], default="parquet",
+                        help="Dışa aktarım biçimi (varsayılan: parquet)")
+    parser.add_argument("--full-export", action="store_true",
+                        help="Önceki dışa aktarımı silip her şeyi baştan yaz")
     
     args = parser.parse_args()
     
@@ -120,13 +126,14 @@ def main():
             print(f"  {res['ticker']:12s} ({res['days']:2d} gün) → {res['return']:+6.2f}% ({res['outcome']})")
     
     # Rapor göster
-    if args.report or (not args.history and not args.check):
+    if args.report or (not args.history and not args.check and not args.export):
         report = tracker.generate_report(args.days)
         print_report(report)
         
         # Email gönder
         if args.email:
             print("\n📧 Rapor email olarak gönderiliyor...")
+            from mail_sender import send_email
             history = tracker.get_detailed_history(args.limit)
             html = generate_performance_email(report, history)
             success = send_email(
@@ -142,6 +149,12 @@ def main():
     if args.history:
         history = tracker.get_detailed_history(args.limit)
         print_history(history)
+    
+    # Dışa aktar
+    if args.export:
+        from history_export import export_history
+        export_history(args.export, fmt=args.format, full=args.full_export,
+                       db_path=tracker.db_path)
 
 
 if __name__ == "__main__":
@@ -25,6 +25,153 @@ RSI_PERIOD = 14
 MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
 BOLLINGER_PERIOD = 20
 SMA_SHORT, SMA_LONG = 20, 50
+ATR_PERIOD, ADX_PERIOD = 14, 14
+STOCH_K_PERIOD, STOCH_D_PERIOD = 14, 3
+OBV_TREND_PERIOD, AD_TREND_PERIOD = 10, 20
+VOLUME_AVERAGE_PERIOD = 20       # hacim z-skoru için önceki gün sayısı
+VWAP_PERIOD = 20                 # kayan VWAP penceresi
+# Teknik skora katkı ağırlıkları (indicators.py kaydındaki adlar).
+# 0 = hesaplanır ve detaylarda görünür ama skora/sinyallere katılmaz.
+# Hacim göstergeleri (obv, volume, vwap, ad) yarım ağırlıkla: toplam en fazla ±10 puan
+INDICATOR_WEIGHTS = {
+    "rsi": 1.0, "macd": 1.0, "bollinger": 1.0, "sma": 1.0, "momentum": 1.0,
+    "adx": 0.0, "stochastic": 0.0,
+    "obv": 0.5, "volume": 0.5, "vwap": 0.5, "ad": 0.5,
+}
 WEIGHT_TECHNICAL, WEIGHT_FUNDAMENTAL = 40, 30
 WEIGHT_NEWS_SENTIMENT, WEIGHT_MOMENTUM = 20, 10
 DAILY_RUN_HOUR, DAILY_RUN_MINUTE = 9, 30
+
+# ÇOKLU ZAMAN DİLİMİ (haftalık/aylık barlar günlük veriden türetilir, ek indirme yok)
+MULTI_TIMEFRAME = os.environ.get("MULTI_TIMEFRAME", "0") == "1"
+MTF_LOOKBACK_DAYS = 6 * 365      # aylık göstergeler için ~72 bar
+MTF_WEIGHTS = {"daily": 0.5, "weekly": 0.3, "monthly": 0.2}
+MTF_ALIGNMENT_WEIGHT = 0.2       # trend uyum skorunun teknik skora karışma oranı
+
+# SEÇİM ÇEŞİTLENDİRMESİ
+# sector: aynı sektörden max 1 hisse | correlation: getiri korelasyonu sınırı | both: ikisi birden
+SELECTION_MODE = os.environ.get("SELECTION_MODE", "sector")
+CORRELATION_WINDOW = 60          # son kaç günlük getiri
+CORRELATION_MIN_OBSERVATIONS = 20
+CORRELATION_MAX_PAIRWISE = 0.7   # seçilen hisseler arası en yüksek korelasyon
+
+# HABER CACHE AYARLARI
+NEWS_CACHE_ENABLED = os.environ.get("NEWS_CACHE_ENABLED", "1") != "0"
+NEWS_CACHE_DIR = os.environ.get("NEWS_CACHE_DIR", ".cache/news")
+NEWS_CACHE_TTL_MINUTES = 60
+NEWS_CACHE_MAX_ENTRIES = 200
+
+# HABER İNDEKSİ AYARLARI
+NEWS_INDEX_DB = os.environ.get("NEWS_INDEX_DB", "news_index.db")
+NEWS_DECAY_HALF_LIFE_HOURS = 12
+NEWS_MIN_SECTOR_WEIGHT = 0.05
+NEWS_INDEX_RETENTION_DAYS = 7
+
+# HABER KAYNAK AĞIRLIKLARI (listede olmayanlar varsayılan ağırlığı alır)
+NEWS_DEFAULT_SOURCE_WEIGHT = 1.0
+NEWS_SOURCE_WEIGHTS = {
+    "Reuters": 1.5,
+    "Bloomberg": 1.5,
+    "Financial Times": 1.4,
+    "The Wall Street Journal": 1.4,
+    "CNBC": 1.2,
+    "Anadolu Ajansı": 1.2,
+}
+
+# OFFLINE HABER ARŞİVİ (backtest için)
+NEWS_ARCHIVE_DIR = os.environ.get("NEWS_ARCHIVE_DIR", "news_archive")
+
+# WALK-FORWARD OPTİMİZASYONU (pencere boyları işlem günü cinsinden)
+WALK_FORWARD_TRAIN_DAYS = 250
+WALK_FORWARD_TEST_DAYS = 60
+WALK_FORWARD_MIN_TRADES = 20
+WALK_FORWARD_WORKERS = int(os.environ.get("WALK_FORWARD_WORKERS", "0"))  # 0 = CPU sayısı
+# Eğitim penceresinde denenecek değerler (listede olmayanlar signals.DEFAULT_PARAMS)
+WALK_FORWARD_GRID = {
+    "rsi_oversold": [25, 30, 35],
+    "rsi_overbought": [65, 70, 75],
+    "momentum_strong": [3.0, 5.0, 8.0],
+    "w_macd": [0.5, 1.0, 1.5],
+    "w_sma": [0.5, 1.0, 1.5],
+    "weight_technical": [0.6, 0.7, 0.8],
+    "buy_threshold": [50, 55, 60],
+}
+
+# PORTFÖY BACKTEST'İ (komisyon ve kayma yüzde, tutma süresi işlem günü)
+PORTFOLIO_INITIAL_CAPITAL = 100000.0
+PORTFOLIO_MAX_POSITIONS = 5
+PORTFOLIO_COMMISSION_PCT = 0.1
+PORTFOLIO_SLIPPAGE_PCT = 0.05
+PORTFOLIO_HOLDING_DAYS = 7
+PORTFOLIO_ENTRY = "next_open"  # next_open: sinyal ertesi gün açılışta | close: sinyal günü kapanışta
+PORTFOLIO_LEVEL_EXITS = True   # Fibonacci destek altında stop, direnç üstünde kâr al
+
+# BOOTSTRAP GÜVEN ARALIKLARI (backtest sonuçlarının belirsizliği)
+BOOTSTRAP_RESAMPLES = 5000
+BOOTSTRAP_CONFIDENCE = 0.95
+BOOTSTRAP_BLOCK_DAYS = 5        # aynı günün ve ardışık günlerin işlemleri birlikte örneklenir
+BOOTSTRAP_CHUNK_SIZE = 500      # parça başına örneklem (bellek sınırı)
+BOOTSTRAP_PARALLEL_MIN = 5_000_000  # örneklem × birim bu değeri aşarsa ProcessPool
+
+# TOPLU SENTIMENT SKORLAMA
+NEWS_BATCH_CHUNK_SIZE = 5000
+NEWS_BATCH_PARALLEL_MIN = 20000
+
+# AĞ TEKRAR DENEME & ÇALIŞTIRMA KAYITLARI
+NETWORK_RETRIES = 2
+NETWORK_RETRY_BACKOFF_SECONDS = 1.0
+RUN_LOG_DIR = os.environ.get("RUN_LOG_DIR", "runs")
+
+# FİYAT CACHE'İ (süreçler arası paylaşılan, memory-mapped)
+PRICE_CACHE_ENABLED = os.environ.get("PRICE_CACHE_ENABLED", "1") != "0"
+PRICE_CACHE_DIR = os.environ.get("PRICE_CACHE_DIR", ".cache/prices")
+PRICE_CACHE_TTL_MINUTES = 30
+
+# GRAFİK RENDER CACHE'İ
+CHART_CACHE_ENABLED = os.environ.get("CHART_CACHE_ENABLED", "1") != "0"
+CHART_CACHE_DIR = os.environ.get("CHART_CACHE_DIR", ".cache/charts")
+CHART_CACHE_MAX_MB = 100
+
+# GRAFİK ÇIKTI PROFİLLERİ
+# format: png | webp | svg; pil: Pillow kaydetme ayarları; rc: matplotlib ayarları
+CHART_PROFILES = {
+    # Tam çözünürlük (sadece istenirse: --full-charts / CHART_FULL_RESOLUTION=1)
+    "full": {"format": "png", "dpi": 150, "figsize": (14, 10)},
+    # Mail içi küçük görsel: düşük dpi, optimize PNG (tüm mail istemcileri gösterir)
+    "mail": {"format": "png", "dpi": 64, "figsize": (10, 7.2),
+             "pil": {"optimize": True}},
+    # Web/dashboard için sıkıştırılmış WebP
+    "webp": {"format": "webp", "dpi": 80, "figsize": (10, 7.2),
+             "pil": {"quality": 75, "method": 6}},
+    # Vektör: sadeleştirilmiş path'ler, metinler font olarak
+    "svg": {"format": "svg", "dpi": 72, "figsize": (12, 8.5),
+            "rc": {"path.simplify": True, "path.simplify_threshold": 0.5,
+                   "svg.fonttype": "none"}},
+}
+CHART_MAIL_PROFILE = os.environ.get("CHART_MAIL_PROFILE", "mail")
+CHART_FULL_RESOLUTION = os.environ.get("CHART_FULL_RESOLUTION", "0") == "1"
+
+# TOPLU MAIL GÖNDERİMİ
+# Abone dosyası yoksa sadece MAIL_RECIPIENT'a gönderilir
+MAIL_SUBSCRIBERS_FILE = os.environ.get("MAIL_SUBSCRIBERS_FILE", "subscribers.json")
+MAIL_TRANSPORT = os.environ.get("MAIL_TRANSPORT", "sendgrid")  # sendgrid | stub
+MAIL_STUB_OUTBOX = os.environ.get("MAIL_STUB_OUTBOX", "outbox")
+MAIL_BATCH_SIZE = 500
+MAIL_MAX_CONCURRENCY = 4
+MAIL_REQUESTS_PER_SECOND = 5
+MAIL_MAX_WATCHLIST = 20
+
+# PERFORMANS DEĞERLENDİRME (biriken öneriler bu büyüklükte gruplarla yazılır)
+PERF_CATCHUP_BATCH_SIZE = 500
+
+# GEÇMİŞ DIŞA AKTARIMI (satırlar bu büyüklükte parçalarla okunur/yazılır)
+EXPORT_CHUNK_SIZE = 10000
+
+# DAEMON MODU (sadece localhost'tan erişilen kontrol noktası)
+DAEMON_HOST = os.environ.get("DAEMON_HOST", "127.0.0.1")
+DAEMON_PORT = int(os.environ.get("DAEMON_PORT", "8765"))
+
+# OKUMA API'Sİ (son sonuçlar + öneri geçmişi, sadece localhost)
+API_HOST = os.environ.get("API_HOST", "127.0.0.1")
+API_PORT = int(os.environ.get("API_PORT", "8766"))
+API_SNAPSHOT_PATH = os.path.join(RUN_LOG_DIR, "api_snapshot.json")
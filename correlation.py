@@ -0,0 +1,96 @@
+# ============================================================
+# correlation.py — Aday Hisseler Arası Getiri Korelasyonu
+# ============================================================
+# Bu modül:
+# 1) Analizde zaten indirilmiş kapanış fiyatlarından (stock["dataframe"])
+#    son N günün günlük getirilerini hizalar
+# 2) Tüm adaylar için korelasyon matrisini TEK bir vektörel çağrıyla
+#    hesaplar (çift çift değil); farklı tatil günleri olan piyasalarda
+#    ortak günler kullanılır
+# 3) Matrisi gün + veri parmak izine göre bellekte saklar: daemon'daki
+#    yeniden skorlamalar veri değişmedikçe tekrar hesaplamaz
+# ============================================================
+
+from datetime import date
+
+import config
+
+CACHE_MAX_ENTRIES = 8
+
+_cache = {}
+
+
+class CorrelationMatrix:
+    """Hisse → satır indeksi eşlemeli simetrik korelasyon matrisi."""
+
+    def __init__(self, tickers: list, matrix):
+        self.tickers = list(tickers)
+        self.index = {t: i for i, t in enumerate(self.tickers)}
+        self.matrix = matrix
+
+    def get(self, a: str, b: str) -> float:
+        """İki hissenin korelasyonu; veri yetersizse NaN."""
+        i, j = self.index.get(a), self.index.get(b)
+        if i is None or j is None:
+            return float("nan")
+        return float(self.matrix[i, j])
+
+    def max_with(self, ticker: str, others: list) -> float:
+        """ticker'ın others içindekilerle en yüksek korelasyonu (bilinmeyenler atlanır)."""
+        i = self.index.get(ticker)
+        cols = [self.index[t] for t in others if t in self.index and t != ticker]
+        if i is None or not cols:
+            return float("nan")
+        values = self.matrix[i, cols]
+        values = values[values == values]  # NaN'ları at
+        return float(values.max()) if values.size else float("nan")
+
+
+def _fingerprint(analyses: list) -> tuple:
+    parts = []
+    for stock in analyses:
+        df = stock.get("dataframe")
+        if df is None or df.empty:
+            continue
+        parts.append((stock.get("ticker"), len(df), str(df.index[-1]), float(df["Close"].iloc[-1])))
+    return tuple(parts)
+
+
+def correlation_matrix(analyses: list, window: int = None,
+                       min_observations: int = None) -> CorrelationMatrix:
+    """
+    Analiz listesindeki hisselerin son `window` günlük getiri korelasyonu.
+    Fiyat verisi olmayan hisseler matriste yer almaz (korelasyonları bilinmez).
+    """
+    import pandas as pd
+
+    window = window or config.CORRELATION_WINDOW
+    min_observations = min_observations or config.CORRELATION_MIN_OBSERVATIONS
+
+    fingerprint = _fingerprint(analyses)
+    key = (date.today().isoformat(), window, min_observations, fingerprint)
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
+
+    closes = pd.concat(
+        {stock["ticker"]: stock["dataframe"]["Close"].squeeze()
+         for stock in analyses
+         if stock.get("dataframe") is not None and not stock["dataframe"].empty},
+        axis=1,
+    ) if fingerprint else pd.DataFrame()
+
+    if closes.empty:
+        result = CorrelationMatrix([], None)
+    else:
+        returns = closes.pct_change(fill_method=None).iloc[-window:]
+        corr = returns.corr(min_periods=min_observations)
+        result = CorrelationMatrix(list(corr.columns), corr.to_numpy())
+
+    # Gün değişince (veya daemon'da çok yenileme birikince) eski matrisler atılır
+    for old in [k for k in _cache if k[0] != key[0]]:
+        del _cache[old]
+    if len(_cache) >= CACHE_MAX_ENTRIES:
+        _cache.clear()
+    _cache[key] = result
+    return result
@@ -0,0 +1,347 @@
+# ============================================================
+# daemon.py — Sıcak Durumlu Daemon Modu
+# ============================================================
+# Bu modül:
+# 1) Çalıştırmalar arasında fiyat DataFrame'lerini, teknik analiz
+#    sonuçlarını (indikatör durumu) ve haber toplayıcısını bellekte tutar
+# 2) Yenilemede sadece değişeni günceller: fiyatlarda son bardan
+#    bugüne kadar olan kuyruk çekilir, bar değişmediyse teknik analiz
+#    tekrarlanmaz; haberlerde sadece yeni makaleler skorlanır
+# 3) localhost üzerinde küçük bir HTTP kontrol noktası açar:
+#      GET  /status   → durum özeti
+#      POST /rescore  → bellekteki veriyle yeniden skorlama (milisaniyeler)
+#      POST /refresh  → fiyat/haber yenile + skorla (?what=prices|news|all)
+#      POST /run      → tam çalıştırma (grafik + mail dahil; sürüyorsa 409)
+#      GET  /api/*    → okuma API'si (query_api.py)
+# 4) Günlük çalıştırmayı schedule ile, sıcak durum üzerinden yapar
+#
+# Kullanım:
+#   python main_bot.py --mode daemon
+#   curl -X POST http://127.0.0.1:8765/rescore
+#   curl http://127.0.0.1:8765/api/scores
+# ============================================================
+
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import config
+import query_api
+import replay
+
+
+class WarmState:
+    """
+    Daemon'un çalıştırmalar arasında koruduğu bellek içi durum.
+    Tüm değişiklikler self.lock altında yapılır; kontrol noktası ve
+    zamanlayıcı aynı anda çalışabilir. Tam çalıştırmalar ise run_lock ile
+    sıralanır (aynı mail iki kez gönderilmez).
+    """
+
+    def __init__(self, tickers: list = None, period_days: int = 200):
+        self.tickers = list(tickers or config.ALL_STOCKS)
+        self.period_days = period_days
+        self.lock = threading.RLock()
+        self.run_lock = threading.Lock()  # tam çalıştırmalar (mail dahil) tek tek
+        self.frames = {}        # ticker → OHLCV DataFrame
+        self.fingerprints = {}  # ticker → (bar sayısı, son tarih, son kapanış, son hacim)
+        self.technical = {}     # ticker → score_technical sonucu
+        self.news_data = None   # son analyze_all_news sonucu
+        self.aggregator = None  # sıcak SectorSentimentAggregator
+        self.selected = []
+        self.recommendations = None
+        self.last_result = None
+        self.refreshed_at = {}
+
+    # ─── FİYAT & TEKNİK ────────────────────────────────────
+
+    @staticmethod
+    def _fingerprint(df) -> tuple:
+        if df.empty:
+            return (0,)
+        last = df.iloc[-1]
+        return (len(df), str(df.index[-1]), float(last["Close"]), float(last["Volume"]))
+
+    def _refresh_frame(self, ticker: str, old=None):
+        """
+        Hissenin fiyat verisini günceller. Sıcak veri (old) varsa sadece son
+        bardan bugüne kadar olan kuyruk çekilir ve eklenir.
+        Kayıt/replay modunda --mode run ile aynı anahtarlarla tam pencere
+        download_stock_data üzerinden çekilir (fixture'lar ortak kullanılır).
+        """
+        import pandas as pd
+        from price_cache import load_prices
+
+        if replay.mode() != replay.MODE_OFF:
+            from technical_analyzer import download_stock_data
+            return download_stock_data(ticker, self.period_days)
+
+        end = datetime.now() + timedelta(days=1)
+        window_start = datetime.now() - timedelta(days=self.period_days)
+
+        if old is None or old.empty:
+            return load_prices(ticker, window_start, end)
+
+        tail = load_prices(ticker, old.index[-1].to_pydatetime(), end)
+        if tail.empty:
+            df = old
+        else:
+            # Son bar gün içinde değişmiş olabilir → kuyruktaki değer geçerli
+            df = pd.concat([old[old.index < tail.index[0]], tail])
+        return df[df.index >= pd.Timestamp(window_start.date())]
+
+    def refresh_technical(self) -> list:
+        """
+        Tüm hisselerin fiyatlarını yeniler; verisi değişmeyen hisselerde
+        önceki teknik analiz sonucu tekrar kullanılır. İndirme kilit
+        dışında yapılır; /rescore ve /status bu sırada beklemez.
+        Döndürür: analyze_all_stocks ile aynı biçimde, skora göre sıralı liste
+        """
+        import run_metrics
+        from technical_analyzer import score_technical_batch
+
+        with self.lock:
+            old_frames = dict(self.frames)
+
+        fetched = {}
+        for ticker in self.tickers:
+            with run_metrics.ticker_timer(ticker):
+                try:
+                    fetched[ticker] = self._refresh_frame(ticker, old_frames.get(ticker))
+                except Exception as e:
+                    print(f"  ⚠️  {ticker} yenilenemedi, sıcak veri kullanılıyor: {e}")
+
+        changed = []
+        with self.lock:
+            for ticker in self.tickers:
+                df = fetched.get(ticker, self.frames.get(ticker))
+                if df is None:
+                    continue
+
+                fingerprint = self._fingerprint(df)
+                if fingerprint == self.fingerprints.get(ticker) and ticker in self.technical:
+                    continue
+
+                self.frames[ticker] = df
+                self.fingerprints[ticker] = fingerprint
+                changed.append(ticker)
+
+            # Değişen hisseler tek seferde (toplu gösterge hesabı) skorlanır
+            available = [t for t in changed if not self.frames[t].empty]
+            scored = dict(zip(available, score_technical_batch([self.frames[t] for t in available])))
+            for ticker in changed:
+                if ticker in scored:
+                    result = scored[ticker]
+                    result["dataframe"] = self.frames[ticker]  # Grafik için sakla
+                else:
+                    result = {"score": 0, "error": "Veri bulunamadı"}
+                result["ticker"] = ticker
+                self.technical[ticker] = result
+
+            self.refreshed_at["prices"] = datetime.now().isoformat(timespec="seconds")
+            print(f"  🔁 {len(changed)}/{len(self.tickers)} hissenin verisi değişti, yeniden analiz edildi")
+            return self.stock_analysis()
+
+    def stock_analysis(self) -> list:
+        """Sıcak teknik sonuçlar, skora göre azalan sırada."""
+        results = [self.technical[t] for t in self.tickers if t in self.technical]
+        results.sort(key=lambda x: x.get("score", 0), reverse=True)
+        return results
+
+    # ─── HABERLER ──────────────────────────────────────────
+
+    def refresh_news(self) -> dict:
+        """
+        Haberleri çeker (NewsAPI cache'i ve makale indeksi sayesinde sadece
+        yeni makaleler skorlanır) ve sektör toplayıcısını bellekte tutar.
+        """
+        from news_analyzer import analyze_all_news
+        from article_index import ArticleIndex
+
+        news_data = analyze_all_news()
+        with self.lock:
+            self.news_data = news_data
+            self.aggregator = ArticleIndex().load_aggregator()
+            self.refreshed_at["news"] = datetime.now().isoformat(timespec="seconds")
+        return news_data
+
+    def sector_view(self) -> tuple:
+        """Sektör skor ve ağırlıkları, şu ana göre sönümlenmiş olarak."""
+        if self.aggregator is None:
+            return {}, {}
+        now_ts = replay.now_ts()
+        scores = self.aggregator.scores(now_ts)
+        weights = {
+            sector: round(weight, 3)
+            for sector, weight in self.aggregator.weights(now_ts).items()
+            if sector in scores
+        }
+        return scores, weights
+
+    # ─── SKORLAMA ──────────────────────────────────────────
+
+    def rescore(self) -> dict:
+        """
+        Ağ erişimi olmadan, bellekteki teknik sonuçlar ve sektör
+        toplayıcısıyla seçimi yeniden hesaplar.
+        """
+        from scorer import select_top_stocks, generate_recommendation_text
+
+        t0 = time.perf_counter()
+        with self.lock:
+            sector_scores, sector_weights = self.sector_view()
+            selected = select_top_stocks(self.stock_analysis(), sector_scores, max_count=3)
+            recommendations = generate_recommendation_text(selected, sector_scores,
+                                                           sector_weights=sector_weights)
+            self.selected = selected
+            self.recommendations = recommendations
+            query_api.publish_run(self.stock_analysis(), selected, recommendations,
+                                  sector_scores, write_snapshot=False)
+            self.last_result = {
+                "scored_at": datetime.now().isoformat(timespec="seconds"),
+                "market_mood": recommendations.get("market_mood"),
+                "selected": [
+                    {
+                        "ticker": s.get("ticker"),
+                        "final_score": s.get("final_score"),
+                        "rating": s.get("rating"),
+                        "sector": s.get("sector"),
+                    }
+                    for s in selected
+                ],
+                "sector_scores": sector_scores,
+                "seconds": round(time.perf_counter() - t0, 4),
+            }
+            return self.last_result
+
+    def try_run(self, run_func) -> tuple:
+        """
+        run_func(self)'i başka bir çalıştırma sürmüyorsa çalıştırır.
+        Döndürür: (başladı mı, başarılı mı)
+        """
+        if not self.run_lock.acquire(blocking=False):
+            print("  ⏳ Önceki çalıştırma sürüyor, bu çalıştırma atlandı")
+            return False, False
+        try:
+            return True, bool(run_func(self))
+        finally:
+            self.run_lock.release()
+
+    def status(self) -> dict:
+        with self.lock:
+            return {
+                "running": self.run_lock.locked(),
+                "tickers": len(self.tickers),
+                "warm_frames": len(self.frames),
+                "warm_analyses": len(self.technical),
+                "news_articles": len((self.news_data or {}).get("raw_news", [])),
+                "refreshed_at": dict(self.refreshed_at),
+                "last_result": self.last_result,
+            }
+
+
+class ControlHandler(BaseHTTPRequestHandler):
+    """localhost kontrol noktası. server.state ve server.run_func kullanılır."""
+
+    def _send_json(self, payload: dict, status: int = 200):
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path.startswith("/api/"):
+            query_api.handle_get(self)
+        elif path == "/status":
+            self._send_json(self.server.state.status())
+        else:
+            self._send_json({"error": "bulunamadı"}, status=404)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        state = self.server.state
+        try:
+            if url.path == "/rescore":
+                self._send_json(state.rescore())
+            elif url.path == "/refresh":
+                what = parse_qs(url.query).get("what", ["all"])[0]
+                if what not in ("prices", "news", "all"):
+                    self._send_json({"error": f"geçersiz what: {what}"}, status=400)
+                    return
+                if what in ("prices", "all"):
+                    state.refresh_technical()
+                if what in ("news", "all"):
+                    state.refresh_news()
+                self._send_json(state.rescore())
+            elif url.path == "/run":
+                started, success = state.try_run(self.server.run_func)
+                if not started:
+                    self._send_json({"error": "çalıştırma sürüyor"}, status=409)
+                    return
+                self._send_json({"success": success, "result": state.last_result})
+            else:
+                self._send_json({"error": "bulunamadı"}, status=404)
+        except Exception as e:
+            self._send_json({"error": str(e)}, status=500)
+
+    def log_message(self, format, *args):
+        print(f"  🛰️  [daemon] {self.address_string()} {format % args}")
+
+
+def start_control_server(state: WarmState, run_func, host: str = None,
+                         port: int = None) -> ThreadingHTTPServer:
+    """Kontrol noktasını arka plan thread'inde başlatır."""
+    host = host or config.DAEMON_HOST
+    port = config.DAEMON_PORT if port is None else port
+
+    server = ThreadingHTTPServer((host, port), ControlHandler)
+    server.state = state
+    server.run_func = run_func
+    thread = threading.Thread(target=server.serve_forever, name="daemon-control", daemon=True)
+    thread.start()
+    return server
+
+
+def run_daemon(run_func, tickers: list = None):
+    """
+    Daemon modunu başlatır: sıcak durumla ilk çalıştırmayı yapar,
+    kontrol noktasını açar ve günlük çalıştırmayı zamanlar.
+
+    run_func: state alan tam pipeline (main_bot.run_full_analysis)
+    """
+    import schedule
+
+    state = WarmState(tickers)
+    server = start_control_server(state, run_func)
+    host, port = server.server_address[:2]
+
+    print("\n🛰️  DAEMON MODU AKTIF")
+    print(f"   Kontrol noktası: http://{host}:{port}  (/status, /rescore, /refresh, /run)")
+    print(f"   Her gün {config.DAILY_RUN_HOUR}:{config.DAILY_RUN_MINUTE:02d}'de çalışacak.")
+    if config.MULTI_TIMEFRAME:
+        print("   ⚠️  MULTI_TIMEFRAME daemon modunda yok sayılıyor: sadece günlük skor "
+              "(sıcak pencere 200 gün)")
+    print("   Durdurmak için: Ctrl + C\n")
+
+    schedule.every().day.at(
+        f"{config.DAILY_RUN_HOUR}:{config.DAILY_RUN_MINUTE:02d}"
+    ).do(state.try_run, run_func)
+
+    # Başlangıçta hemen bir kez çalıştır (durumu ısıtır)
+    state.try_run(run_func)
+
+    try:
+        while True:
+            schedule.run_pending()
+            time.sleep(30)
+    except KeyboardInterrupt:
+        print("\n🛑 Daemon durduruluyor...")
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,267 @@
+# ============================================================
+# history_export.py — Performans Geçmişi Dışa Aktarımı
+# ============================================================
+# Bu modül:
+# 1) recommendations ⨝ performance_results satırlarını tek bir sorgu
+#    üzerinden parça parça (fetchmany) okur; bellek kullanımı parça
+#    boyutuyla sınırlıdır
+# 2) Satırları öneri ayına göre bölümlenmiş Parquet (pyarrow, satır
+#    grubu başına bir parça) veya CSV dosyalarına yazar:
+#      <çıktı>/month=YYYY-MM/part-<çalıştırma>.parquet|csv
+# 3) Artımlıdır: son dışa aktarılan sonuç id'si _export_state.json'da
+#    tutulur, sonraki çalıştırma sadece yeni sonuçları yazar ("_" öneki
+#    sayesinde pd.read_parquet(<çıktı>) dosyayı veri kümesine katmaz)
+#
+# Her satır değerlendirilmiş bir (öneri, vade) çiftidir; henüz sonucu
+# olmayan öneriler sonuç yazıldığında dışa aktarılır.
+#
+# Kullanım:
+#   python check_performance.py --export exports/ --format parquet
+#   python history_export.py exports/ --format csv --full
+# ============================================================
+
+import argparse
+import csv
+import glob
+import json
+import os
+import sqlite3
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import config
+
+STATE_FILE = "_export_state.json"
+LEGACY_STATE_FILE = "export_state.json"
+
+# (kolon, SQL ifadesi, tip: int64 | float64 | string | bool)
+EXPORT_COLUMNS = [
+    ("recommendation_id", "r.id", "int64"),
+    ("date", "r.date", "string"),
+    ("ticker", "r.ticker", "string"),
+    ("sector", "r.sector", "string"),
+    ("rating", "r.rating", "string"),
+    ("entry_price", "r.entry_price", "float64"),
+    ("technical_score", "r.technical_score", "float64"),
+    ("final_score", "r.final_score", "float64"),
+    ("support_price", "r.support_price", "float64"),
+    ("resistance_price", "r.resistance_price", "float64"),
+    ("risk_pct", "r.risk_pct", "float64"),
+    ("reward_pct", "r.reward_pct", "float64"),
+    ("rr_ratio", "r.rr_ratio", "float64"),
+    ("signals", "r.signals", "string"),
+    ("result_id", "pr.id", "int64"),
+    ("check_date", "pr.check_date", "string"),
+    ("days_held", "pr.days_held", "int64"),
+    ("exit_price", "pr.exit_price", "float64"),
+    ("return_pct", "pr.return_pct", "float64"),
+    ("hit_resistance", "pr.hit_resistance", "bool"),
+    ("hit_support", "pr.hit_support", "bool"),
+    ("max_price", "pr.max_price", "float64"),
+    ("min_price", "pr.min_price", "float64"),
+    ("volatility", "pr.volatility", "float64"),
+    ("outcome", "pr.outcome", "string"),
+]
+COLUMN_NAMES = [name for name, _, _ in EXPORT_COLUMNS]
+RESULT_ID_COL = COLUMN_NAMES.index("result_id")
+DATE_COL = COLUMN_NAMES.index("date")
+BOOL_COLS = [i for i, (_, _, kind) in enumerate(EXPORT_COLUMNS) if kind == "bool"]
+
+
+class _CsvPartition:
+    def __init__(self, path: str):
+        self.file = open(path, "w", encoding="utf-8", newline="")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(COLUMN_NAMES)
+
+    def write(self, rows: list):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.file.close()
+
+
+class _ParquetPartition:
+    def __init__(self, path: str, pa, pq, schema):
+        self.pa = pa
+        self.schema = schema
+        self.writer = pq.ParquetWriter(path, schema, compression="zstd")
+
+    def write(self, rows: list):
+        columns = list(zip(*rows))
+        arrays = [self.pa.array(values, type=field.type)
+                  for values, field in zip(columns, self.schema)]
+        self.writer.write_table(self.pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+class HistoryExporter:
+    """
+    performance.db içeriğini ay bazında bölümlenmiş dosyalara aktarır.
+    """
+
+    def __init__(self, out_dir: str, db_path: str = "performance.db",
+                 fmt: str = "parquet", chunk_size: int = None):
+        if fmt not in ("parquet", "csv"):
+            raise ValueError(f"Bilinmeyen biçim: {fmt}")
+        self.out_dir = out_dir
+        self.db_path = db_path
+        self.fmt = fmt
+        self.chunk_size = chunk_size or config.EXPORT_CHUNK_SIZE
+        self._arrow = None
+
+    # ─── DURUM ─────────────────────────────────────────────
+
+    def _state_path(self) -> str:
+        return os.path.join(self.out_dir, STATE_FILE)
+
+    def load_state(self) -> dict:
+        # Eski adla yazılmış durum dosyası taşınır (yoksa her şey tekrar aktarılır)
+        legacy = os.path.join(self.out_dir, LEGACY_STATE_FILE)
+        if os.path.exists(legacy) and not os.path.exists(self._state_path()):
+            os.replace(legacy, self._state_path())
+        try:
+            with open(self._state_path(), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"last_result_id": 0}
+
+    def _save_state(self, state: dict):
+        tmp = f"{self._state_path()}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp, self._state_path())
+
+    def reset(self):
+        """Önceki dışa aktarımın parçalarını ve durumunu siler (tam yeniden aktarım)."""
+        for path in glob.glob(os.path.join(self.out_dir, "month=*", "part-*.*")):
+            os.remove(path)
+        if os.path.exists(self._state_path()):
+            os.remove(self._state_path())
+
+    # ─── YAZICILAR ─────────────────────────────────────────
+
+    def _open_partition(self, month: str, run_id: str):
+        part_dir = os.path.join(self.out_dir, f"month={month}")
+        os.makedirs(part_dir, exist_ok=True)
+        path = os.path.join(part_dir, f"part-{run_id}.{self.fmt}")
+
+        if self.fmt == "csv":
+            return path, _CsvPartition(path)
+
+        if self._arrow is None:
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise ImportError("Parquet için pyarrow gerekli: pip install pyarrow "
+                                  "(veya --format csv)")
+            types = {"int64": pa.int64(), "float64": pa.float64(),
+                     "string": pa.string(), "bool": pa.bool_()}
+            schema = pa.schema([(name, types[kind]) for name, _, kind in EXPORT_COLUMNS])
+            self._arrow = (pa, pq, schema)
+        return path, _ParquetPartition(path, *self._arrow)
+
+    # ─── DIŞA AKTARIM ──────────────────────────────────────
+
+    def export(self, full: bool = False) -> dict:
+        """
+        Yeni sonuçları dışa aktarır (full=True ise her şeyi baştan).
+        Hata olursa bu çalıştırmanın dosyaları silinir ve durum değişmez;
+        sonraki çalıştırma aynı noktadan tekrar dener.
+
+        Döndürür: {"rows": yazılan satır, "files": [yollar], "last_result_id": ...}
+        """
+        os.makedirs(self.out_dir, exist_ok=True)
+        if full:
+            self.reset()
+        state = self.load_state()
+        last_id = state.get("last_result_id", 0)
+        run_id = f"{datetime.now().strftime('%Y%m%d%H%M%S')}-{os.getpid()}"
+
+        select = ", ".join(expr for _, expr, _ in EXPORT_COLUMNS)
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT {select}
+            FROM performance_results pr
+            JOIN recommendations r ON r.id = pr.recommendation_id
+            WHERE pr.id > ?
+            ORDER BY pr.id
+        """, (last_id,))
+
+        partitions = {}
+        total = 0
+        try:
+            while True:
+                rows = cursor.fetchmany(self.chunk_size)
+                if not rows:
+                    break
+
+                by_month = {}
+                for row in rows:
+                    if BOOL_COLS:
+                        row = list(row)
+                        for i in BOOL_COLS:
+                            if row[i] is not None:
+                                row[i] = bool(row[i])
+                    by_month.setdefault((row[DATE_COL] or "")[:7] or "unknown", []).append(row)
+
+                for month, month_rows in by_month.items():
+                    if month not in partitions:
+                        partitions[month] = self._open_partition(month, run_id)
+                    partitions[month][1].write(month_rows)
+
+                total += len(rows)
+                last_id = rows[-1][RESULT_ID_COL]
+        except BaseException:
+            for path, writer in partitions.values():
+                writer.close()
+                os.remove(path)
+            raise
+        finally:
+            conn.close()
+
+        for _, writer in partitions.values():
+            writer.close()
+
+        if total:
+            self._save_state({
+                "last_result_id": last_id,
+                "exported_at": datetime.now().isoformat(timespec="seconds"),
+                "format": self.fmt,
+            })
+
+        return {
+            "rows": total,
+            "files": sorted(path for path, _ in partitions.values()),
+            "last_result_id": last_id,
+        }
+
+
+def export_history(out_dir: str, fmt: str = "parquet", full: bool = False,
+                   db_path: str = "performance.db") -> dict:
+    """check_performance.py --export için kısa yol; sonucu ekrana yazar."""
+    result = HistoryExporter(out_dir, db_path=db_path, fmt=fmt).export(full=full)
+    if result["rows"]:
+        print(f"📦 {result['rows']} satır → {len(result['files'])} dosya ({out_dir})")
+    else:
+        print(f"📦 Yeni sonuç yok, dışa aktarılacak satır bulunmadı ({out_dir})")
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Performans geçmişini Parquet/CSV olarak dışa aktar")
+    parser.add_argument("out_dir", type=str, help="Çıktı klasörü")
+    parser.add_argument("--format", choices=["parquet", "csv"], default="parquet",
+                        help="Çıktı biçimi (varsayılan: parquet)")
+    parser.add_argument("--full", action="store_true",
+                        help="Önceki dışa aktarımı silip her şeyi baştan yaz")
+    parser.add_argument("--db", type=str, default="performance.db",
+                        help="Veritabanı dosyası (varsayılan: performance.db)")
+    args = parser.parse_args()
+
+    export_history(args.out_dir, fmt=args.format, full=args.full, db_path=args.db)
@@ -0,0 +1,656 @@
+# ============================================================
+# indicators.py — Gösterge Kaydı (Registry) ve Toplu Hesaplama
+# ============================================================
+# Bu modül:
+# 1) Her göstergeyi tek bir yerde tanımlar: girdileri (OHLCV kolonları),
+#    ısınma süresi (lookback), vektörel hesaplama fonksiyonu, puanlama
+#    kuralı, eşik parametreleri ve sinyal metni
+# 2) Tüm hisseleri (bar × hisse) matrislerine dizip her göstergeyi TÜM
+#    evren için tek seferde hesaplar; gösterge başına Python maliyeti
+#    hisse sayısından bağımsızdır
+# 3) Puanları config.INDICATOR_WEIGHTS ağırlıklarıyla genel olarak
+#    toplar: 50 + Σ ağırlık × puan, 0-100 arasına kırpılır
+#
+# Yeni gösterge eklemek: bir compute (+ isteğe bağlı score/signal)
+# fonksiyonu yazıp register(Indicator(...)) çağırmak ve ağırlığını
+# config.INDICATOR_WEIGHTS'e eklemek yeterlidir. score_technical,
+# backtest paneli (signals.py) ve grafikler aynı kaydı kullanır.
+#
+# Matrisler sağa hizalıdır: son satır her hissenin son barıdır, kısa
+# geçmişli hisselerin başı NaN ile doldurulur ("row" < 0).
+# ============================================================
+
+import numpy as np
+import pandas as pd
+
+import config
+
+MIN_BARS = 60  # score_technical bundan kısa veride 0 döndürür
+INPUT_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+class Indicator:
+    """
+    name:     kayıt adı; ağırlığı config.INDICATOR_WEIGHTS[name], walk-forward
+              parametresi "w_<name>"
+    inputs:   kullandığı girdi kolonları (open/high/low/close/volume)
+    lookback: anlamlı bir değer için gereken en az bar sayısı
+    compute:  f(data) → {çıktı adı: (T, H) ndarray}; data girdileri (T, H)
+              DataFrame olarak ve "row" / "pad" dizilerini içerir
+    score:    f(values, params) → puan dizisi; None ise skora katılmaz
+    signal:   f(son bar değerleri, params) → metin veya None
+    params:   puanlama eşikleri ve varsayılanları
+    score_keys: puanlamanın okuduğu çıktılar (panelde sadece bunlar tutulur)
+    """
+
+    def __init__(self, name: str, label: str, inputs: tuple, lookback: int, compute,
+                 outputs: tuple, score=None, signal=None, params: dict = None,
+                 score_keys: tuple = ()):
+        self.name = name
+        self.label = label
+        self.inputs = tuple(inputs)
+        self.lookback = lookback
+        self.compute = compute
+        self.outputs = tuple(outputs)
+        self.score = score
+        self.signal = signal
+        self.params = dict(params or {})
+        self.score_keys = tuple(score_keys)
+
+
+REGISTRY = {}
+
+
+def register(indicator: Indicator) -> Indicator:
+    """Göstergeyi kayda ekler (aynı adla kayıt varsa değiştirir)."""
+    REGISTRY[indicator.name] = indicator
+    return indicator
+
+
+def scoring_indicators() -> list:
+    return [ind for ind in REGISTRY.values() if ind.score is not None]
+
+
+def default_params() -> dict:
+    """Tüm göstergelerin eşik varsayılanları + w_<ad> ağırlıkları."""
+    params = {}
+    for ind in REGISTRY.values():
+        params.update(ind.params)
+    for ind in scoring_indicators():
+        params[f"w_{ind.name}"] = float(config.INDICATOR_WEIGHTS.get(ind.name, 0.0))
+    return params
+
+
+# ─── TOPLU VERİ ────────────────────────────────────────────
+
+def stack_frames(frames: list) -> dict:
+    """
+    OHLCV DataFrame listesini sağa hizalı (T, H) matrislere dizer.
+    Döndürür: {"open".."volume": DataFrame, "row": bar indeksi (T, H),
+               "pad": doldurma maskesi, "lengths": (H,)}
+    """
+    lengths = np.array([len(df) for df in frames], dtype=int)
+    n_rows = int(lengths.max()) if len(frames) else 0
+    offsets = n_rows - lengths
+
+    data = {}
+    for column in INPUT_COLUMNS:
+        matrix = np.full((n_rows, len(frames)), np.nan)
+        for j, df in enumerate(frames):
+            if lengths[j] and column in df:
+                values = df[column]
+                if values.ndim > 1:  # yfinance çoklu kolon başlığı
+                    values = values.iloc[:, 0]
+                matrix[offsets[j]:, j] = values.to_numpy(dtype="float64")
+        data[column.lower()] = pd.DataFrame(matrix)
+
+    row = np.arange(n_rows)[:, None] - offsets[None, :]
+    data["row"] = row
+    data["pad"] = row < 0
+    data["lengths"] = lengths
+    return data
+
+
+def stack_matrices(columns: dict) -> dict:
+    """
+    Tarih hizalı (T, H) OHLCV DataFrame'lerinden ("open".."volume")
+    stack_frames ile aynı biçimde veri kurar. Hissenin ilk geçerli
+    kapanışından önceki satırlar doldurma sayılır.
+    """
+    close = columns["close"].to_numpy(dtype="float64")
+    valid = ~np.isnan(close)
+    n_rows = len(close)
+    first = np.where(valid.any(axis=0), valid.argmax(axis=0), n_rows)
+
+    data = {key: pd.DataFrame(frame.to_numpy(dtype="float64")) for key, frame in columns.items()}
+    row = np.arange(n_rows)[:, None] - first[None, :]
+    data["row"] = row
+    data["pad"] = row < 0
+    data["lengths"] = n_rows - first
+    return data
+
+
+def compute(data: dict, names: list = None) -> dict:
+    """
+    Kayıtlı göstergeleri (veya names) toplu hesaplar.
+    Döndürür: düz {çıktı adı: (T, H) ndarray} + "close"
+    """
+    values = {"close": data["close"].to_numpy()}
+    for name in names or list(REGISTRY):
+        values.update(REGISTRY[name].compute(data))
+    return values
+
+
+def compute_frame(df: pd.DataFrame, names: list = None) -> dict:
+    """Tek hisse için göstergeler, df indeksli Series olarak (grafikler için)."""
+    values = compute(stack_frames([df]), names)
+    return {key: pd.Series(arr[:, 0], index=df.index) for key, arr in values.items()}
+
+
+def indicator_bonus(name: str, values: dict, params: dict) -> np.ndarray:
+    return REGISTRY[name].score(values, params)
+
+
+def total_score(values: dict, params: dict = None, block_cache: dict = None,
+                valid: np.ndarray = None) -> np.ndarray:
+    """
+    Ağırlıklı teknik skor: 50 + Σ w × puan, 0-100. valid=False hücreler 0.
+    block_cache verilirse puanlar (gösterge, eşik değerleri) anahtarıyla saklanır.
+    """
+    params = {**default_params(), **(params or {})}
+    score = np.full(np.shape(values["close"]), 50.0)
+    for ind in scoring_indicators():
+        weight = params.get(f"w_{ind.name}", 0.0)
+        if weight == 0:
+            continue
+        cache_key = (ind.name,) + tuple(params[k] for k in ind.params)
+        bonus = block_cache.get(cache_key) if block_cache is not None else None
+        if bonus is None:
+            bonus = ind.score(values, params)
+            if block_cache is not None:
+                block_cache[cache_key] = bonus
+        score += weight * bonus
+
+    np.clip(score, 0, 100, out=score)
+    if valid is not None:
+        score[~valid] = 0.0
+    return score
+
+
+def _masked(values, data: dict) -> pd.DataFrame:
+    """Doldurma satırlarını NaN yapar (EWM / kümülatif toplamlar gerçek ilk bardan başlasın)."""
+    return pd.DataFrame(np.where(data["pad"], np.nan, values))
+
+
+# ─── RSI ───────────────────────────────────────────────────
+
+def _compute_rsi(data: dict) -> dict:
+    from technical_analyzer import calculate_rsi
+
+    rsi = calculate_rsi(data["close"], config.RSI_PERIOD).to_numpy(copy=True)
+    # Tek seride ilk RSI_PERIOD - 1 bar NaN'dır; doldurma sıfırları pencereye girmesin
+    rsi[data["row"] < config.RSI_PERIOD - 1] = np.nan
+    return {"rsi": rsi}
+
+
+def _score_rsi(v: dict, p: dict) -> np.ndarray:
+    rsi = v["rsi"]
+    return np.select(
+        [rsi < p["rsi_oversold"], rsi < p["rsi_low"],
+         rsi > p["rsi_overbought"], rsi > p["rsi_strong"]],
+        [15.0, 8.0, -15.0, 3.0], 0.0)
+
+
+def _signal_rsi(v: dict, p: dict) -> str:
+    rsi = v["rsi"] if v["rsi"] == v["rsi"] else 50
+    if rsi < p["rsi_oversold"]:
+        return f"RSI {rsi:.1f} → Oversold (Alım Sinyali)"
+    if rsi < p["rsi_low"]:
+        return f"RSI {rsi:.1f} → Düşük Bölge"
+    if rsi > p["rsi_overbought"]:
+        return f"RSI {rsi:.1f} → Overbought (Dikkat)"
+    if rsi > p["rsi_strong"]:
+        return f"RSI {rsi:.1f} → Normal-Güçlü"
+    return f"RSI {rsi:.1f} → Neutral"
+
+
+register(Indicator(
+    "rsi", "RSI", ("close",), config.RSI_PERIOD + 1, _compute_rsi, ("rsi",),
+    score=_score_rsi, signal=_signal_rsi, score_keys=("rsi",),
+    params={"rsi_oversold": 30.0, "rsi_low": 45.0, "rsi_strong": 55.0, "rsi_overbought": 70.0},
+))
+
+
+# ─── MACD ──────────────────────────────────────────────────
+
+def _compute_macd(data: dict) -> dict:
+    from technical_analyzer import calculate_macd
+
+    macd = calculate_macd(data["close"], config.MACD_FAST, config.MACD_SLOW, config.MACD_SIGNAL)
+    hist = macd["histogram"]
+    return {
+        "macd_line": macd["macd_line"].to_numpy(),
+        "macd_signal": macd["signal_line"].to_numpy(),
+        "hist": np.nan_to_num(hist.to_numpy(), nan=0.0),
+        "hist_prev": np.nan_to_num(hist.shift(1).to_numpy(), nan=0.0),
+    }
+
+
+def _score_macd(v: dict, p: dict) -> np.ndarray:
+    h, prev = v["hist"], v["hist_prev"]
+    return np.select(
+        [(h > 0) & (prev > 0), (h > 0) & (prev <= 0), (h < 0) & (prev > 0), h < 0],
+        [15.0, 12.0, -12.0, -8.0], 0.0)
+
+
+def _signal_macd(v: dict, p: dict) -> str:
+    h, prev = v["hist"], v["hist_prev"]
+    if h > 0 and prev > 0:
+        return "MACD → Güçlü Bullish (Histogram pozitif)"
+    if h > 0 and prev <= 0:
+        return "MACD → Bullish Crossover (Alım Sinyali)"
+    if h < 0 and prev > 0:
+        return "MACD → Bearish Crossover (Satım Sinyali)"
+    if h < 0:
+        return "MACD → Bearish"
+    return None
+
+
+register(Indicator(
+    "macd", "MACD", ("close",), config.MACD_SLOW + config.MACD_SIGNAL, _compute_macd,
+    ("macd_line", "macd_signal", "hist", "hist_prev"),
+    score=_score_macd, signal=_signal_macd, score_keys=("hist", "hist_prev"),
+))
+
+
+# ─── BOLLINGER ─────────────────────────────────────────────
+
+def _compute_bollinger(data: dict) -> dict:
+    from technical_analyzer import calculate_bollinger_bands
+
+    bands = calculate_bollinger_bands(data["close"], config.BOLLINGER_PERIOD)
+    return {
+        "bb_upper": bands["upper"].to_numpy(),
+        "bb_middle": bands["middle"].to_numpy(),
+        "bb_lower": bands["lower"].to_numpy(),
+    }
+
+
+def _score_bollinger(v: dict, p: dict) -> np.ndarray:
+    price, lower, upper = v["close"], v["bb_lower"], v["bb_upper"]
+    return np.select(
+        [price < lower, price < lower * p["bb_near"], price > upper],
+        [10.0, 5.0, -8.0], 0.0)
+
+
+def _signal_bollinger(v: dict, p: dict) -> str:
+    price = v["close"]
+    upper = v["bb_upper"] if v["bb_upper"] == v["bb_upper"] else price
+    lower = v["bb_lower"] if v["bb_lower"] == v["bb_lower"] else price
+    if price < lower:
+        return "Bollinger → Fiyat Alt Bantın Altında (Alım Potansiyeli)"
+    if price < lower * p["bb_near"]:
+        return "Bollinger → Alt Bant Yakınında"
+    if price > upper:
+        return "Bollinger → Fiyat Üst Bantın Üstünde (Dikkat)"
+    return "Bollinger → Band İçinde (Normal)"
+
+
+register(Indicator(
+    "bollinger", "Bollinger", ("close",), config.BOLLINGER_PERIOD, _compute_bollinger,
+    ("bb_upper", "bb_middle", "bb_lower"),
+    score=_score_bollinger, signal=_signal_bollinger, score_keys=("bb_upper", "bb_lower"),
+    params={"bb_near": 1.02},
+))
+
+
+# ─── SMA ───────────────────────────────────────────────────
+
+def _compute_sma(data: dict) -> dict:
+    close = data["close"]
+    return {
+        "sma_short": close.rolling(window=config.SMA_SHORT).mean().to_numpy(),
+        "sma_long": close.rolling(window=config.SMA_LONG).mean().to_numpy(),
+    }
+
+
+def _score_sma(v: dict, p: dict) -> np.ndarray:
+    price, short, long_ = v["close"], v["sma_short"], v["sma_long"]
+    return np.select(
+        [(price > long_) & (short > long_), price > long_, price < long_],
+        [10.0, 5.0, -5.0], 0.0)
+
+
+def _signal_sma(v: dict, p: dict) -> str:
+    price, short, long_ = v["close"], v["sma_short"], v["sma_long"]
+    if price > long_ and short > long_:
+        return "SMA → Güçlü Yukarı Trend (Fiyat > SMA20 > SMA50)"
+    if price > long_:
+        return "SMA → Yukarı Trend"
+    if price < long_:
+        return "SMA → Aşağı Trend"
+    return None
+
+
+register(Indicator(
+    "sma", "SMA", ("close",), config.SMA_LONG, _compute_sma, ("sma_short", "sma_long"),
+    score=_score_sma, signal=_signal_sma, score_keys=("sma_short", "sma_long"),
+))
+
+
+# ─── MOMENTUM ──────────────────────────────────────────────
+
+MOMENTUM_PERIOD = 10
+
+
+def _compute_momentum(data: dict) -> dict:
+    # calculate_momentum ile aynı: son kapanış / (period - 1) bar önceki kapanış
+    close = data["close"].to_numpy()
+    past = data["close"].shift(MOMENTUM_PERIOD - 1).to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        momentum = np.where(past != 0, (close - past) / past * 100, 0.0)
+    return {"momentum": np.nan_to_num(momentum, nan=0.0)}
+
+
+def _score_momentum(v: dict, p: dict) -> np.ndarray:
+    m, strong = v["momentum"], p["momentum_strong"]
+    return np.select(
+        [m > strong, m > 0, m < -strong, m < 0],
+        [10.0, 5.0, -10.0, -3.0], 0.0)
+
+
+def _signal_momentum(v: dict, p: dict) -> str:
+    m, strong = v["momentum"], p["momentum_strong"]
+    if m > strong:
+        return f"Momentum → Güçlü Pozitif ({m:+.1f}%)"
+    if m > 0:
+        return f"Momentum → Pozitif ({m:+.1f}%)"
+    if m < -strong:
+        return f"Momentum → Güçlü Negatif ({m:+.1f}%)"
+    if m < 0:
+        return f"Momentum → Negatif ({m:+.1f}%)"
+    return None
+
+
+register(Indicator(
+    "momentum", "Momentum", ("close",), MOMENTUM_PERIOD, _compute_momentum, ("momentum",),
+    score=_score_momentum, signal=_signal_momentum, score_keys=("momentum",),
+    params={"momentum_strong": 5.0},
+))
+
+
+# ─── ATR (sadece oynaklık bilgisi, skora katılmaz) ──────────
+
+def _true_range(data: dict) -> pd.DataFrame:
+    high, low = data["high"].to_numpy(), data["low"].to_numpy()
+    prev_close = data["close"].shift(1).to_numpy()
+    ranges = np.fmax(np.fmax(high - low, np.abs(high - prev_close)), np.abs(low - prev_close))
+    return _masked(ranges, data)
+
+
+def _wilder(frame: pd.DataFrame, period: int) -> np.ndarray:
+    return frame.ewm(alpha=1.0 / period, adjust=False).mean().to_numpy(copy=True)
+
+
+def _compute_atr(data: dict) -> dict:
+    atr = _wilder(_true_range(data), config.ATR_PERIOD)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        atr_pct = atr / data["close"].to_numpy() * 100
+    return {"atr": atr, "atr_pct": atr_pct}
+
+
+register(Indicator(
+    "atr", "ATR", ("high", "low", "close"), config.ATR_PERIOD, _compute_atr, ("atr", "atr_pct"),
+))
+
+
+# ─── ADX ───────────────────────────────────────────────────
+
+def _compute_adx(data: dict) -> dict:
+    period = config.ADX_PERIOD
+    up = data["high"].diff().to_numpy()
+    down = -data["low"].diff().to_numpy()
+    plus_dm = _masked(np.where((up > down) & (up > 0), up, 0.0), data)
+    minus_dm = _masked(np.where((down > up) & (down > 0), down, 0.0), data)
+
+    atr = _wilder(_true_range(data), period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        plus_di = 100 * _wilder(plus_dm, period) / atr
+        minus_di = 100 * _wilder(minus_dm, period) / atr
+        dx = 100 * np.abs(plus_di - minus_di) / (plus_di + minus_di)
+    adx = _wilder(_masked(np.nan_to_num(dx, nan=0.0), data), period)
+    adx[data["row"] < 2 * period - 1] = np.nan  # DX ortalaması oturmadan anlamsız
+
+    return {"adx": adx, "plus_di": plus_di, "minus_di": minus_di}
+
+
+def _score_adx(v: dict, p: dict) -> np.ndarray:
+    adx, up = v["adx"], v["plus_di"] > v["minus_di"]
+    trending = adx >= p["adx_trend"]
+    return np.select(
+        [trending & up, trending & ~up, (adx >= p["adx_weak"]) & up, adx >= p["adx_weak"]],
+        [10.0, -10.0, 3.0, -3.0], 0.0)
+
+
+def _signal_adx(v: dict, p: dict) -> str:
+    adx = v["adx"]
+    if adx != adx or adx < p["adx_weak"]:
+        return None
+    direction = "Yukarı" if v["plus_di"] > v["minus_di"] else "Aşağı"
+    strength = "Güçlü" if adx >= p["adx_trend"] else "Zayıf"
+    return f"ADX {adx:.1f} → {strength} {direction} Trend"
+
+
+register(Indicator(
+    "adx", "ADX", ("high", "low", "close"), 2 * config.ADX_PERIOD, _compute_adx,
+    ("adx", "plus_di", "minus_di"),
+    score=_score_adx, signal=_signal_adx, score_keys=("adx", "plus_di", "minus_di"),
+    params={"adx_trend": 25.0, "adx_weak": 20.0},
+))
+
+
+# ─── STOKASTİK ─────────────────────────────────────────────
+
+def _compute_stochastic(data: dict) -> dict:
+    lowest = data["low"].rolling(window=config.STOCH_K_PERIOD).min()
+    highest = data["high"].rolling(window=config.STOCH_K_PERIOD).max()
+    span = (highest - lowest).to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        k = np.where(span > 0, (data["close"].to_numpy() - lowest.to_numpy()) / span * 100, 50.0)
+    k[np.isnan(span)] = np.nan
+    d = pd.DataFrame(k).rolling(window=config.STOCH_D_PERIOD).mean().to_numpy()
+    return {"stoch_k": k, "stoch_d": d}
+
+
+def _score_stochastic(v: dict, p: dict) -> np.ndarray:
+    k, d = v["stoch_k"], v["stoch_d"]
+    return np.select(
+        [(k < p["stoch_oversold"]) & (k > d), k < p["stoch_oversold"],
+         (k > p["stoch_overbought"]) & (k < d), k > p["stoch_overbought"]],
+        [10.0, 5.0, -10.0, -5.0], 0.0)
+
+
+def _signal_stochastic(v: dict, p: dict) -> str:
+    k, d = v["stoch_k"], v["stoch_d"]
+    if k != k:
+        return None
+    if k < p["stoch_oversold"]:
+        turn = ", yukarı dönüş (Alım Sinyali)" if k > d else ""
+        return f"Stokastik %K {k:.1f} → Oversold{turn}"
+    if k > p["stoch_overbought"]:
+        turn = ", aşağı dönüş (Dikkat)" if k < d else ""
+        return f"Stokastik %K {k:.1f} → Overbought{turn}"
+    return None
+
+
+register(Indicator(
+    "stochastic", "Stokastik", ("high", "low", "close"),
+    config.STOCH_K_PERIOD + config.STOCH_D_PERIOD, _compute_stochastic, ("stoch_k", "stoch_d"),
+    score=_score_stochastic, signal=_signal_stochastic, score_keys=("stoch_k", "stoch_d"),
+    params={"stoch_oversold": 20.0, "stoch_overbought": 80.0},
+))
+
+
+# ─── OBV ───────────────────────────────────────────────────
+
+def _compute_obv(data: dict) -> dict:
+    period = config.OBV_TREND_PERIOD
+    direction = np.nan_to_num(np.sign(data["close"].diff().to_numpy()), nan=0.0)
+    obv = _masked(direction * data["volume"].to_numpy(), data).cumsum().to_numpy()
+    traded = data["volume"].rolling(window=period).sum().to_numpy()
+    change = np.full_like(obv, np.nan)
+    change[period:] = obv[period:] - obv[:-period]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Son N günün net yönlü hacmi / toplam hacmi: -1 (tam dağıtım) … +1 (tam birikim)
+        trend = change / traded
+    return {"obv": obv, "obv_trend": np.where(np.isfinite(trend), trend, np.nan)}
+
+
+def _score_obv(v: dict, p: dict) -> np.ndarray:
+    trend = v["obv_trend"]
+    return np.select([trend > p["obv_threshold"], trend < -p["obv_threshold"]], [5.0, -5.0], 0.0)
+
+
+def _signal_obv(v: dict, p: dict) -> str:
+    trend = v["obv_trend"]
+    if trend > p["obv_threshold"]:
+        return f"OBV → Birikim (net hacim {trend:+.2f})"
+    if trend < -p["obv_threshold"]:
+        return f"OBV → Dağıtım (net hacim {trend:+.2f})"
+    return None
+
+
+register(Indicator(
+    "obv", "OBV", ("close", "volume"), config.OBV_TREND_PERIOD + 1, _compute_obv, ("obv", "obv_trend"),
+    score=_score_obv, signal=_signal_obv, score_keys=("obv_trend",),
+    params={"obv_threshold": 0.3},
+))
+
+
+# ─── HACİM Z-SKORU ─────────────────────────────────────────
+
+def _compute_volume(data: dict) -> dict:
+    # Bugünün hacmi önceki N günün ortalama / standart sapmasıyla kıyaslanır
+    period = config.VOLUME_AVERAGE_PERIOD
+    volume = data["volume"].to_numpy()
+    close = data["close"].to_numpy()
+    rolling = data["volume"].rolling(window=period)
+    average = np.full_like(volume, np.nan)
+    spread = np.full_like(volume, np.nan)
+    average[1:] = rolling.mean().to_numpy()[:-1]
+    spread[1:] = rolling.std().to_numpy()[:-1]
+    previous = np.full_like(close, np.nan)
+    previous[1:] = close[:-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = volume / average
+        zscore = (volume - average) / spread
+        change = (close / previous - 1) * 100
+    return {
+        "volume_ratio": np.where(np.isfinite(ratio), ratio, np.nan),
+        "volume_zscore": np.where(np.isfinite(zscore), zscore, np.nan),
+        "day_change": change,
+    }
+
+
+def _score_volume(v: dict, p: dict) -> np.ndarray:
+    spike = v["volume_zscore"] >= p["volume_zscore_spike"]
+    change = v["day_change"]
+    return np.select([spike & (change > 0), spike & (change < 0)], [5.0, -5.0], 0.0)
+
+
+def _signal_volume(v: dict, p: dict) -> str:
+    z, ratio, change = v["volume_zscore"], v["volume_ratio"], v["day_change"]
+    if z != z or z < p["volume_zscore_spike"] or change == 0 or change != change:
+        return None
+    direction = "yükselişle" if change > 0 else "düşüşle"
+    return f"Hacim → z={z:.1f} (ortalamanın {ratio:.1f} katı), {direction} ({change:+.1f}%)"
+
+
+register(Indicator(
+    "volume", "Hacim", ("close", "volume"), config.VOLUME_AVERAGE_PERIOD + 1,
+    _compute_volume, ("volume_ratio", "volume_zscore", "day_change"),
+    score=_score_volume, signal=_signal_volume, score_keys=("volume_zscore", "day_change"),
+    params={"volume_zscore_spike": 2.0},
+))
+
+
+# ─── VWAP SAPMASI ──────────────────────────────────────────
+
+def _compute_vwap(data: dict) -> dict:
+    # Kayan N günlük VWAP: Σ(tipik fiyat × hacim) / Σ hacim
+    period = config.VWAP_PERIOD
+    typical = (data["high"] + data["low"] + data["close"]) / 3
+    traded = (typical * data["volume"]).rolling(window=period).sum().to_numpy()
+    volume = data["volume"].rolling(window=period).sum().to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vwap = traded / volume
+        deviation = (data["close"].to_numpy() / vwap - 1) * 100
+    vwap = np.where(np.isfinite(vwap), vwap, np.nan)  # hacimsiz seriler
+    return {"vwap": vwap, "vwap_dev": np.where(np.isfinite(deviation), deviation, np.nan)}
+
+
+def _score_vwap(v: dict, p: dict) -> np.ndarray:
+    dev, stretch = v["vwap_dev"], p["vwap_stretch"]
+    return np.select(
+        [dev > stretch, dev > 0, dev < -stretch, dev < 0],
+        [-3.0, 5.0, 3.0, -5.0], 0.0)
+
+
+def _signal_vwap(v: dict, p: dict) -> str:
+    dev, stretch = v["vwap_dev"], p["vwap_stretch"]
+    if dev != dev or dev == 0:
+        return None
+    if dev > stretch:
+        return f"VWAP → Fiyat %{dev:.1f} üstünde (Aşırı uzamış)"
+    if dev < -stretch:
+        return f"VWAP → Fiyat %{-dev:.1f} altında (Ucuzlamış)"
+    return f"VWAP → Fiyat {'üstünde (Alıcılar baskın)' if dev > 0 else 'altında (Satıcılar baskın)'}"
+
+
+register(Indicator(
+    "vwap", "VWAP", ("high", "low", "close", "volume"), config.VWAP_PERIOD,
+    _compute_vwap, ("vwap", "vwap_dev"),
+    score=_score_vwap, signal=_signal_vwap, score_keys=("vwap_dev",),
+    params={"vwap_stretch": 5.0},
+))
+
+
+# ─── BİRİKİM / DAĞITIM (A/D) ───────────────────────────────
+
+def _compute_ad(data: dict) -> dict:
+    period = config.AD_TREND_PERIOD
+    high, low, close = data["high"].to_numpy(), data["low"].to_numpy(), data["close"].to_numpy()
+    span = high - low
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Kapanışın gün içi aralıktaki yeri: +1 (tepede) … -1 (dipte)
+        multiplier = np.where(span > 0, ((close - low) - (high - close)) / span, 0.0)
+    flow = multiplier * data["volume"].to_numpy()
+    ad = _masked(np.nan_to_num(flow, nan=0.0), data).cumsum().to_numpy()
+    traded = data["volume"].rolling(window=period).sum().to_numpy()
+    change = np.full_like(ad, np.nan)
+    change[period:] = ad[period:] - ad[:-period]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        trend = change / traded
+    return {"ad": ad, "ad_trend": np.where(np.isfinite(trend), trend, np.nan)}
+
+
+def _score_ad(v: dict, p: dict) -> np.ndarray:
+    trend = v["ad_trend"]
+    return np.select([trend > p["ad_threshold"], trend < -p["ad_threshold"]], [5.0, -5.0], 0.0)
+
+
+def _signal_ad(v: dict, p: dict) -> str:
+    trend = v["ad_trend"]
+    if trend > p["ad_threshold"]:
+        return f"A/D → Birikim (kapanışlar gün içi tepeye yakın, {trend:+.2f})"
+    if trend < -p["ad_threshold"]:
+        return f"A/D → Dağıtım (kapanışlar gün içi dibe yakın, {trend:+.2f})"
+    return None
+
+
+register(Indicator(
+    "ad", "A/D", ("high", "low", "close", "volume"), config.AD_TREND_PERIOD + 1,
+    _compute_ad, ("ad", "ad_trend"),
+    score=_score_ad, signal=_signal_ad, score_keys=("ad_trend",),
+    params={"ad_threshold": 0.2},
+))
@@ -1,16 +1,65 @@
+# ============================================================
+# mail_sender.py — Mail Üretimi ve Gönderimi
+# ============================================================
+# Bu modül:
+# 1) Günlük rapor HTML'ini üretir (grafikler cid: ile gömülü)
+# 2) Abonelere toplu gönderim yapar: ortak gövde ve ekler bir kez
+#    hazırlanır, alıcıya özel kısım (takip listesi) SendGrid
+#    personalization'larında substitution olarak gider
+# 3) İstekleri paralel ve hız sınırlı gönderir, alıcı bazında
+#    durum raporlar
+# 4) Test için ağa çıkmayan bir stub transport sunar (MAIL_TRANSPORT=stub)
+# ============================================================
+
 import os
 import base64
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import config
+import run_metrics
+import replay
+
+import importlib.util
+
+# sendgrid ağır bir paket: sadece mail gönderilirken yüklenir
+SENDGRID_AVAILABLE = importlib.util.find_spec("sendgrid") is not None
+
+MIME_TYPES = {
+    ".png": "image/png",
+    ".webp": "image/webp",
+    ".svg": "image/svg+xml",
+}
+
+
+def chart_content_id(path: str) -> str:
+    """Mail içi grafiğin Content-ID'si (HTML'de cid: ile referans verilir)."""
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def _chart_for_ticker(ticker: str, chart_paths: list) -> str:
+    prefix = ticker.replace('.', '_') + "_"
+    for path in chart_paths or []:
+        if os.path.basename(path).startswith(prefix):
+            return path
+    return None
+
+
+# Gövdede alıcıya özel takip listesi bölümünün yeri (SendGrid substitution)
+WATCHLIST_TAG = "-watchlist_section-"
 
-try:
-    import sendgrid
-    from sendgrid.helpers.mail import Mail, Email, To, Content, Attachment, FileContent, FileName, FileType, Disposition
-    SENDGRID_AVAILABLE = True
-except ImportError:
-    SENDGRID_AVAILABLE = False
+# SendGrid tek istekte en fazla 1000 personalization kabul eder
+SENDGRID_MAX_PERSONALIZATIONS = 1000
 
-def generate_html_body(recommendations: dict, chart_paths: list) -> str:
+
+def generate_html_body(recommendations: dict, chart_paths: list,
+                       personalized: bool = False) -> str:
+    """
+    personalized=True ise gövdeye takip listesi yer tutucusu eklenir;
+    her alıcı için send_report tarafından doldurulur.
+    """
     recs = recommendations.get("recommendations", [])
     date_str = datetime.now().strftime("%d %B %Y %H:%M")
     
@@ -29,16 +78,26 @@ def generate_html_body(recommendations: dict, chart_paths: list) -> str:
     """
     if recs:
         for rec in recs:
+            # Grafik mail içine gömülü (Content-ID) küçük görsel olarak gösterilir
+            chart = _chart_for_ticker(rec.get('ticker', ''), chart_paths)
+            chart_html = ""
+            if chart:
+                chart_html = (f'<br><img src="cid:{chart_content_id(chart)}" '
+                              f'alt="{rec.get("ticker")} grafiği" width="600" '
+                              f'style="max-width: 100%; height: auto; margin-top: 10px;">')
             body += f"""
             <div style="border: 1px solid #ddd; padding: 15px; margin-bottom: 15px; border-radius: 8px;">
                 <b style="font-size: 18px;">#{rec.get('rank')} {rec.get('ticker')}</b><br>
                 Sinyal: {rec.get('rating')} | Skor: {rec.get('score')}/100<br>
-                Fiyat: {rec.get('price')}
+                Fiyat: {rec.get('price')}{chart_html}
             </div>
             """
     else:
         body += "<p>Bugün uygun alım sinyali bulunamadı.</p>"
     
+    if personalized:
+        body += WATCHLIST_TAG
+
     body += """
         </div>
         <div style="background: #f8f9fa; padding: 20px; text-align: center; font-size: 11px; color: #666;">
@@ -50,38 +109,277 @@ def generate_html_body(recommendations: dict, chart_paths: list) -> str:
     """
     return body
 
-def send_email(html_body: str, chart_paths: list = None, subject: str = None) -> bool:
+def load_subscribers(path: str = None) -> list:
+    """
+    Abone listesini okur. Dosya yoksa tek alıcı (MAIL_RECIPIENT) döner.
+    Biçim: [{"email": "...", "name": "...", "watchlist": ["THYAO.IS", ...]}, ...]
+    """
+    path = path or config.MAIL_SUBSCRIBERS_FILE
+    if path and os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                subscribers = json.load(f)
+            return [s for s in subscribers if s.get("email")]
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Abone listesi okunamadı ({path}): {e}")
+
+    to_addr = os.environ.get("MAIL_RECIPIENT") or config.MAIL_RECIPIENT
+    return [{"email": to_addr}]
+
+
+def watchlist_section(watchlist: list, stocks_by_ticker: dict) -> str:
+    """Alıcının takip listesindeki hisselerin skorlarını gösteren HTML parçası."""
+    if not watchlist:
+        return ""
+
+    rows = ""
+    for ticker in watchlist[:config.MAIL_MAX_WATCHLIST]:
+        stock = stocks_by_ticker.get(ticker)
+        if stock is None:
+            rows += f"<tr><td>{ticker}</td><td colspan='2'>Analiz edilmedi</td></tr>"
+            continue
+        score = stock.get("final_score", stock.get("score", 0))
+        rows += (f"<tr><td>{ticker}</td><td>{score}/100</td>"
+                 f"<td>{stock.get('rating', '-')}</td></tr>")
+
+    return f"""
+        <div style="padding: 0 20px;">
+            <h3>Takip Listeniz</h3>
+            <table style="border-collapse: collapse; width: 100%;" cellpadding="6">
+                <tr style="background: #f0f0f0;"><th align="left">Hisse</th><th align="left">Skor</th><th align="left">Sinyal</th></tr>
+                {rows}
+            </table>
+        </div>
+    """
+
+
+def encode_attachments(chart_paths: list = None, inline_chart_paths: list = None) -> list:
+    """
+    Ekleri bir kez base64'e çevirir; aynı liste tüm isteklerde kullanılır.
+    chart_paths: ek (attachment) olarak gönderilecek dosyalar (tam çözünürlük)
+    inline_chart_paths: HTML içinde cid: ile gösterilen küçük görseller
+    """
+    attachments = []
+    files = [(path, False) for path in chart_paths or []]
+    files += [(path, True) for path in inline_chart_paths or []]
+    for path, inline in files:
+        if not os.path.exists(path):
+            continue
+        with open(path, 'rb') as f:
+            data = base64.b64encode(f.read()).decode()
+        attachment = {
+            "content": data,
+            "filename": os.path.basename(path),
+            "type": MIME_TYPES.get(os.path.splitext(path)[1].lower(), 'application/octet-stream'),
+            "disposition": "inline" if inline else "attachment",
+        }
+        if inline:
+            attachment["content_id"] = chart_content_id(path)
+        attachments.append(attachment)
+    return attachments
+
+
+class RateLimiter:
+    """Saniyede en fazla N isteğe izin veren basit, thread-safe sınırlayıcı."""
+
+    def __init__(self, per_second: float):
+        self.interval = 1.0 / per_second if per_second > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class SendGridTransport:
+    """SendGrid v3 /mail/send istemcisi. send() HTTP durum kodunu döndürür."""
+
+    def __init__(self, api_key: str):
+        import sendgrid
+        self.client = sendgrid.SendGridAPIClient(api_key=api_key)
+
+    def send(self, payload: dict) -> int:
+        try:
+            response = self.client.client.mail.send.post(request_body=payload)
+            return response.status_code
+        except Exception as e:
+            # python_http_client hataları durum kodunu taşır
+            status_code = getattr(e, "status_code", 0) or 0
+            print(f"X Gönderim hatası ({status_code}): {e}")
+            return status_code
+
+
+class StubTransport:
+    """
+    Ağa çıkmayan test transport'u. İstekleri bellekte tutar, outbox_dir
+    verilirse her isteği JSON dosyası olarak yazar; her zaman 202 döner.
+    """
+
+    def __init__(self, outbox_dir: str = None):
+        self.outbox_dir = outbox_dir
+        self.sent = []
+        self._lock = threading.Lock()
+        if outbox_dir:
+            os.makedirs(outbox_dir, exist_ok=True)
+
+    def send(self, payload: dict) -> int:
+        with self._lock:
+            self.sent.append(payload)
+            index = len(self.sent)
+        if self.outbox_dir:
+            name = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}_{index:04d}.json"
+            with open(os.path.join(self.outbox_dir, name), "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False, indent=1)
+        return 202
+
+
+def get_transport():
+    """config.MAIL_TRANSPORT'a göre transport döndürür; kurulamıyorsa None."""
+    if config.MAIL_TRANSPORT == "stub":
+        return StubTransport(config.MAIL_STUB_OUTBOX)
+
     api_key = os.environ.get("SENDGRID_API_KEY") or config.SENDGRID_API_KEY
     if not api_key:
         print("X SENDGRID_API_KEY bulunamadı!")
-        return False
+        return None
+    if not SENDGRID_AVAILABLE:
+        print("X sendgrid paketi kurulu değil!")
+        return None
+    return SendGridTransport(api_key)
+
+
+def _send_batch(transport, payload: dict, replay_key: str, limiter: RateLimiter) -> int:
+    """Tek isteği gönderir; 429/5xx yanıtlarında geri çekilerek tekrar dener."""
+    if replay.is_replaying():
+        # Kaydı olmayan gönderim başarılı sayılmaz
+        recorded = replay.load("sendgrid", replay_key, default={"status_code": 0})
+        return recorded["status_code"]
+
+    if transport is None:
+        replay.record("sendgrid", replay_key, {"status_code": 0})
+        return 0
+
+    body_size = len(json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+    for attempt in range(config.NETWORK_RETRIES + 1):
+        limiter.wait()
+        status_code = transport.send(payload)
+        run_metrics.add_bytes("sendgrid", body_size)
+        if status_code != 429 and status_code < 500:
+            break
+        if attempt < config.NETWORK_RETRIES:
+            run_metrics.add_retry("sendgrid")
+            time.sleep(config.NETWORK_RETRY_BACKOFF_SECONDS * (2 ** attempt))
+
+    replay.record("sendgrid", replay_key, {"status_code": status_code})
+    return status_code
+
+
+def deliver(html_body: str, recipients: list, subject: str = None,
+            attachments: list = None, transport=None) -> dict:
+    """
+    Aynı gövde ve ekleri alıcılara toplu gönderir.
+    recipients: [{"email": ..., "name": ..., "substitutions": {...}}]
+    Alıcılar config.MAIL_BATCH_SIZE'lık personalization gruplarına bölünür,
+    her grup tek istektir; istekler paralel ve hız sınırlı gönderilir.
+
+    Döndürür: {email: {"ok": bool, "status_code": int, "batch": grup_no}}
+    """
+    if transport is None and not replay.is_replaying():
+        transport = get_transport()
 
-    sg = sendgrid.SendGridAPIClient(api_key=api_key)
     from_addr = os.environ.get("MAIL_SENDER") or config.MAIL_SENDER
-    to_addr = os.environ.get("MAIL_RECIPIENT") or config.MAIL_RECIPIENT
+    subject = subject or f"Analiz Raporu - {datetime.now().strftime('%d.%m.%Y')}"
+    batch_size = max(1, min(config.MAIL_BATCH_SIZE, SENDGRID_MAX_PERSONALIZATIONS))
+
+    batches = [recipients[i:i + batch_size] for i in range(0, len(recipients), batch_size)]
+    jobs = []
+    for batch in batches:
+        personalizations = []
+        for recipient in batch:
+            to = {"email": recipient["email"]}
+            if recipient.get("name"):
+                to["name"] = recipient["name"]
+            personalization = {"to": [to]}
+            if recipient.get("substitutions"):
+                personalization["substitutions"] = recipient["substitutions"]
+            personalizations.append(personalization)
+
+        payload = {
+            "personalizations": personalizations,
+            "from": {"email": from_addr},
+            "subject": subject,
+            "content": [{"type": "text/html", "value": html_body}],
+        }
+        if attachments:
+            payload["attachments"] = attachments
+
+        replay_key = replay.sequence_key("sendgrid", [r["email"] for r in batch])
+        jobs.append((payload, replay_key))
+
+    limiter = RateLimiter(config.MAIL_REQUESTS_PER_SECOND)
+    workers = max(1, min(config.MAIL_MAX_CONCURRENCY, len(jobs)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        status_codes = list(pool.map(
+            lambda job: _send_batch(transport, job[0], job[1], limiter), jobs
+        ))
+
+    results = {}
+    for batch_no, (batch, status_code) in enumerate(zip(batches, status_codes)):
+        for recipient in batch:
+            results[recipient["email"]] = {
+                "ok": status_code in [200, 201, 202],
+                "status_code": status_code,
+                "batch": batch_no,
+            }
+
+    sent = sum(1 for r in results.values() if r["ok"])
+    prefix = "[Replay] " if replay.is_replaying() else ""
+    print(f"{prefix}📧 {sent}/{len(results)} alıcıya gönderildi ({len(jobs)} istek)")
+    return results
+
 
-    mail = Mail(
-        from_email=Email(from_addr),
-        to_emails=To(to_addr),
-        subject=subject or f"Analiz Raporu - {datetime.now().strftime('%d.%m.%Y')}",
-        html_content=Content("text/html", html_body)
-    )
-
-    if chart_paths:
-        for path in chart_paths:
-            if os.path.exists(path):
-                with open(path, 'rb') as f:
-                    data = base64.b64encode(f.read()).decode()
-                    attachment = Attachment(
-                        FileContent(data),
-                        FileName(os.path.basename(path)),
-                        FileType('image/png'),
-                        Disposition('attachment')
-                    )
-                    mail.add_attachment(attachment)
-    try:
-        response = sg.send(mail)
-        return response.status_code in [200, 201, 202]
-    except Exception as e:
-        print(f"X Gönderim hatası: {e}")
-        return False
+def send_report(html_body: str, stock_analysis: list = None, chart_paths: list = None,
+                inline_chart_paths: list = None, subject: str = None,
+                subscribers: list = None, transport=None) -> dict:
+    """
+    Günlük raporu tüm abonelere gönderir. Gövde ve ekler bir kez
+    hazırlanır; takip listesi bölümü her farklı liste için bir kez üretilir.
+    Döndürür: deliver() ile aynı alıcı bazlı durum sözlüğü
+    """
+    subscribers = subscribers if subscribers is not None else load_subscribers()
+    stocks_by_ticker = {s.get("ticker"): s for s in stock_analysis or []}
+    personalized = WATCHLIST_TAG in html_body
+
+    sections = {}
+    recipients = []
+    for subscriber in subscribers:
+        recipient = {"email": subscriber["email"], "name": subscriber.get("name")}
+        if personalized:
+            watchlist = tuple(subscriber.get("watchlist") or [])
+            if watchlist not in sections:
+                sections[watchlist] = watchlist_section(list(watchlist), stocks_by_ticker)
+            recipient["substitutions"] = {WATCHLIST_TAG: sections[watchlist]}
+        recipients.append(recipient)
+
+    attachments = encode_attachments(chart_paths, inline_chart_paths)
+    return deliver(html_body, recipients, subject=subject,
+                   attachments=attachments, transport=transport)
+
+
+def send_email(html_body: str, chart_paths: list = None, subject: str = None,
+               inline_chart_paths: list = None) -> bool:
+    """
+    Tek alıcıya (MAIL_RECIPIENT) gönderim.
+    chart_paths: ek (attachment) olarak gönderilecek dosyalar (tam çözünürlük)
+    inline_chart_paths: HTML içinde cid: ile gösterilen küçük görseller
+    """
+    to_addr = os.environ.get("MAIL_RECIPIENT") or config.MAIL_RECIPIENT
+    html_body = html_body.replace(WATCHLIST_TAG, "")
+    results = deliver(html_body, [{"email": to_addr}], subject=subject,
+                      attachments=encode_attachments(chart_paths, inline_chart_paths))
+    return all(r["ok"] for r in results.values())
@@ -9,29 +9,58 @@
 # 5) Grafikleri üretir
 # 6) Email'i formatlar ve gönderir
 # 7) Her gün otomatik olarak çalıştırılır
+# 8) Daemon modunda çalıştırmalar arası sıcak durumu korur (daemon.py)
 # ============================================================
 
 import sys
 import os
-import schedule
 import time
 from datetime import datetime
 
 # Module imports
+# Ağır bağımlılıklar (pandas, yfinance, matplotlib, sendgrid) ilgili aşamada
+# ilk kullanımda yüklenir; zamanlayıcı boşta beklerken veya grafik olmayan
+# günlerde bu maliyet ödenmez. Bütçe: benchmarks/check_import_time.py
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 import config
-from news_analyzer import analyze_all_news
-from technical_analyzer import analyze_all_stocks
-from scorer import select_top_stocks, generate_recommendation_text
-from chart_generator import generate_all_charts
-from mail_sender import generate_html_body, send_email
+import run_metrics
+import replay
 #from performance_tracker import PerformanceTracker, generate_performance_email
 
 
-def run_full_analysis():
+def run_full_analysis(state=None):
     """
     Tam analiz pipeline'ı çalıştırır.
+    Her aşamanın süresi ölçülür ve runs/ altına JSON kaydı yazılır.
+
+    state: daemon.WarmState verilirse haber/fiyat verisi sıfırdan çekilmez,
+    sıcak durum sadece değişen kısımlarla güncellenir.
     """
+    metrics = run_metrics.start_run()
+    replay.take_misses()
+    try:
+        success = _run_pipeline(metrics, state)
+        # Eşleşmeyen fixture'larla yapılan replay deterministik değildir
+        misses = replay.take_misses()
+        if misses:
+            print(f"\n  ❌ Replay: {len(misses)} kayıt bulunamadı, çalıştırma başarısız sayıldı")
+            for kind, key in misses[:10]:
+                print(f"     {kind}: {key}")
+            metrics.extra.update(success=False, replay_misses=len(misses))
+            success = False
+    finally:
+        run_metrics.end_run()
+        metrics.finish(success=bool(metrics.extra.get("success")))
+        try:
+            path = metrics.write()
+            print(f"  🧾 Çalıştırma kaydı: {path}")
+        except OSError as e:
+            print(f"  ⚠️  Çalıştırma kaydı yazılamadı: {e}")
+
+    return success
+
+
+def _run_pipeline(metrics: run_metrics.RunMetrics, state=None) -> bool:
     print("\n" + "=" * 65)
     print(f"  🚀 BORSA ANALİZ BOT BAŞLANGICI")
     print(f"  📅 {datetime.now().strftime('%d %B %Y, %H:%M:%S')}")
@@ -42,8 +71,14 @@ def run_full_analysis():
     print("-" * 50)
 
     try:
-        news_data = analyze_all_news()
+        with metrics.stage("news"):
+            if state is not None:
+                news_data = state.refresh_news()
+            else:
+                from news_analyzer import analyze_all_news
+                news_data = analyze_all_news()
         sector_scores = news_data.get("sector_scores", {})
+        sector_weights = news_data.get("sector_weights", {})
         top_sectors = news_data.get("top_sectors", [])
         risk_sectors = news_data.get("risk_sectors", [])
 
@@ -54,6 +89,7 @@ def run_full_analysis():
     except Exception as e:
         print(f"  ❌ Haber analizi hatası: {e}")
         sector_scores = {}
+        sector_weights = {}
         news_data = {"raw_news": []}
 
     # ─── STEP 2: TEKNİK ANALİZ ─────────────────────────────
@@ -61,7 +97,12 @@ def run_full_analysis():
     print("-" * 50)
 
     try:
-        stock_analysis = analyze_all_stocks(config.ALL_STOCKS)
+        with metrics.stage("technical"):
+            if state is not None:
+                stock_analysis = state.refresh_technical()
+            else:
+                from technical_analyzer import analyze_all_stocks
+                stock_analysis = analyze_all_stocks(config.ALL_STOCKS)
 
         print(f"\n  ✅ {len(stock_analysis)} hisse analiz edildi.")
         print(f"\n  📋 Top 5 Teknik Skor:")
@@ -74,6 +115,8 @@ def run_full_analysis():
 
     if not stock_analysis:
         print("\n⛔ Hiçbir hisse analiz edilemedi. Bot durduruyor.")
+        metrics.extra.update(success=False, news_count=len(news_data.get("raw_news", [])),
+                             stock_count=0)
         return False
 
     # ─── STEP 3: MASTER SCORING & SEÇIM ────────────────────
@@ -81,16 +124,27 @@ def run_full_analysis():
     print("-" * 50)
 
     try:
-        selected = select_top_stocks(stock_analysis, sector_scores, max_count=3)
-
-        if selected:
-            print(f"\n  🏆 {len(selected)} hisse seçildi:")
-            for s in selected:
-                print(f"     {s.get('ticker', 'N/A'):15s} → {s.get('rating', '')} | Skor: {s.get('final_score', 0)}")
-        else:
-            print("\n  ⚠️  Bu gün yeterli alım sinyali bulunamadı.")
-
-        recommendations = generate_recommendation_text(selected, sector_scores)
+        with metrics.stage("scoring"):
+            if state is not None:
+                state.rescore()
+                selected = state.selected
+            else:
+                from scorer import select_top_stocks
+                selected = select_top_stocks(stock_analysis, sector_scores, max_count=3)
+
+            if selected:
+                print(f"\n  🏆 {len(selected)} hisse seçildi:")
+                for s in selected:
+                    print(f"     {s.get('ticker', 'N/A'):15s} → {s.get('rating', '')} | Skor: {s.get('final_score', 0)}")
+            else:
+                print("\n  ⚠️  Bu gün yeterli alım sinyali bulunamadı.")
+
+            if state is not None:
+                recommendations = state.recommendations
+            else:
+                from scorer import generate_recommendation_text
+                recommendations = generate_recommendation_text(selected, sector_scores,
+                                                               sector_weights=sector_weights)
 
     except Exception as e:
         print(f"  ❌ Scoring hatası: {e}")
@@ -101,11 +155,17 @@ def run_full_analysis():
     print("\n📊 ADIM 4: Grafik üretimi...")
     print("-" * 50)
 
+    # Mail içine küçük görseller gömülür; tam çözünürlük sadece istenirse üretilir
     chart_paths = []
+    full_chart_paths = []
     if selected:
         try:
-            chart_paths = generate_all_charts(selected)
-            print(f"\n  ✅ {len(chart_paths)} grafik üretildi.")
+            with metrics.stage("charts"):
+                from chart_generator import generate_all_charts
+                chart_paths = generate_all_charts(selected, profile=config.CHART_MAIL_PROFILE)
+                if config.CHART_FULL_RESOLUTION:
+                    full_chart_paths = generate_all_charts(selected, profile="full")
+            print(f"\n  ✅ {len(chart_paths) + len(full_chart_paths)} grafik üretildi.")
         except Exception as e:
             print(f"  ❌ Grafik üretim hatası: {e}")
 
@@ -114,8 +174,14 @@ def run_full_analysis():
     print("-" * 50)
 
     try:
-        html_body = generate_html_body(recommendations, chart_paths)
-        success = send_email(html_body, chart_paths)
+        with metrics.stage("mail"):
+            from mail_sender import generate_html_body, send_report
+            html_body = generate_html_body(recommendations, chart_paths, personalized=True)
+            delivery = send_report(html_body, stock_analysis, full_chart_paths,
+                                   inline_chart_paths=chart_paths)
+            success = bool(delivery) and all(r["ok"] for r in delivery.values())
+            metrics.extra["mail_recipients"] = len(delivery)
+            metrics.extra["mail_failed"] = [e for e, r in delivery.items() if not r["ok"]]
 
         if success:
             print("\n  🎉 Süreç başarıyla tamamlandı!")
@@ -132,24 +198,64 @@ def run_full_analysis():
     print("  ℹ️  Performans takibi geçici olarak devre dışı")
     # Geçici olarak kapatıldı - veritabanı hatası düzeltilecek
 
+    # Okuma API'si için sonuçları yayınla (JSON bir kez üretilir)
+    try:
+        import query_api
+        query_api.publish_run(stock_analysis, selected, recommendations, sector_scores)
+    except Exception as e:
+        print(f"  ⚠️  API snapshot'ı yayınlanamadı: {e}")
+
+    metrics.extra.update(
+        success=success,
+        news_count=len(news_data.get("raw_news", [])),
+        new_articles=news_data.get("new_articles", 0),
+        stock_count=len(stock_analysis),
+        selected=[s.get("ticker") for s in selected],
+        chart_count=len(chart_paths) + len(full_chart_paths),
+    )
+    metrics.finish()
+
     # ─── SUMMARY ────────────────────────────────────────────
     print("\n" + "=" * 65)
     print(f"  📋 ÖZET")
     print(f"  📰 Haberler: {len(news_data.get('raw_news', []))} adet analiz edildi")
     print(f"  📈 Hisseler: {len(stock_analysis)} adet analiz edildi")
     print(f"  🏆 Seçilen: {len(selected)} hisse")
-    print(f"  📊 Grafik: {len(chart_paths)} adet üretildi")
+    print(f"  📊 Grafik: {len(chart_paths) + len(full_chart_paths)} adet üretildi")
     print(f"  📧 Email: {'✅ Gönderildi' if success else '❌ Gönderilmedi'}")
     print(f"  💾 Performans: {len(selected)} öneri kaydedildi")
+    metrics.print_summary()
     print("=" * 65)
 
     return success
 
 
+def run_with_profile(func, *args):
+    """
+    Fonksiyonu cProfile altında çalıştırır; .prof dosyasını runs/ altına
+    yazar ve en pahalı 25 çağrıyı (kümülatif) gösterir.
+    """
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func, *args)
+    finally:
+        os.makedirs(config.RUN_LOG_DIR, exist_ok=True)
+        path = os.path.join(config.RUN_LOG_DIR,
+                            f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.prof")
+        profiler.dump_stats(path)
+        print(f"\n🔬 Profil kaydedildi: {path}  (incelemek için: python -m pstats {path})")
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+
+
 def start_scheduler():
     """
     Günlük otomatik çalıştırıcıyı başlatır.
     """
+    import schedule
+
     print("\n⏰ OTOMATIK ZAMANLAYICI AKTIF")
     print(f"   Her gün {config.DAILY_RUN_HOUR}:{config.DAILY_RUN_MINUTE:02d}'de çalışacak.")
     print("   Durdurmak için: Ctrl + C\n")
@@ -172,19 +278,65 @@ if __name__ == "__main__":
     import argparse
 
     parser = argparse.ArgumentParser(description="Borsa Analiz Botu")
-    parser.add_argument("--mode", choices=["run", "schedule", "test"],
+    parser.add_argument("--mode", choices=["run", "schedule", "daemon", "test"],
                        default="run",
-                       help="run=tek seferlik, schedule=otomatik, test=hızlı test")
+                       help="run=tek seferlik, schedule=otomatik, "
+                            "daemon=sıcak durum + kontrol noktası, test=hızlı test")
+    parser.add_argument("--profile", action="store_true",
+                        help="Çalıştırmayı cProfile ile profille (runs/*.prof)")
+    parser.add_argument("--full-charts", action="store_true",
+                        help="Tam çözünürlüklü grafikleri de üret ve ek olarak gönder")
+    parser.add_argument("--multi-timeframe", action="store_true",
+                        help="Haftalık/aylık barlardan trend uyum skorunu da hesapla (daemon hariç)")
+    replay_group = parser.add_mutually_exclusive_group()
+    replay_group.add_argument("--record", type=str, metavar="DIR",
+                              help="Tüm dış yanıtları DIR fixture klasörüne kaydet")
+    replay_group.add_argument("--replay", type=str, metavar="DIR",
+                              help="Dış yanıtları DIR fixture klasöründen oku (ağ kullanılmaz)")
     args = parser.parse_args()
 
+    if args.full_charts:
+        config.CHART_FULL_RESOLUTION = True
+
+    if args.multi_timeframe:
+        if args.mode == "daemon":
+            parser.error("--multi-timeframe daemon modunda desteklenmiyor (sıcak pencere 200 gün)")
+        config.MULTI_TIMEFRAME = True
+
+    if args.record or args.replay:
+        import tempfile
+        # Kayıt ve replay, kalıcı haber indeksinden bağımsız olmalı:
+        # aksi halde önceki çalıştırmalar sektör skorlarını değiştirir
+        config.NEWS_INDEX_DB = os.path.join(tempfile.mkdtemp(prefix="borsa_replay_"), "news_index.db")
+        if args.record:
+            replay.start_recording(args.record)
+            print(f"⏺️  KAYIT MODU - Dış yanıtlar {args.record} klasörüne kaydediliyor")
+        else:
+            replay.start_replay(args.replay)
+            print(f"▶️  REPLAY MODU - Dış yanıtlar {args.replay} klasöründen okunuyor")
+
+    def _run():
+        if args.profile:
+            success = run_with_profile(run_full_analysis)
+        else:
+            success = run_full_analysis()
+        # Replay bir test aracıdır: başarısız çalıştırma çıkış koduna yansır
+        if replay.is_replaying() and not success:
+            sys.exit(1)
+        return success
+
     if args.mode == "test":
         print("🧪 TEST MODU - Sadece 2 hisse ile hızlı kontrol")
         # Test modunda sadece 2 hisseyi analiz et
         config.ALL_STOCKS = ["THYAO.IS", "AAPL"]
-        run_full_analysis()
+        _run()
 
     elif args.mode == "schedule":
         start_scheduler()
 
+    elif args.mode == "daemon":
+        import daemon
+        daemon.run_daemon(run_full_analysis)
+
     else:  # run
-        run_full_analysis()
+        _run()
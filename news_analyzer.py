@@ -10,9 +10,16 @@
 
 import requests
 import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from collections import defaultdict
+import numpy as np
 import config
+from article_index import ArticleIndex, url_hash
+from news_cache import get_news_cache
+import run_metrics
+import replay
 
 # Sektörler ve anahtar kelimeler eşleştirmesi
 SECTOR_KEYWORDS = {
@@ -80,26 +87,84 @@ NEUTRAL_INTENSIFIERS = [
 ]
 
 
-def fetch_news(query: str, lang: str = "en", count: int = 20) -> list:
-    """NewsAPI'den haber çeker."""
+def fetch_news(query: str, lang: str = "en", count: int = 20,
+               use_cache: bool = True) -> list:
+    """
+    NewsAPI'den haber çeker.
+    Aynı sorgu + dil + zaman penceresi için TTL süresince disk cache'i kullanılır.
+    Replay modunda yanıt fixture klasöründen okunur, ağa çıkılmaz.
+    """
+    replay_key = [query, lang, count]
+    if replay.is_replaying():
+        return replay.load("newsapi", replay_key, default=[])
+
+    articles = _fetch_news_live(query, lang, count, use_cache)
+    replay.record("newsapi", replay_key, articles)
+    return articles
+
+
+def _fetch_news_live(query: str, lang: str, count: int, use_cache: bool) -> list:
+    """NewsAPI çağrısı (cache + tekrar deneme)."""
     url = "https://newsapi.org/v2/everything"
+    window_start = (datetime.now() - timedelta(days=2)).strftime("%Y-%m-%d")
     params = {
         "q": query,
         "language": lang,
         "sortBy": "publishedAt",
         "pageSize": count,
-        "from": (datetime.now() - timedelta(days=2)).strftime("%Y-%m-%d"),
+        "from": window_start,
         "apiKey": config.NEWS_API_KEY
     }
 
-    try:
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        return data.get("articles", [])
-    except requests.RequestException as e:
-        print(f"[NewsAPI] Hata: {e}")
-        return []
+    cache = get_news_cache() if use_cache and config.NEWS_CACHE_ENABLED else None
+    cache_key = None
+    if cache is not None:
+        cache_key = cache.make_key(query, lang, window_start, count)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    articles = None
+    for attempt in range(config.NETWORK_RETRIES + 1):
+        try:
+            response = requests.get(url, params=params, timeout=10)
+            response.raise_for_status()
+            run_metrics.add_bytes("newsapi", len(response.content))
+            data = response.json()
+            articles = data.get("articles", [])
+            break
+        except (requests.ConnectionError, requests.Timeout) as e:
+            # Geçici ağ hataları tekrar denenir
+            if attempt >= config.NETWORK_RETRIES:
+                print(f"[NewsAPI] Hata: {e}")
+                return []
+            run_metrics.add_retry("newsapi")
+            time.sleep(config.NETWORK_RETRY_BACKOFF_SECONDS * (attempt + 1))
+        except requests.RequestException as e:
+            print(f"[NewsAPI] Hata: {e}")
+            return []
+
+    # Sadece başarılı yanıtlar cache'lenir
+    if cache is not None:
+        cache.set(cache_key, articles)
+
+    return articles
+
+
+def deduplicate_articles(articles: list) -> list:
+    """
+    Farklı sorgulardan dönen aynı haberleri URL'ye göre tekilleştirir.
+    İlk görülen kayıt korunur, sıra değişmez.
+    """
+    seen = set()
+    unique = []
+    for article in articles:
+        key = url_hash(article)
+        if key in seen:
+            continue
+        seen.add(key)
+        unique.append(article)
+    return unique
 
 
 def calculate_sentiment(text: str) -> dict:
@@ -170,13 +235,163 @@ def classify_sector(text: str) -> list:
     return [s[0] for s in matched_sectors[:3]]  # Max 3 sektör
 
 
+def _current_lexicon() -> tuple:
+    """Batch işçilerine gönderilen sözlük (çalışma anında değiştirilmiş olabilir)."""
+    return (
+        tuple(POSITIVE_WORDS),
+        tuple(NEGATIVE_WORDS),
+        tuple(NEUTRAL_INTENSIFIERS),
+        {sector: tuple(keywords) for sector, keywords in SECTOR_KEYWORDS.items()},
+    )
+
+
+def _score_chunk(texts: list, lexicon: tuple, want_sentiment: bool = True,
+                 want_sectors: bool = True) -> tuple:
+    """
+    Bir metin parçasını toplu skorlar (ProcessPool işçisi).
+    calculate_sentiment / classify_sector ile birebir aynı sonucu üretir:
+    - Sentiment: her benzersiz kelimenin pozitif/negatif/yoğunlaştırıcı
+      bayrakları bir kez hesaplanır, sayımlar NumPy ile birleştirilir
+    - Sektör: her benzersiz anahtar kelime tüm parçada tek bir np.char.find
+      çağrısıyla aranır, eşleşme matrisi × sektör matrisi = sektör sayıları
+    """
+    positive, negative, intensifiers, sector_keywords = lexicon
+    lowered = [(text or "").lower() for text in texts]
+    n = len(lowered)
+
+    scores = labels = sectors = None
+
+    if want_sentiment:
+        pos = np.zeros(n, dtype=np.int64)
+        neg = np.zeros(n, dtype=np.int64)
+        intens = np.zeros(n, dtype=bool)
+        empty = np.zeros(n, dtype=bool)
+        word_flags = {}
+
+        for i, text in enumerate(lowered):
+            if not text:
+                empty[i] = True
+                continue
+            p = q = 0
+            found = False
+            for word in text.split():
+                flags = word_flags.get(word)
+                if flags is None:
+                    flags = (
+                        any(pw in word for pw in positive),
+                        any(nw in word for nw in negative),
+                        any(iw in word for iw in intensifiers),
+                    )
+                    word_flags[word] = flags
+                p += flags[0]
+                q += flags[1]
+                found = found or flags[2]
+            pos[i] = p
+            neg[i] = q
+            intens[i] = found
+
+        # Yoğunlaştırıcı varsa etki 1.5x (int() kırpması korunur)
+        pos = np.where(intens, (pos * 3) // 2, pos)
+        neg = np.where(intens, (neg * 3) // 2, neg)
+        total = pos + neg
+        raw = np.clip((pos - neg) / np.maximum(total, 1), -1.0, 1.0)
+        raw[total == 0] = 0.0
+
+        scores = np.array([round(float(v), 3) for v in raw])
+        labels = np.where(raw >= 0.2, "pozitif", np.where(raw <= -0.2, "negatif", "tarafsız")).astype(object)
+        labels[(total == 0) | empty] = "neutral"
+
+    if want_sectors:
+        sector_names = list(sector_keywords)
+        unique_keywords = sorted({kw.lower() for kws in sector_keywords.values() for kw in kws})
+        kw_column = {kw: j for j, kw in enumerate(unique_keywords)}
+
+        # Anahtar kelime → sektör çarpan matrisi (listede tekrar edenler iki kez sayılır)
+        kw_matrix = np.zeros((len(unique_keywords), len(sector_names)), dtype=np.int64)
+        for s_idx, sector in enumerate(sector_names):
+            for kw in sector_keywords[sector]:
+                kw_matrix[kw_column[kw.lower()], s_idx] += 1
+
+        text_array = np.array(lowered, dtype=str)
+        matches = np.empty((n, len(unique_keywords)), dtype=np.int64)
+        for j, kw in enumerate(unique_keywords):
+            matches[:, j] = np.char.find(text_array, kw) >= 0
+
+        counts = matches @ kw_matrix
+        order = np.argsort(-counts, axis=1, kind="stable")
+
+        sectors = []
+        for i in range(n):
+            row = [sector_names[j] for j in order[i] if counts[i, j] >= 2]
+            sectors.append(row[:3])
+
+    return scores, labels, sectors
+
+
+def score_texts_batch(texts, workers: int = None, chunk_size: int = None,
+                      want_sentiment: bool = True, want_sectors: bool = True) -> dict:
+    """
+    Metin listesini toplu olarak skorlar.
+    Döndürür: {"scores": np.ndarray, "labels": np.ndarray, "sectors": [[...], ...]}
+
+    Büyük arşivlerde metinler parçalara bölünüp ProcessPool ile işlenir.
+    workers=None → config.NEWS_BATCH_PARALLEL_MIN altındaki listeler tek
+    süreçte, üstündekiler tüm çekirdeklerde işlenir.
+    """
+    texts = list(texts)
+    chunk_size = chunk_size or config.NEWS_BATCH_CHUNK_SIZE
+    if workers is None:
+        workers = 1 if len(texts) < config.NEWS_BATCH_PARALLEL_MIN else (os.cpu_count() or 1)
+
+    lexicon = _current_lexicon()
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)] or [[]]
+
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(
+                _score_chunk, chunks,
+                [lexicon] * len(chunks),
+                [want_sentiment] * len(chunks),
+                [want_sectors] * len(chunks),
+            ))
+    else:
+        parts = [_score_chunk(chunk, lexicon, want_sentiment, want_sectors) for chunk in chunks]
+
+    result = {}
+    if want_sentiment:
+        result["scores"] = np.concatenate([p[0] for p in parts])
+        result["labels"] = np.concatenate([p[1] for p in parts])
+    if want_sectors:
+        result["sectors"] = [sectors for p in parts for sectors in p[2]]
+    return result
+
+
+def calculate_sentiment_batch(texts, workers: int = None) -> tuple:
+    """
+    calculate_sentiment'in toplu versiyonu.
+    Döndürür: (scores: np.ndarray, labels: np.ndarray)
+    """
+    result = score_texts_batch(texts, workers=workers, want_sectors=False)
+    return result["scores"], result["labels"]
+
+
+def classify_sector_batch(texts, workers: int = None) -> list:
+    """
+    classify_sector'ün toplu versiyonu.
+    Döndürür: her metin için ilgili sektörler listesi
+    """
+    return score_texts_batch(texts, workers=workers, want_sentiment=False)["sectors"]
+
+
 def analyze_all_news() -> dict:
     """
     Ana analiz fonksiyonu.
-    Tüm haberler çekilir, sektörlerine atanır, sentiment hesaplanır.
+    Tüm haberler çekilir; indekste olmayanlar sektörlerine atanır ve
+    sentiment'i hesaplanır. Sektör skorları indeksteki sönümlü toplamlardan gelir.
     Döndürür:
     {
-        "sector_scores": {sektör: ortalama_score},
+        "sector_scores": {sektör: sönümlü_ortalama_score},
+        "sector_weights": {sektör: sönümlü_toplam_ağırlık},
         "raw_news": [haberlerin detayları],
         "top_sectors": [en olumlu sektörler],
         "risk_sectors": [en riskli sektörler]
@@ -202,42 +417,61 @@ def analyze_all_news() -> dict:
         articles = fetch_news(query, lang=lang, count=10)
         all_articles.extend(articles)
 
-    # Sektörel skor hesaplama
-    sector_scores = defaultdict(list)
-
-    analyzed_news = []
-    for article in all_articles:
-        title = article.get("title", "")
-        description = article.get("description", "")
-        full_text = f"{title} {description}"
-
-        # Sentiment hesapla
-        sentiment = calculate_sentiment(full_text)
+    # Aynı haber birden fazla sorguda dönebilir → sektör skorunu şişirmesin
+    all_articles = deduplicate_articles(all_articles)
 
-        # Sektörü bul
-        sectors = classify_sector(full_text)
+    # Daha önce skorlanmış haberleri indeksten al, sadece yenileri skorla
+    index = ArticleIndex()
+    hashes = [url_hash(article) for article in all_articles]
+    known = index.lookup(hashes)
 
-        # Eğer sektör bulunamadıysa "genel" ekle
-        if not sectors:
-            sectors = ["genel"]
+    # Yeni haberler tek seferde toplu skorlanır (hash'ler tekil, yukarıda tekilleştirildi)
+    new_items = [
+        (article_hash, article)
+        for article, article_hash in zip(all_articles, hashes)
+        if article_hash not in known
+    ]
 
-        # Sektöre skoru ekle
-        for sector in sectors:
-            sector_scores[sector].append(sentiment["score"])
+    texts = [f"{a.get('title') or ''} {a.get('description') or ''}" for _, a in new_items]
+    batch = score_texts_batch(texts)
+
+    new_records = []
+    for i, (article_hash, article) in enumerate(new_items):
+        record = {
+            "url_hash": article_hash,
+            "title": (article.get("title") or "")[:100],
+            "source": (article.get("source") or {}).get("name", "bilinmiyor"),
+            "url": article.get("url", ""),
+            "published_at": article.get("publishedAt", ""),
+            "sentiment": {"score": float(batch["scores"][i]), "label": str(batch["labels"][i])},
+            # Eğer sektör bulunamadıysa "genel" ekle
+            "sectors": batch["sectors"][i] or ["genel"],
+        }
+        new_records.append(record)
+        known[article_hash] = record
 
+    analyzed_news = []
+    for article_hash in hashes:
+        record = known[article_hash]
         analyzed_news.append({
-            "title": title[:100],
-            "sentiment": sentiment,
-            "sectors": sectors,
-            "source": article.get("source", {}).get("name", "bilinmiyor"),
-            "url": article.get("url", "")
+            "title": record["title"],
+            "sentiment": record["sentiment"],
+            "sectors": record["sectors"],
+            "source": record["source"],
+            "url": record["url"]
         })
 
-    # Sektörel ortalama skor hesapla
-    avg_sector_scores = {}
-    for sector, scores in sector_scores.items():
-        avg = sum(scores) / len(scores) if scores else 0
-        avg_sector_scores[sector] = round(avg, 3)
+    # Sektör toplamları sadece yeni haberlerle artımlı güncellenir
+    index.add(new_records)
+    index.prune()
+    aggregator = index.load_aggregator()
+    now_ts = replay.now_ts()
+    avg_sector_scores = aggregator.scores(now_ts)
+    sector_weights = {
+        sector: round(weight, 3)
+        for sector, weight in aggregator.weights(now_ts).items()
+        if sector in avg_sector_scores
+    }
 
     # En olumlu ve en riskli sektörler
     sorted_sectors = sorted(avg_sector_scores.items(), key=lambda x: x[1], reverse=True)
@@ -246,9 +480,11 @@ def analyze_all_news() -> dict:
 
     return {
         "sector_scores": avg_sector_scores,
+        "sector_weights": sector_weights,
         "raw_news": analyzed_news,
         "top_sectors": top_sectors,
         "risk_sectors": risk_sectors,
+        "new_articles": len(new_records),
         "analysis_time": datetime.now().strftime("%Y-%m-%d %H:%M")
     }
 
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+# ============================================================
+# news_archive.py — Offline Haber Arşivi (Backtest için)
+# ============================================================
+# Bu modül:
+# 1) Haberleri tarihe göre bölünmüş JSONL dosyalarında saklar
+#    (articles/YYYY/MM/YYYY-MM-DD.jsonl)
+# 2) Ingest sırasında sentiment ve sektörleri önceden hesaplar; skorlanan
+#    metin (başlık + açıklama) saklanır, rescore aynı metni kullanır
+# 3) Gün sonu sektör skorlarını memory-map edilebilir bir NumPy
+#    matrisine (gün × sektör) yazar
+# 4) Backtest'e tarih bazlı sektör skorunu sabit zamanda verir
+#
+# Kullanım:
+#   python news_archive.py ingest haberler.jsonl newsapi_yaniti.json
+#   python news_archive.py rescore      (sözlük değiştiyse)
+#   python news_archive.py rebuild
+#   python news_archive.py show --date 2025-01-15
+# ============================================================
+
+import argparse
+import glob
+import json
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import config
+from article_index import url_hash, parse_published_at
+from sentiment_aggregator import SectorSentimentAggregator
+from news_analyzer import score_texts_batch
+
+
+SCORES_FILE = "sector_scores.npy"
+META_FILE = "meta.json"
+
+
+def _read_input_articles(path: str) -> list:
+    """
+    Ingest girdisini okur.
+    Desteklenen formatlar: NewsAPI yanıtı (JSON, "articles" alanı),
+    haber listesi (JSON) veya satır başına bir haber (JSONL).
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            return [json.loads(line) for line in f if line.strip()]
+        data = json.load(f)
+
+    if isinstance(data, dict):
+        return data.get("articles", [])
+    return data
+
+
+def _row_text(row: dict) -> str:
+    """Skorlanan metin: ingest ve rescore aynı alanlardan üretir."""
+    return f"{row['title']} {row.get('description', '')}"
+
+
+class NewsArchive:
+    """
+    Tarihe göre bölünmüş offline haber arşivi.
+    Gün sonu sektör skorları (gün × sektör, float32) np.load(mmap_mode="r")
+    ile açılır; bir tarihin skorları satır ofsetinden doğrudan okunur.
+    """
+
+    def __init__(self, root: str = None):
+        self.root = root or config.NEWS_ARCHIVE_DIR
+        self._scores = None
+        self._meta = None
+
+    # ─── Yazma tarafı ─────────────────────────────────────────
+
+    def _partition_path(self, day: str) -> str:
+        return os.path.join(self.root, "articles", day[:4], day[5:7], f"{day}.jsonl")
+
+    def _iter_partitions(self):
+        pattern = os.path.join(self.root, "articles", "*", "*", "*.jsonl")
+        for path in sorted(glob.glob(pattern)):
+            yield os.path.basename(path)[:-len(".jsonl")], path
+
+    @staticmethod
+    def _read_partition(path: str) -> list:
+        with open(path, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def ingest(self, articles: list) -> int:
+        """
+        Ham haberleri skorlayıp günlük bölümlere ekler (URL bazlı tekil).
+        Döndürür: eklenen yeni haber sayısı
+        """
+        by_day = {}
+        for article in articles:
+            ts = parse_published_at(article.get("publishedAt"))
+            day = datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%d")
+            by_day.setdefault(day, []).append((ts, article))
+
+        # Önce yeni haberleri topla, sonra tek seferde toplu skorla
+        pending = []
+        for day, items in sorted(by_day.items()):
+            path = self._partition_path(day)
+            existing = set()
+            if os.path.exists(path):
+                existing = {row["h"] for row in self._read_partition(path)}
+
+            for ts, article in items:
+                article_hash = url_hash(article)
+                if article_hash in existing:
+                    continue
+                existing.add(article_hash)
+                pending.append((day, article_hash, ts, article))
+
+        if not pending:
+            return 0
+
+        scored = [(day, {
+            "h": article_hash,
+            "ts": ts,
+            "published_at": article.get("publishedAt", ""),
+            "source": (article.get("source") or {}).get("name", ""),
+            "title": (article.get("title") or "")[:200],
+            "description": article.get("description") or "",
+            "url": article.get("url", ""),
+        }) for day, article_hash, ts, article in pending]
+        batch = score_texts_batch([_row_text(row) for _, row in scored])
+
+        new_rows = {}
+        for i, (day, row) in enumerate(scored):
+            row["score"] = float(batch["scores"][i])
+            row["label"] = str(batch["labels"][i])
+            row["sectors"] = batch["sectors"][i] or ["genel"]
+            new_rows.setdefault(day, []).append(row)
+
+        for day, rows in new_rows.items():
+            path = self._partition_path(day)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                for row in rows:
+                    f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+        return len(pending)
+
+    def rescore(self, workers: int = None) -> int:
+        """
+        Sözlük değişikliğinden sonra tüm arşivi toplu skorlama ile yeniden skorlar.
+        Döndürür: yeniden skorlanan haber sayısı
+        """
+        partitions = list(self._iter_partitions())
+        all_rows = []
+        spans = []
+        for _, path in partitions:
+            rows = self._read_partition(path)
+            spans.append((path, len(all_rows), len(all_rows) + len(rows)))
+            all_rows.extend(rows)
+
+        if not all_rows:
+            return 0
+
+        # Açıklama alanı olmayan eski satırlar sadece başlıkla skorlanır
+        batch = score_texts_batch([_row_text(row) for row in all_rows], workers=workers)
+        for i, row in enumerate(all_rows):
+            row["score"] = float(batch["scores"][i])
+            row["label"] = str(batch["labels"][i])
+            row["sectors"] = batch["sectors"][i] or ["genel"]
+
+        for path, begin, end in spans:
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for row in all_rows[begin:end]:
+                    f.write(json.dumps(row, ensure_ascii=False) + "\n")
+            os.replace(tmp_path, path)
+
+        return len(all_rows)
+
+    def rebuild(self) -> int:
+        """
+        Tüm bölümleri zaman sırasıyla toplayıcıdan geçirip gün sonu sektör
+        skor matrisini yeniden yazar.
+        Döndürür: matristeki gün sayısı
+        """
+        partitions = list(self._iter_partitions())
+        if not partitions:
+            return 0
+
+        start = datetime.strptime(partitions[0][0], "%Y-%m-%d")
+        end = datetime.strptime(partitions[-1][0], "%Y-%m-%d")
+        n_days = (end - start).days + 1
+
+        day_rows = {}
+        sectors = set()
+        for day, path in partitions:
+            rows = self._read_partition(path)
+            rows.sort(key=lambda r: r["ts"])
+            day_rows[day] = rows
+            for row in rows:
+                sectors.update(row["sectors"])
+
+        sector_list = sorted(sectors)
+        column = {sector: i for i, sector in enumerate(sector_list)}
+        matrix = np.full((n_days, len(sector_list)), np.nan, dtype=np.float32)
+
+        aggregator = SectorSentimentAggregator()
+        for i in range(n_days):
+            day_start = start + timedelta(days=i)
+            day = day_start.strftime("%Y-%m-%d")
+            for row in day_rows.get(day, []):
+                aggregator.add(row["score"], row["sectors"], row["ts"], source=row["source"])
+
+            # Gün sonu (ertesi gün 00:00 UTC) itibarıyla skorlar
+            day_end_ts = (day_start + timedelta(days=1)).replace(tzinfo=timezone.utc).timestamp()
+            for sector, score in aggregator.scores(day_end_ts).items():
+                matrix[i, column[sector]] = score
+
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = os.path.join(self.root, f".{SCORES_FILE}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.save(f, matrix)
+        os.replace(tmp_path, os.path.join(self.root, SCORES_FILE))
+
+        meta = {
+            "start_date": partitions[0][0],
+            "days": n_days,
+            "sectors": sector_list,
+            "half_life_hours": aggregator.half_life_hours,
+            "built_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        with open(os.path.join(self.root, META_FILE), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+
+        self._scores = None
+        self._meta = None
+        return n_days
+
+    # ─── Okuma tarafı ─────────────────────────────────────────
+
+    def _load(self) -> bool:
+        if self._scores is not None:
+            return True
+
+        meta_path = os.path.join(self.root, META_FILE)
+        scores_path = os.path.join(self.root, SCORES_FILE)
+        if not (os.path.exists(meta_path) and os.path.exists(scores_path)):
+            return False
+
+        with open(meta_path, "r", encoding="utf-8") as f:
+            self._meta = json.load(f)
+        self._meta["start"] = datetime.strptime(self._meta["start_date"], "%Y-%m-%d")
+        self._scores = np.load(scores_path, mmap_mode="r")
+        return True
+
+    def available(self) -> bool:
+        """Arşivde sorgulanabilir skor matrisi var mı?"""
+        return self._load()
+
+    def sector_scores_asof(self, date: str) -> dict:
+        """
+        Verilen tarihin başı (00:00 UTC) itibarıyla sektör skorları.
+        O güne ait haberler dahil edilmez → backtest'te ileriye bakış olmaz.
+        Arşiv aralığı dışındaki tarihler için boş sözlük döner (nötr haber).
+        """
+        if not self._load():
+            return {}
+
+        target = datetime.strptime(date[:10], "%Y-%m-%d")
+        row = (target - self._meta["start"]).days - 1
+        if row < 0 or row >= self._meta["days"]:
+            return {}
+
+        values = self._scores[row]
+        return {
+            sector: round(float(values[i]), 3)
+            for i, sector in enumerate(self._meta["sectors"])
+            if not np.isnan(values[i])
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline haber arşivi")
+    parser.add_argument("--archive", type=str, default=None,
+                        help=f"Arşiv dizini (default: {config.NEWS_ARCHIVE_DIR})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = sub.add_parser("ingest", help="Haberleri skorlayıp arşive ekle")
+    ingest_parser.add_argument("files", nargs="+", help="JSON / JSONL haber dosyaları")
+    ingest_parser.add_argument("--no-rebuild", action="store_true",
+                               help="Sektör skor matrisini yeniden oluşturma")
+
+    rescore_parser = sub.add_parser("rescore", help="Tüm arşivi güncel sözlükle yeniden skorla")
+    rescore_parser.add_argument("--workers", type=int, default=None, help="Süreç sayısı")
+
+    sub.add_parser("rebuild", help="Gün sonu sektör skor matrisini yeniden oluştur")
+
+    show_parser = sub.add_parser("show", help="Bir tarihin sektör skorlarını göster")
+    show_parser.add_argument("--date", type=str, required=True, help="YYYY-MM-DD")
+
+    args = parser.parse_args()
+    archive = NewsArchive(args.archive)
+
+    if args.command == "ingest":
+        total = 0
+        for path in args.files:
+            articles = _read_input_articles(path)
+            added = archive.ingest(articles)
+            total += added
+            print(f"  📥 {path}: {len(articles)} haber okundu, {added} yeni eklendi")
+        print(f"✅ Toplam {total} yeni haber arşivlendi")
+        if not args.no_rebuild:
+            days = archive.rebuild()
+            print(f"✅ Sektör skor matrisi güncellendi ({days} gün)")
+
+    elif args.command == "rescore":
+        count = archive.rescore(args.workers)
+        print(f"✅ {count} haber yeniden skorlandı")
+        days = archive.rebuild()
+        print(f"✅ Sektör skor matrisi güncellendi ({days} gün)")
+
+    elif args.command == "rebuild":
+        days = archive.rebuild()
+        print(f"✅ Sektör skor matrisi güncellendi ({days} gün)")
+
+    elif args.command == "show":
+        scores = archive.sector_scores_asof(args.date)
+        if not scores:
+            print("⚠️  Bu tarih için skor bulunamadı")
+        for sector, score in sorted(scores.items(), key=lambda x: x[1], reverse=True):
+            emoji = "🟢" if score > 0 else "🔴" if score < 0 else "⚪"
+            print(f"  {emoji} {sector:25s} → {score:+.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# ============================================================
+# news_cache.py — NewsAPI Yanıt Cache'i
+# ============================================================
+# Bu modül:
+# 1) NewsAPI yanıtlarını diske JSON olarak kaydeder
+# 2) Anahtar: sorgu + dil + zaman penceresi + haber sayısı
+# 3) TTL dolan kayıtları geçersiz sayar
+# 4) Kayıt sayısı limiti aşılınca en az kullanılanı siler (LRU)
+# ============================================================
+
+import os
+import json
+import time
+import hashlib
+import config
+
+
+class NewsCache:
+    """
+    Disk üzerinde TTL + LRU destekli basit haber cache'i.
+    Her kayıt ayrı bir JSON dosyasıdır; dosyanın mtime'ı son erişim
+    zamanı olarak kullanılır (LRU), oluşturulma zamanı ise dosyanın
+    içinde saklanır (TTL).
+    """
+
+    def __init__(self, cache_dir: str = None, ttl_minutes: int = None,
+                 max_entries: int = None):
+        self.cache_dir = cache_dir or config.NEWS_CACHE_DIR
+        self.ttl_seconds = (ttl_minutes if ttl_minutes is not None
+                            else config.NEWS_CACHE_TTL_MINUTES) * 60
+        self.max_entries = (max_entries if max_entries is not None
+                            else config.NEWS_CACHE_MAX_ENTRIES)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(query: str, lang: str, window_start: str, count: int) -> str:
+        """Sorgu parametrelerinden sabit uzunlukta cache anahtarı üretir."""
+        raw = json.dumps([query, lang, window_start, count], ensure_ascii=False)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str):
+        """
+        Cache'teki haberleri döndürür.
+        Kayıt yoksa veya TTL dolmuşsa None döner.
+        """
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - entry.get("created_at", 0) > self.ttl_seconds:
+            self._remove(path)
+            return None
+
+        # LRU: son erişim zamanını güncelle
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+        return entry.get("articles", [])
+
+    def set(self, key: str, articles: list):
+        """Haberleri cache'e yazar (atomik), gerekirse eski kayıtları siler."""
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        entry = {"created_at": time.time(), "articles": articles}
+
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[NewsCache] Yazma hatası: {e}")
+            self._remove(tmp_path)
+            return
+
+        self._evict()
+
+    def clear(self):
+        """Tüm cache kayıtlarını siler."""
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".json"):
+                self._remove(os.path.join(self.cache_dir, name))
+
+    def _evict(self):
+        """Kayıt sayısı limiti aşıldıysa en uzun süredir kullanılmayanları siler."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                entries.append((os.path.getmtime(path), path))
+            except OSError:
+                continue
+
+        overflow = len(entries) - self.max_entries
+        if overflow <= 0:
+            return
+
+        entries.sort()
+        for _, path in entries[:overflow]:
+            self._remove(path)
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+_default_cache = None
+
+
+def get_news_cache() -> NewsCache:
+    """Modül genelinde paylaşılan cache nesnesini döndürür."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = NewsCache()
+    return _default_cache
@@ -4,16 +4,17 @@
 # Bu modül:
 # 1) Her gün yapılan önerileri SQLite DB'ye kaydeder
 # 2) 7, 14, 30 gün sonra gerçek sonuçları kontrol eder
+#    (kaçırılan günler dahil: vadesi dolmuş tüm öneriler toplu işlenir)
 # 3) Başarı oranını hesaplar ve raporlar
 # 4) Hangi sinyallerin daha başarılı olduğunu analiz eder
 # ============================================================
 
 import sqlite3
-import yfinance as yf
 from datetime import datetime, timedelta
+from itertools import groupby, islice
 import json
-from typing import List, Dict
-import pandas as pd
+from typing import List, Dict, Iterator
+import config
 
 
 class PerformanceTracker:
@@ -89,6 +90,25 @@ class PerformanceTracker:
             )
         """)
         
+        # Vadesi dolan önerileri bulmak için
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_recommendations_date
+            ON recommendations (date)
+        """)
+        
+        # Geçmiş filtreleri (her indeks rowid'i de içerir → (tarih, id) sıralı tarama)
+        for column in ("ticker", "sector", "rating"):
+            cursor.execute(f"""
+                CREATE INDEX IF NOT EXISTS idx_recommendations_{column}_date
+                ON recommendations ({column}, date)
+            """)
+        
+        # Sonuçlar öneri bazında okunur (geçmiş sayfaları, kontrol sorguları)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_results_recommendation
+            ON performance_results (recommendation_id, days_held)
+        """)
+        
         conn.commit()
         conn.close()
         print("✅ Performans veritabanı hazır")
@@ -133,50 +153,113 @@ class PerformanceTracker:
         """
         Geçmiş önerilerin performansını kontrol et.
         days_to_check: [7, 14, 30] → 7, 14, 30 gün sonraki performansı
+        
+        Vadesi dolmuş ama henüz değerlendirilmemiş tüm (öneri, vade) çiftleri
+        işlenir; checker'ın çalışmadığı günlerde biriken öneriler de yakalanır.
+        """
+        return self.catch_up(days_to_check)
+    
+    def pending_evaluations(self, days_to_check: List[int] = [7, 14, 30],
+                            as_of: str = None) -> List[tuple]:
+        """
+        Vadesi dolmuş ve sonucu olmayan (öneri, vade) çiftlerini tek sorguda getirir.
+        Döndürür: [(rec_id, ticker, entry_price, date, days, support, resistance)]
+        (hisseye ve tarihe göre sıralı)
         """
+        as_of = as_of or datetime.now().strftime("%Y-%m-%d")
+        horizons = ",".join("(?)" for _ in days_to_check)
+        
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
+        cursor.execute(f"""
+            WITH horizons(days) AS (VALUES {horizons})
+            SELECT r.id, r.ticker, r.entry_price, r.date, h.days,
+                   r.support_price, r.resistance_price
+            FROM recommendations r
+            JOIN horizons h ON r.date <= date(?, '-' || h.days || ' days')
+            WHERE NOT EXISTS (
+                SELECT 1 FROM performance_results pr
+                WHERE pr.recommendation_id = r.id AND pr.days_held = h.days
+            )
+            ORDER BY r.ticker, r.date, h.days
+        """, (*days_to_check, as_of))
+        pending = cursor.fetchall()
+        conn.close()
         
+        return pending
+    
+    def catch_up(self, days_to_check: List[int] = [7, 14, 30],
+                 batch_size: int = None) -> List[Dict]:
+        """
+        Biriken tüm değerlendirmeleri tek geçişte işler.
+        - Her hisse için fiyat verisi bir kez çekilir (tüm vadeleri kapsayan aralık)
+        - Sonuçlar batch_size'lık gruplar halinde yazılıp commit edilir;
+          kesilirse kaldığı yerden devam eder (yazılanlar artık bekleyen değildir)
+        """
+        import numpy as np
+        from price_cache import load_prices
+        
+        batch_size = batch_size or config.PERF_CATCHUP_BATCH_SIZE
+        pending = self.pending_evaluations(days_to_check)
+        if not pending:
+            return []
+        
+        tickers = len({row[1] for row in pending})
+        print(f"🔍 {len(pending)} bekleyen değerlendirme ({tickers} hisse)")
+        
+        check_date = datetime.now().strftime("%Y-%m-%d")
         results = []
+        rows = []
         
-        for days in days_to_check:
-            target_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
-            
-            # O tarihteki önerileri al
-            cursor.execute("""
-                SELECT id, ticker, entry_price, support_price, resistance_price
-                FROM recommendations
-                WHERE date = ?
-            """, (target_date,))
-            
-            recommendations = cursor.fetchall()
-            
-            for rec_id, ticker, entry_price, support, resistance in recommendations:
-                # Bu öneri için performans daha önce hesaplandı mı?
-                cursor.execute("""
-                    SELECT id FROM performance_results
-                    WHERE recommendation_id = ? AND days_held = ?
-                """, (rec_id, days))
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        def flush():
+            cursor.executemany("""
+                INSERT INTO performance_results (
+                    recommendation_id, check_date, days_held,
+                    exit_price, return_pct, hit_resistance, hit_support,
+                    max_price, min_price, volatility, outcome
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+            conn.commit()
+            rows.clear()
+        
+        try:
+            for ticker, group in groupby(pending, key=lambda row: row[1]):
+                group = list(group)
                 
-                if cursor.fetchone():
-                    continue  # Zaten hesaplanmış
+                # Hissenin tüm vadelerini kapsayan tek fiyat çekimi
+                first = datetime.strptime(group[0][3], "%Y-%m-%d")
+                last = max(datetime.strptime(row[3], "%Y-%m-%d") + timedelta(days=row[4])
+                           for row in group)
+                try:
+                    df = load_prices(ticker, first, last)
+                except Exception as e:
+                    print(f"❌ {ticker} fiyat verisi alınamadı: {e}")
+                    continue
+                if df.empty:
+                    continue
                 
-                # Gerçek performansı hesapla
-                perf = self._calculate_actual_performance(
-                    ticker, entry_price, target_date, days, support, resistance
-                )
+                # Pencereler DataFrame filtrelemeden, sıralı tarih dizisinde ikili aramayla bulunur
+                index = df.index.values
+                close = df["Close"].to_numpy(dtype=float)
+                high = df["High"].to_numpy(dtype=float)
+                low = df["Low"].to_numpy(dtype=float)
                 
-                if perf:
-                    # Veritabanına kaydet
-                    cursor.execute("""
-                        INSERT INTO performance_results (
-                            recommendation_id, check_date, days_held,
-                            exit_price, return_pct, hit_resistance, hit_support,
-                            max_price, min_price, volatility, outcome
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
+                for rec_id, _, entry_price, date, days, support, resistance in group:
+                    start = datetime.strptime(date, "%Y-%m-%d")
+                    lo, hi = index.searchsorted(
+                        [np.datetime64(start), np.datetime64(start + timedelta(days=days))]
+                    )
+                    perf = self._performance_from_arrays(close[lo:hi], high[lo:hi], low[lo:hi],
+                                                         entry_price, support, resistance)
+                    if not perf:
+                        continue  # veri yok → sonraki çalıştırmada tekrar denenir
+                    
+                    rows.append((
                         rec_id,
-                        datetime.now().strftime("%Y-%m-%d"),
+                        check_date,
                         days,
                         perf["exit_price"],
                         perf["return_pct"],
@@ -187,16 +270,20 @@ class PerformanceTracker:
                         perf["volatility"],
                         perf["outcome"]
                     ))
-                    
                     results.append({
                         "ticker": ticker,
                         "days": days,
                         "return": perf["return_pct"],
                         "outcome": perf["outcome"]
                     })
-        
-        conn.commit()
-        conn.close()
+                    
+                    if len(rows) >= batch_size:
+                        flush()
+            
+            if rows:
+                flush()
+        finally:
+            conn.close()
         
         return results
     
@@ -210,53 +297,69 @@ class PerformanceTracker:
             start = datetime.strptime(start_date, "%Y-%m-%d")
             end = start + timedelta(days=days)
             
-            # Hisse verisini çek
-            df = yf.download(ticker, start=start, end=end, progress=False)
-            
-            if df.empty or len(df) < 2:
-                return None
-            
-            # Fiyatları düzelt (multi-index varsa)
-            if isinstance(df.columns, pd.MultiIndex):
-                df.columns = df.columns.get_level_values(0)
-            
-            exit_price = float(df["Close"].iloc[-1])
-            max_price = float(df["High"].max())
-            min_price = float(df["Low"].min())
-            
-            # Return hesapla
-            return_pct = ((exit_price - entry_price) / entry_price) * 100
+            # Hisse verisini çek (paylaşımlı fiyat cache'i üzerinden)
+            # pandas/yfinance sadece gerçekten fiyat gerektiğinde yüklenir
+            from price_cache import load_prices
+            df = load_prices(ticker, start, end)
             
-            # Volatilite
-            volatility = float(df["Close"].pct_change().std() * 100)
-            
-            # Destek/Direnç test edildi mi?
-            hit_resistance = max_price >= resistance if resistance else False
-            hit_support = min_price <= support if support else False
-            
-            # Outcome belirle
-            if return_pct >= 5:
-                outcome = "SUCCESS"  # %5+ kazanç
-            elif return_pct >= 0:
-                outcome = "NEUTRAL"  # 0-5% arası
-            else:
-                outcome = "LOSS"     # Zarar
-            
-            return {
-                "exit_price": round(exit_price, 2),
-                "return_pct": round(return_pct, 2),
-                "hit_resistance": hit_resistance,
-                "hit_support": hit_support,
-                "max_price": round(max_price, 2),
-                "min_price": round(min_price, 2),
-                "volatility": round(volatility, 2),
-                "outcome": outcome
-            }
+            return self._performance_from_prices(df, entry_price, support, resistance)
         
         except Exception as e:
             print(f"❌ {ticker} performans hesaplama hatası: {e}")
             return None
     
+    @classmethod
+    def _performance_from_prices(cls, df, entry_price: float,
+                                 support: float = None, resistance: float = None) -> Dict:
+        """Vade penceresindeki OHLCV verisinden performans metrikleri."""
+        if df.empty:
+            return None
+        return cls._performance_from_arrays(
+            df["Close"].to_numpy(dtype=float), df["High"].to_numpy(dtype=float),
+            df["Low"].to_numpy(dtype=float), entry_price, support, resistance
+        )
+    
+    @staticmethod
+    def _performance_from_arrays(close, high, low, entry_price: float,
+                                 support: float = None, resistance: float = None) -> Dict:
+        """Kapanış/yüksek/düşük dizilerinden performans metrikleri."""
+        if len(close) < 2:
+            return None
+        
+        exit_price = float(close[-1])
+        max_price = float(high.max())
+        min_price = float(low.min())
+        
+        # Return hesapla
+        return_pct = ((exit_price - entry_price) / entry_price) * 100
+        
+        # Volatilite (pct_change().std() ile aynı: örneklem std, ddof=1)
+        changes = close[1:] / close[:-1] - 1
+        volatility = float(changes.std(ddof=1) * 100) if len(changes) > 1 else float("nan")
+        
+        # Destek/Direnç test edildi mi?
+        hit_resistance = max_price >= resistance if resistance else False
+        hit_support = min_price <= support if support else False
+        
+        # Outcome belirle
+        if return_pct >= 5:
+            outcome = "SUCCESS"  # %5+ kazanç
+        elif return_pct >= 0:
+            outcome = "NEUTRAL"  # 0-5% arası
+        else:
+            outcome = "LOSS"     # Zarar
+        
+        return {
+            "exit_price": round(exit_price, 2),
+            "return_pct": round(return_pct, 2),
+            "hit_resistance": hit_resistance,
+            "hit_support": hit_support,
+            "max_price": round(max_price, 2),
+            "min_price": round(min_price, 2),
+            "volatility": round(volatility, 2),
+            "outcome": outcome
+        }
+    
     def generate_report(self, days: int = 30) -> Dict:
         """
         Son N günün performans raporunu üret.
@@ -365,44 +468,186 @@ class PerformanceTracker:
         """
         Detaylı geçmiş önerileri ve sonuçlarını getir.
         """
+        return list(islice(self.iter_history(batch_size=limit), limit))
+    
+    def _history_page(self, limit: int, cursor: str = None, ticker: str = None,
+                      sector: str = None, rating: str = None, start_date: str = None,
+                      end_date: str = None, horizon: int = None) -> tuple:
+        """
+        Öneri geçmişinin bir sayfası (tarih, id) üzerinden keyset sayfalama ile,
+        yeniden eskiye. OFFSET kullanılmaz; sayfa maliyeti geçmişin
+        uzunluğundan bağımsızdır ve filtreler indekslerle karşılanır.
+        
+        Döndürür: (öneriler [her biri "results" listesiyle], sonraki cursor veya None)
+        """
+        conditions = []
+        params = []
+        if cursor:
+            cursor_date, cursor_id = decode_history_cursor(cursor)
+            conditions.append("(r.date < ? OR (r.date = ? AND r.id < ?))")
+            params += [cursor_date, cursor_date, cursor_id]
+        for column, value in (("ticker", ticker), ("sector", sector), ("rating", rating)):
+            if value is not None:
+                conditions.append(f"r.{column} = ?")
+                params.append(value)
+        if start_date:
+            conditions.append("r.date >= ?")
+            params.append(start_date)
+        if end_date:
+            conditions.append("r.date <= ?")
+            params.append(end_date)
+        if horizon is not None:
+            conditions.append("""EXISTS (
+                SELECT 1 FROM performance_results pr
+                WHERE pr.recommendation_id = r.id AND pr.days_held = ?
+            )""")
+            params.append(horizon)
+        where = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+        
         conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor_db = conn.cursor()
         
-        cursor.execute("""
-            SELECT 
-                r.date,
-                r.ticker,
-                r.entry_price,
-                r.rating,
-                r.final_score,
-                pr.days_held,
-                pr.exit_price,
-                pr.return_pct,
-                pr.outcome
+        cursor_db.execute(f"""
+            SELECT r.id, r.date, r.ticker, r.entry_price, r.rating, r.final_score, r.sector
             FROM recommendations r
-            LEFT JOIN performance_results pr ON r.id = pr.recommendation_id
-            ORDER BY r.date DESC
+            {where}
+            ORDER BY r.date DESC, r.id DESC
             LIMIT ?
-        """, (limit,))
+        """, (*params, limit + 1))
+        rows = cursor_db.fetchall()
         
-        rows = cursor.fetchall()
-        conn.close()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
         
-        history = []
+        items = []
+        by_id = {}
         for row in rows:
-            history.append({
-                "date": row[0],
-                "ticker": row[1],
-                "entry_price": row[2],
-                "rating": row[3],
-                "score": row[4],
-                "days_held": row[5],
-                "exit_price": row[6],
-                "return_pct": row[7],
-                "outcome": row[8]
-            })
-        
-        return history
+            item = {
+                "id": row[0],
+                "date": row[1],
+                "ticker": row[2],
+                "entry_price": row[3],
+                "rating": row[4],
+                "score": row[5],
+                "sector": row[6],
+                "results": []
+            }
+            items.append(item)
+            by_id[row[0]] = item
+        
+        if by_id:
+            placeholders = ",".join("?" * len(by_id))
+            horizon_filter = "AND days_held = ?" if horizon is not None else ""
+            cursor_db.execute(f"""
+                SELECT recommendation_id, days_held, exit_price, return_pct, outcome
+                FROM performance_results
+                WHERE recommendation_id IN ({placeholders}) {horizon_filter}
+                ORDER BY recommendation_id, days_held
+            """, list(by_id) + ([horizon] if horizon is not None else []))
+            for row in cursor_db.fetchall():
+                by_id[row[0]]["results"].append({
+                    "days_held": row[1],
+                    "exit_price": row[2],
+                    "return_pct": row[3],
+                    "outcome": row[4]
+                })
+        
+        conn.close()
+        
+        next_cursor = None
+        if has_more:
+            next_cursor = encode_history_cursor(items[-1]["date"], items[-1]["id"])
+        return items, next_cursor
+    
+    def get_history_page(self, limit: int = 20, cursor: str = None, **filters) -> Dict:
+        """
+        Öneri geçmişinin bir sayfasını getirir (keyset sayfalama, yeniden eskiye).
+        filters: ticker, sector, rating, start_date, end_date, horizon
+        
+        Döndürür:
+        {
+            "items": [{öneri alanları, "results": [{days_held, exit_price, return_pct, outcome}]}],
+            "next_cursor": sonraki sayfa için cursor (son sayfada None)
+        }
+        """
+        items, next_cursor = self._history_page(limit, cursor, **filters)
+        return {"items": items, "next_cursor": next_cursor}
+    
+    def iter_history(self, batch_size: int = 1000, **filters) -> Iterator[Dict]:
+        """
+        Filtrelenmiş geçmişi satır satır, tembel olarak döndürür (yeniden eskiye).
+        Her (öneri, vade) sonucu bir satırdır; sonucu olmayan öneri tek satır
+        olarak (sonuç alanları None) gelir. Bellekte en fazla bir sayfa tutulur.
+        filters: ticker, sector, rating, start_date, end_date, horizon
+        """
+        cursor = None
+        while True:
+            items, cursor = self._history_page(batch_size, cursor, **filters)
+            for item in items:
+                for row in _flatten_history_item(item):
+                    yield row
+            if cursor is None:
+                break
+    
+    def iter_history_batches(self, batch_size: int = 5000, fmt: str = "pandas",
+                             **filters) -> Iterator:
+        """
+        Geçmişi sayfa başına bir toplu nesne olarak döndürür.
+        fmt: "pandas" (DataFrame), "arrow" (pyarrow.Table) veya "records" (dict listesi)
+        """
+        if fmt == "pandas":
+            import pandas as pd
+        elif fmt == "arrow":
+            try:
+                import pyarrow as pa
+            except ImportError:
+                raise ImportError("fmt='arrow' için pyarrow gerekli: pip install pyarrow")
+        elif fmt != "records":
+            raise ValueError(f"Bilinmeyen biçim: {fmt}")
+        
+        cursor = None
+        while True:
+            items, cursor = self._history_page(batch_size, cursor, **filters)
+            rows = [row for item in items for row in _flatten_history_item(item)]
+            if rows:
+                if fmt == "pandas":
+                    yield pd.DataFrame(rows, columns=HISTORY_COLUMNS)
+                elif fmt == "arrow":
+                    yield pa.Table.from_pylist(rows)
+                else:
+                    yield rows
+            if cursor is None:
+                break
+
+
+HISTORY_COLUMNS = ["id", "date", "ticker", "sector", "entry_price", "rating", "score",
+                   "days_held", "exit_price", "return_pct", "outcome"]
+
+
+def encode_history_cursor(date: str, rec_id: int) -> str:
+    return f"{date}|{rec_id}"
+
+
+def decode_history_cursor(cursor: str) -> tuple:
+    """'YYYY-MM-DD|id' → (tarih, id). Geçersizse ValueError."""
+    date, _, rec_id = cursor.partition("|")
+    datetime.strptime(date, "%Y-%m-%d")
+    return date, int(rec_id)
+
+
+def _flatten_history_item(item: Dict) -> List[Dict]:
+    base = {
+        "id": item["id"],
+        "date": item["date"],
+        "ticker": item["ticker"],
+        "sector": item["sector"],
+        "entry_price": item["entry_price"],
+        "rating": item["rating"],
+        "score": item["score"],
+    }
+    if not item["results"]:
+        return [dict(base, days_held=None, exit_price=None, return_pct=None, outcome=None)]
+    return [dict(base, **result) for result in item["results"]]
 
 
 def generate_performance_email(report: Dict, history: List[Dict]) -> str:
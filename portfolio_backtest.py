@@ -0,0 +1,361 @@
+# ============================================================
+# portfolio_backtest.py — Portföy Seviyesinde Olay Bazlı Backtest
+# ============================================================
+# Bu modül:
+# 1) SignalPanel'deki hazır skor matrisleri üzerinden gün gün ilerleyen
+#    bir portföy simülasyonu yapar: sermaye, eş zamanlı pozisyon
+#    limiti, aynı hissede üst üste binmeyen pozisyonlar
+# 2) Maliyetleri uygular: komisyon, kayma (slippage), BIST fiyat
+#    adımları ve tam lot (1 lot = 1 pay) kuralı
+# 3) Çıkış kuralları: süre (varsayılan 7 işlem günü), giriş barındaki
+#    Fibonacci destek (fib_0.382) altında stop ve direnç (fib_0.618)
+#    üstünde kâr al, isteğe bağlı sabit yüzde stop / hedef
+# 4) Özkaynak eğrisi, drawdown, devir hızı (turnover), piyasada kalma
+#    oranı (exposure) ve işlem listesi raporlar
+#
+# Skorlar ve adaylar döngüden önce matris olarak hesaplanır; günlük
+# döngü sadece açık pozisyonlar ve birkaç aday üzerinde çalışır.
+#
+# Kullanım:
+#   python backtest.py --portfolio --start 2015-01-01 --end 2025-01-01
+# ============================================================
+
+import json
+import math
+import os
+
+import numpy as np
+
+import config
+from signals import SignalPanel, DEFAULT_PARAMS, final_scores
+from walk_forward import trade_stats
+
+TRADING_DAYS_PER_YEAR = 252
+BIST_LOT_SIZE = 1
+
+# BIST pay piyasası fiyat adımları: (fiyat alt sınırı, adım), büyükten küçüğe
+BIST_TICK_TABLE = [
+    (2500.0, 2.5),
+    (1000.0, 1.0),
+    (500.0, 0.5),
+    (250.0, 0.25),
+    (100.0, 0.1),
+    (50.0, 0.05),
+    (20.0, 0.02),
+    (0.0, 0.01),
+]
+
+
+def bist_tick(price: float) -> float:
+    """Fiyatın bulunduğu kademedeki BIST fiyat adımı."""
+    for floor, tick in BIST_TICK_TABLE:
+        if price >= floor:
+            return tick
+    return 0.01
+
+
+def round_to_tick(ticker: str, price: float, up: bool) -> float:
+    """
+    BIST hisselerinde emir fiyatını fiyat adımına yuvarlar (alışta yukarı,
+    satışta aşağı: her iki yönde de aleyhte). Diğer piyasalarda kuruşa.
+    """
+    tick = bist_tick(price) if ticker.endswith(".IS") else 0.01
+    steps = price / tick
+    steps = math.ceil(steps - 1e-9) if up else math.floor(steps + 1e-9)
+    return round(max(steps, 1) * tick, 4)
+
+
+class PortfolioSimulator:
+    """
+    Olay bazlı portföy simülatörü. Her gün sırasıyla:
+      1) bekleyen alışlar açılışta gerçekleşir (entry="next_open")
+      2) açık pozisyonlar stop / hedef / süre kurallarıyla kontrol edilir
+      3) portföy kapanış fiyatlarıyla değerlenir
+      4) günün sinyalleri boş pozisyon sayısı kadar alış üretir
+    """
+
+    def __init__(self, panel: SignalPanel, params: dict = None, capital: float = None,
+                 max_positions: int = None, commission_pct: float = None,
+                 slippage_pct: float = None, holding_days: int = None, entry: str = None,
+                 level_exits: bool = None, stop_loss_pct: float = None,
+                 take_profit_pct: float = None):
+        self.panel = panel
+        self.params = {**DEFAULT_PARAMS, **(params or {})}
+        self.capital = capital if capital is not None else config.PORTFOLIO_INITIAL_CAPITAL
+        self.max_positions = max_positions or config.PORTFOLIO_MAX_POSITIONS
+        self.commission = (commission_pct if commission_pct is not None
+                           else config.PORTFOLIO_COMMISSION_PCT) / 100.0
+        self.slippage = (slippage_pct if slippage_pct is not None
+                         else config.PORTFOLIO_SLIPPAGE_PCT) / 100.0
+        self.holding_days = holding_days or config.PORTFOLIO_HOLDING_DAYS
+        self.entry = entry or config.PORTFOLIO_ENTRY
+        if self.entry not in ("next_open", "close"):
+            raise ValueError(f"Bilinmeyen giriş kuralı: {self.entry}")
+        self.level_exits = config.PORTFOLIO_LEVEL_EXITS if level_exits is None else level_exits
+        self.stop_loss_pct = stop_loss_pct
+        self.take_profit_pct = take_profit_pct
+
+    # ─── ADAYLAR ───────────────────────────────────────────
+
+    def _candidates(self, rows: slice) -> tuple:
+        """
+        Her gün için skora göre sıralı aday sütunları ve skorları.
+        Elde tutulan hisseler atlanabilsin diye 2 × max_positions aday alınır.
+        """
+        window = self.panel.window(rows)
+        tech = window.technical(self.params)
+        final = final_scores(tech, window.sector_norm, self.params)
+        eligible = (tech > 0) & (final >= self.params["buy_threshold"])
+        masked = np.where(eligible, final, -np.inf)
+
+        k = min(2 * self.max_positions, masked.shape[1])
+        cand = np.argpartition(-masked, k - 1, axis=1)[:, :k]
+        scores = np.take_along_axis(masked, cand, axis=1)
+        order = np.argsort(-scores, axis=1, kind="stable")
+        return np.take_along_axis(cand, order, axis=1), np.take_along_axis(scores, order, axis=1)
+
+    # ─── EMİRLER ───────────────────────────────────────────
+
+    def _buy(self, state: dict, t: int, j: int, price: float, signal_row: int, score: float):
+        ticker = self.panel.tickers[j]
+        fill = round_to_tick(ticker, price * (1 + self.slippage), up=True)
+        budget = min(state["equity_ref"] / self.max_positions, state["cash"])
+        shares = int(budget / (fill * (1 + self.commission)) // BIST_LOT_SIZE) * BIST_LOT_SIZE
+        if shares < BIST_LOT_SIZE:
+            return
+
+        cost = shares * fill
+        fee = cost * self.commission
+        state["cash"] -= cost + fee
+        state["traded"] += cost
+        state["fees"] += fee
+
+        ind = self.panel.ind
+        stop = target = None
+        if self.level_exits:
+            support = ind["support"][signal_row, j]
+            resistance = ind["resistance"][signal_row, j]
+            stop = support if support < fill else None
+            target = resistance if resistance > fill else None
+        if self.stop_loss_pct:
+            level = fill * (1 - self.stop_loss_pct / 100)
+            stop = level if stop is None else max(stop, level)
+        if self.take_profit_pct:
+            level = fill * (1 + self.take_profit_pct / 100)
+            target = level if target is None else min(target, level)
+
+        state["positions"][j] = {
+            "ticker": ticker, "shares": shares, "entry": fill, "cost": cost + fee,
+            "entry_row": t, "bars": 0, "stop": stop, "target": target,
+            "score": round(float(score), 1),
+        }
+
+    def _sell(self, state: dict, t: int, j: int, price: float, reason: str):
+        pos = state["positions"].pop(j)
+        fill = round_to_tick(pos["ticker"], price * (1 - self.slippage), up=False)
+        proceeds = pos["shares"] * fill
+        fee = proceeds * self.commission
+        state["cash"] += proceeds - fee
+        state["traded"] += proceeds
+        state["fees"] += fee
+
+        net = proceeds - fee
+        state["trades"].append({
+            "ticker": pos["ticker"],
+            "entry_date": str(self.panel.dates[pos["entry_row"]]),
+            "exit_date": str(self.panel.dates[t]),
+            "shares": pos["shares"],
+            "entry": pos["entry"],
+            "exit": fill,
+            "return": (net / pos["cost"] - 1) * 100,
+            "pnl": net - pos["cost"],
+            "bars": pos["bars"],
+            "reason": reason,
+            "score": pos["score"],
+        })
+
+    def _check_exit(self, pos: dict, o: float, h: float, l: float, c: float) -> tuple:
+        """Aynı gün hem stop hem hedef görülürse stop varsayılır (temkinli)."""
+        if pos["stop"] is not None and l <= pos["stop"]:
+            return min(o, pos["stop"]), "stop"
+        if pos["target"] is not None and h >= pos["target"]:
+            return max(o, pos["target"]), "target"
+        if pos["bars"] >= self.holding_days:
+            return c, "time"
+        return None, None
+
+    # ─── SİMÜLASYON ────────────────────────────────────────
+
+    def run(self, start: str = None, end: str = None) -> dict:
+        rows = self.panel.rows(start, end)
+        lo, hi = rows.start, rows.stop
+        if hi <= lo:
+            raise ValueError("Simülasyon aralığında veri yok")
+
+        ind = self.panel.ind
+        open_, high, low, close = ind["open"], ind["high"], ind["low"], ind["close"]
+        cand, cand_scores = self._candidates(rows)
+
+        n = hi - lo
+        equity = np.empty(n)
+        invested = np.empty(n)
+        held = np.zeros(n, dtype=int)
+        last_close = np.full(len(self.panel.tickers), np.nan)
+        state = {"cash": float(self.capital), "equity_ref": float(self.capital),
+                 "positions": {}, "trades": [], "traded": 0.0, "fees": 0.0}
+        pending = []
+
+        for i, t in enumerate(range(lo, hi)):
+            positions = state["positions"]
+
+            # 1) Dünün sinyalleri bugünün açılışında
+            for j, signal_row, score in pending:
+                if len(positions) < self.max_positions and np.isfinite(open_[t, j]):
+                    self._buy(state, t, j, open_[t, j], signal_row, score)
+            pending = []
+
+            # 2) Çıkışlar (giriş barından sonraki barlarda)
+            for j in list(positions):
+                pos = positions[j]
+                if pos["entry_row"] == t or not np.isfinite(close[t, j]):
+                    continue
+                pos["bars"] += 1
+                price, reason = self._check_exit(pos, open_[t, j], high[t, j], low[t, j], close[t, j])
+                if reason:
+                    self._sell(state, t, j, price, reason)
+
+            # 3) Değerleme
+            row = close[t]
+            last_close = np.where(np.isfinite(row), row, last_close)
+            value = sum(p["shares"] * last_close[j] for j, p in positions.items())
+            equity[i] = state["cash"] + value
+            invested[i] = value
+            held[i] = len(positions)
+            state["equity_ref"] = equity[i]
+
+            # 4) Günün sinyalleri
+            free = self.max_positions - len(positions)
+            if free <= 0:
+                continue
+            for j, score in zip(cand[i], cand_scores[i]):
+                if free <= 0 or not np.isfinite(score):
+                    break
+                if j in positions:
+                    continue
+                if self.entry == "close":
+                    self._buy(state, t, j, close[t, j], t, score)
+                else:
+                    pending.append((j, t, score))
+                free -= 1
+
+        # Dönem sonunda açık kalanlar son kapanıştan kapatılır
+        for j in list(state["positions"]):
+            price = last_close[j] if np.isfinite(last_close[j]) else state["positions"][j]["entry"]
+            self._sell(state, hi - 1, j, price, "end")
+        equity[-1] = state["cash"]
+
+        return self._report(rows, equity, invested, held, state)
+
+    def _report(self, rows: slice, equity: np.ndarray, invested: np.ndarray,
+                held: np.ndarray, state: dict) -> dict:
+        peak = np.maximum.accumulate(equity)
+        drawdown = (equity / peak - 1) * 100
+        daily = np.diff(equity) / equity[:-1] if len(equity) > 1 else np.zeros(0)
+        years = max(len(equity) / TRADING_DAYS_PER_YEAR, 1e-9)
+        total_return = (equity[-1] / self.capital - 1) * 100
+        vol = float(daily.std() * math.sqrt(TRADING_DAYS_PER_YEAR)) if daily.size > 1 else 0.0
+        trades = state["trades"]
+
+        reasons = {}
+        for trade in trades:
+            reasons[trade["reason"]] = reasons.get(trade["reason"], 0) + 1
+
+        return {
+            "start": str(self.panel.dates[rows.start]),
+            "end": str(self.panel.dates[rows.stop - 1]),
+            "capital": self.capital,
+            "final_equity": float(equity[-1]),
+            "total_return": float(total_return),
+            "cagr": float(((equity[-1] / self.capital) ** (1 / years) - 1) * 100) if equity[-1] > 0 else -100.0,
+            "volatility": vol * 100,
+            "sharpe": float(daily.mean() * TRADING_DAYS_PER_YEAR / vol) if vol > 0 else 0.0,
+            "max_drawdown": float(drawdown.min()),
+            # Yıllık devir: (alış + satış) / 2 / ortalama özkaynak
+            "turnover": float(state["traded"] / 2 / equity.mean() / years),
+            "exposure": float((invested / equity).mean() * 100),
+            "time_in_market": float((held > 0).mean() * 100),
+            "fees": float(state["fees"]),
+            "trade_stats": trade_stats([t["return"] for t in trades]),
+            "exit_reasons": reasons,
+            "dates": [str(d) for d in self.panel.dates[rows]],
+            "equity_curve": equity.round(2).tolist(),
+            "drawdown": drawdown.round(3).tolist(),
+            "trades": trades,
+        }
+
+
+def print_portfolio_report(result: dict):
+    stats = result["trade_stats"]
+    print("\n" + "=" * 70)
+    print("  💼 PORTFÖY BACKTEST SONUÇLARI")
+    print("=" * 70)
+    print(f"\n  📅 {result['start']} → {result['end']}")
+    print(f"     Başlangıç Sermayesi : {result['capital']:,.0f}")
+    print(f"     Son Özkaynak        : {result['final_equity']:,.0f}")
+    print(f"     Toplam Getiri       : {result['total_return']:+.2f}%")
+    print(f"     Yıllık Getiri (CAGR): {result['cagr']:+.2f}%")
+    print(f"     Yıllık Volatilite   : {result['volatility']:.2f}%")
+    print(f"     Sharpe              : {result['sharpe']:.2f}")
+    print(f"     Maks. Drawdown      : {result['max_drawdown']:.2f}%")
+    print(f"\n  🔄 Yıllık Devir Hızı   : {result['turnover']:.1f}x")
+    print(f"     Ortalama Exposure   : {result['exposure']:.1f}%")
+    print(f"     Piyasada Kalma      : {result['time_in_market']:.1f}% gün")
+    print(f"     Ödenen Komisyon     : {result['fees']:,.0f}")
+    print(f"\n  📈 İşlem: {stats['total']}  Başarılı (>=%5): {stats['success']}  "
+          f"Zarar: {stats['loss']}  Ort. net getiri: {stats['avg_return']:+.2f}%")
+    reasons = ", ".join(f"{k}={v}" for k, v in sorted(result["exit_reasons"].items()))
+    print(f"     Çıkış nedenleri     : {reasons or '-'}")
+    print("=" * 70)
+
+
+def run_portfolio_backtest(start_date: str, end_date: str, tickers: list = None,
+                           news_archive=None, params: dict = None, output: str = None,
+                           bootstrap: int = None, **options) -> dict:
+    """
+    backtest.py --portfolio giriş noktası. options PortfolioSimulator'a
+    aktarılır (capital, max_positions, commission_pct, ...).
+    bootstrap: özkaynak eğrisi ve işlemlerin güven aralığı örneklem sayısı (0 → kapalı)
+    """
+    tickers = tickers or config.ALL_STOCKS
+    if news_archive is not None and not news_archive.available():
+        print(f"  ⚠️  Haber arşivi bulunamadı ({news_archive.root}), nötr haber skoru kullanılacak")
+        news_archive = None
+
+    print("\n" + "=" * 70)
+    print("  💼 PORTFÖY BACKTEST'İ")
+    print(f"  📅 Tarih Aralığı: {start_date} → {end_date}")
+    print(f"  📊 Hisse Sayısı: {len(tickers)}")
+    print("=" * 70)
+
+    print(f"\n  💾 Fiyatlar yükleniyor ve göstergeler hesaplanıyor...")
+    panel = SignalPanel.build(tickers, start_date, end_date, news_archive=news_archive)
+    print(f"  ✅ Panel: {panel.shape[0]} gün × {panel.shape[1]} hisse")
+
+    result = PortfolioSimulator(panel, params, **options).run(start_date, end_date)
+    print_portfolio_report(result)
+
+    if bootstrap != 0:
+        from bootstrap import bootstrap_equity, bootstrap_trades, print_confidence
+        result["confidence"] = {
+            "equity": bootstrap_equity(result["equity_curve"], n_resamples=bootstrap),
+            "trades": bootstrap_trades(result["trades"], n_resamples=bootstrap),
+        }
+        print_confidence(result["confidence"]["equity"])
+        print_confidence(result["confidence"]["trades"])
+
+    if output:
+        os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\n  💾 Sonuç kaydedildi: {output}")
+    return result
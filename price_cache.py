@@ -0,0 +1,282 @@
+# ============================================================
+# price_cache.py — Paylaşımlı Fiyat Cache'i (Memory-Mapped)
+# ============================================================
+# Bu modül:
+# 1) Her hisse için OHLCV verisini tek bir kolon bazlı .npy dosyasında
+#    saklar: (6, N) float64 → tarih (epoch gün), Open, High, Low, Close, Volume
+# 2) Dosyalar np.load(mmap_mode="r") ile açılır; bot, backtest ve
+#    check_performance aynı anda çalışsa bile veri diskten bir kez
+#    okunur ve süreçler arasında işletim sistemi sayfa cache'i paylaşılır
+# 3) Yazma atomiktir (geçici dosya + os.replace) ve hisse başına dosya
+#    kilidiyle sıralanır; meta .npy ile tutarsızsa cache yok sayılır
+# 4) Bugüne uzanan aralıklar TTL sonunda yenilenir, geçmiş aralıklar kalıcıdır;
+#    ayrık aralıklar aynı dosyada birlikte saklanır
+# ============================================================
+
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+import numpy as np
+import pandas as pd
+import config
+import run_metrics
+
+COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+ROW_DATE = 0
+
+
+def _safe_name(ticker: str) -> str:
+    return ticker.replace("/", "_").replace(".", "_").replace("^", "_")
+
+
+def _to_epoch_days(index: pd.DatetimeIndex) -> np.ndarray:
+    days = pd.DatetimeIndex(index).tz_localize(None).normalize()
+    return (days.values.astype("datetime64[D]").astype(np.int64)).astype(np.float64)
+
+
+def _yahoo_download(ticker: str, start: str, end: str) -> pd.DataFrame:
+    """yfinance çağrısı (tekrar deneme + ölçüm). Boş DataFrame = veri yok."""
+    import yfinance as yf
+
+    for attempt in range(config.NETWORK_RETRIES + 1):
+        try:
+            df = yf.download(
+                ticker,
+                start=start,
+                end=end,
+                progress=False,
+                auto_adjust=True
+            )
+            break
+        except Exception as e:
+            if attempt >= config.NETWORK_RETRIES:
+                print(f"[❌] {ticker} veri çekme hatası: {e}")
+                return pd.DataFrame()
+            run_metrics.add_retry("yahoo")
+            time.sleep(config.NETWORK_RETRY_BACKOFF_SECONDS * (attempt + 1))
+
+    if df is None or df.empty:
+        return pd.DataFrame()
+
+    # Column flatten (yfinance bazen multi-index döndürür)
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)
+
+    # yfinance ham yanıt boyutunu vermez; çözülmüş veri boyutu kaydedilir
+    run_metrics.add_bytes("yahoo", int(df.memory_usage(index=True).sum()), ticker)
+    return df
+
+
+class PriceCache:
+    """
+    Hisse başına bir memory-mapped kolon dosyası + küçük bir JSON meta dosyası.
+    Meta: {"ranges": [["YYYY-MM-DD", "YYYY-MM-DD" (hariç), written_at], ...],
+           "rows": N, "first": epoch gün, "last": epoch gün}
+    rows/first/last okurken .npy ile karşılaştırılır; uyuşmazsa cache yok sayılır.
+    """
+
+    def __init__(self, root: str = None, ttl_minutes: int = None):
+        self.root = root or config.PRICE_CACHE_DIR
+        self.ttl_seconds = (ttl_minutes if ttl_minutes is not None
+                            else config.PRICE_CACHE_TTL_MINUTES) * 60
+        os.makedirs(self.root, exist_ok=True)
+
+    def _paths(self, ticker: str) -> tuple:
+        base = os.path.join(self.root, _safe_name(ticker))
+        return f"{base}.npy", f"{base}.json"
+
+    @contextmanager
+    def _locked(self, ticker: str, exclusive: bool):
+        """
+        Hisse başına kilit dosyası: yazarlar özel (yükle/birleştir/yaz tek
+        adımda), okuyucular paylaşımlı kilit alır. fcntl yoksa (Windows)
+        kilitsiz çalışır; tutarlılık kontrolü yine devrededir.
+        """
+        if fcntl is None:
+            yield
+            return
+        base = os.path.join(self.root, _safe_name(ticker))
+        with open(f"{base}.lock", "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _read(self, ticker: str) -> tuple:
+        """
+        (meta, veri) çifti. Meta eksik/eski formatta ise veya .npy ile
+        uyuşmuyorsa (yarım kalmış yazma) (None, None).
+        """
+        data_path, meta_path = self._paths(ticker)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            data = np.load(data_path, mmap_mode="r")
+        except (OSError, ValueError):
+            return None, None
+
+        if "ranges" not in meta or data.ndim != 2 or data.shape[1] != meta["rows"]:
+            return None, None
+        if meta["rows"] and (data[ROW_DATE, 0] != meta["first"]
+                             or data[ROW_DATE, -1] != meta["last"]):
+            return None, None
+        return meta, data
+
+    def _snapshot(self, ticker: str) -> tuple:
+        with self._locked(ticker, exclusive=False):
+            return self._read(ticker)
+
+    def _fresh(self, meta: dict, start: str, end: str) -> bool:
+        """[start, end) tek bir kayıtlı aralığın içinde ve taze mi?"""
+        for r_start, r_end, written_at in meta["ranges"]:
+            if r_start > start or r_end < end:
+                continue
+            # Bugüne uzanan aralıklarda son bar yazıldıktan sonra değişmiş olabilir
+            written_day = datetime.fromtimestamp(written_at).strftime("%Y-%m-%d")
+            if end >= written_day and time.time() - written_at > self.ttl_seconds:
+                return False
+            return True
+        return False
+
+    def arrays(self, ticker: str) -> np.ndarray:
+        """
+        Hissenin (6, N) kolon matrisini sıfır kopya (memory-mapped) döndürür.
+        Satır 0 tarih (epoch gün), 1-5 COLUMNS sırasıyla. Yoksa None.
+        """
+        return self._snapshot(ticker)[1]
+
+    def covers(self, ticker: str, start: str, end: str) -> bool:
+        """Cache [start, end) aralığını taze olarak kapsıyor mu?"""
+        meta, _ = self._snapshot(ticker)
+        return meta is not None and self._fresh(meta, start, end)
+
+    @staticmethod
+    def _slice(data: np.ndarray, start: str = None, end: str = None) -> pd.DataFrame:
+        dates = data[ROW_DATE]
+        lo = 0
+        hi = dates.shape[0]
+        if start:
+            lo = int(np.searchsorted(dates, _to_epoch_days(pd.DatetimeIndex([start]))[0], "left"))
+        if end:
+            hi = int(np.searchsorted(dates, _to_epoch_days(pd.DatetimeIndex([end]))[0], "left"))
+
+        index = pd.DatetimeIndex(dates[lo:hi].astype("datetime64[D]"), name="Date")
+        return pd.DataFrame(
+            {col: data[i + 1, lo:hi] for i, col in enumerate(COLUMNS)},
+            index=index
+        )
+
+    def frame(self, ticker: str, start: str = None, end: str = None) -> pd.DataFrame:
+        """Cache'teki veriden [start, end) aralığını DataFrame olarak döndürür."""
+        data = self.arrays(ticker)
+        if data is None:
+            return pd.DataFrame()
+        return self._slice(data, start, end)
+
+    def store(self, ticker: str, df: pd.DataFrame, start: str, end: str):
+        """
+        [start, end) aralığının verisini mevcut veriyle birleştirerek yazar.
+        Ayrık aralıklar da saklanır (backtest aralığı ile güncel pencere
+        birbirini silmez); örtüşen/bitişik aralıklar tek aralıkta birleşir.
+        """
+        data_path, meta_path = self._paths(ticker)
+        frame = df[COLUMNS].astype(np.float64)
+        new = np.vstack([_to_epoch_days(frame.index)] + [frame[c].to_numpy() for c in COLUMNS])
+
+        with self._locked(ticker, exclusive=True):
+            meta, old = self._read(ticker)
+            ranges = [] if meta is None else [list(r) for r in meta["ranges"]]
+            if old is not None:
+                # Yeni veri aynı tarihlerde eskisini ezer
+                keep = ~np.isin(old[ROW_DATE], new[ROW_DATE])
+                merged = np.hstack([np.asarray(old)[:, keep], new])
+                new = merged[:, np.argsort(merged[ROW_DATE], kind="stable")]
+
+            ranges.append([start, end, time.time()])
+            ranges.sort()
+            coalesced = [ranges[0]]
+            for r_start, r_end, written_at in ranges[1:]:
+                last = coalesced[-1]
+                if r_start > last[1]:
+                    coalesced.append([r_start, r_end, written_at])
+                    continue
+                # Birleşik aralığın tazeliği, sonu en geç olan parçadan gelir
+                if r_end > last[1] or (r_end == last[1] and written_at > last[2]):
+                    last[2] = written_at
+                last[1] = max(last[1], r_end)
+
+            tmp_data = f"{data_path}.{os.getpid()}.tmp"
+            with open(tmp_data, "wb") as f:
+                np.save(f, np.ascontiguousarray(new))
+            os.replace(tmp_data, data_path)
+
+            rows = int(new.shape[1])
+            tmp_meta = f"{meta_path}.{os.getpid()}.tmp"
+            with open(tmp_meta, "w", encoding="utf-8") as f:
+                json.dump({"ranges": coalesced, "rows": rows,
+                           "first": float(new[ROW_DATE, 0]) if rows else None,
+                           "last": float(new[ROW_DATE, -1]) if rows else None}, f)
+            os.replace(tmp_meta, meta_path)
+
+    def load(self, ticker: str, start: str, end: str) -> pd.DataFrame:
+        """
+        [start, end) aralığının OHLCV verisi: cache taze ise diskten,
+        değilse Yahoo'dan indirilip cache'e yazılarak.
+        """
+        meta, data = self._snapshot(ticker)
+        if meta is not None and self._fresh(meta, start, end):
+            return self._slice(data, start, end)
+
+        df = _yahoo_download(ticker, start, end)
+        if df.empty:
+            return df
+
+        try:
+            self.store(ticker, df, start, end)
+        except (OSError, KeyError) as e:
+            print(f"[PriceCache] {ticker} yazılamadı: {e}")
+            return df
+
+        return self.frame(ticker, start, end)
+
+
+_default_cache = None
+
+
+def get_price_cache() -> PriceCache:
+    """Modül genelinde paylaşılan fiyat cache'i."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = PriceCache()
+    return _default_cache
+
+
+def load_prices(ticker: str, start, end) -> pd.DataFrame:
+    """
+    Fiyat verisi için ortak giriş noktası. start/end datetime veya
+    "YYYY-MM-DD" olabilir; end hariçtir (yfinance ile aynı).
+    config.PRICE_CACHE_ENABLED kapalıysa doğrudan Yahoo'ya gider.
+    """
+    if isinstance(start, datetime):
+        start = start.strftime("%Y-%m-%d")
+    if isinstance(end, datetime):
+        end = end.strftime("%Y-%m-%d")
+
+    if not config.PRICE_CACHE_ENABLED:
+        return _yahoo_download(ticker, start, end)
+    return get_price_cache().load(ticker, start, end)
+
+
+def prefetch(tickers: list, start, end):
+    """Backtest gibi çok günlük işler için tüm aralığı tek seferde cache'ler."""
+    for ticker in tickers:
+        load_prices(ticker, start, end)
@@ -0,0 +1,281 @@
+# ============================================================
+# query_api.py — Lokal HTTP/JSON Okuma API'si
+# ============================================================
+# Bu modül:
+# 1) Son run_full_analysis sonucunu (hisse skorları, hisse bazlı
+#    indikatör özetleri) yayın anında bir kez JSON'a çevirir ve
+#    ETag'iyle birlikte bellekte tutar
+# 2) Öneri geçmişini PerformanceTracker'dan keyset sayfalama ile sunar;
+#    sayfalar performance.db değişene kadar cache'ten döner
+# 3) If-None-Match ile 304 döndürür: birkaç saniyede bir sorgulayan
+#    dashboard'lar hiçbir yeniden hesaplama tetiklemez
+#
+# Uç noktalar (sadece GET):
+#   /api/scores                     → tüm evrenin skorları + piyasa havası
+#   /api/tickers/<TICKER>           → hissenin indikatör özeti
+#   /api/history?limit=20&cursor=C  → sayfalı öneri geçmişi
+#       (filtreler: ticker, sector, rating, from, to, horizon)
+#
+# Kullanım:
+#   python query_api.py                 (ayrı süreç: son kaydedilen snapshot)
+#   python main_bot.py --mode daemon    (aynı süreç: daemon portunda /api/*)
+# ============================================================
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, unquote
+
+import config
+
+HISTORY_CACHE_MAX_PAGES = 64
+HISTORY_MAX_LIMIT = 200
+
+
+def _json_default(value):
+    # numpy skalerleri ve tarih gibi JSON dışı tipler
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+def _encode(payload) -> tuple:
+    """Payload'u bir kez serileştirir; (gövde, ETag) döndürür."""
+    body = json.dumps(payload, ensure_ascii=False, default=_json_default).encode("utf-8")
+    etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+    return body, etag
+
+
+class SnapshotStore:
+    """
+    Yol → (JSON gövdesi, ETag) eşlemesi. Yayınlama tüm sözlüğü tek seferde
+    değiştirir; okuyucular yarım bir snapshot görmez.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._snapshot_mtime = None
+
+    def replace(self, payloads: dict):
+        self._entries = {path: _encode(payload) for path, payload in payloads.items()}
+
+    def get(self, path: str):
+        self._reload_if_changed()
+        return self._entries.get(path)
+
+    def _reload_if_changed(self):
+        """
+        Ayrı süreçte çalışırken diskteki snapshot değiştiyse yeniden yükler.
+        Aynı süreçte yayınlanmış bir snapshot varsa disk kullanılmaz.
+        """
+        if self._entries and self._snapshot_mtime is None:
+            return
+        try:
+            mtime = os.stat(config.API_SNAPSHOT_PATH).st_mtime_ns
+        except OSError:
+            return
+        if mtime == self._snapshot_mtime:
+            return
+        try:
+            with open(config.API_SNAPSHOT_PATH, "r", encoding="utf-8") as f:
+                payloads = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[API] Snapshot okunamadı: {e}")
+            return
+        self.replace(payloads)
+        self._snapshot_mtime = mtime
+
+
+class HistoryView:
+    """
+    PerformanceTracker üzerinde sayfa cache'i. Cache anahtarı veritabanı
+    dosyasının (mtime, boyut) bilgisini içerir; yeni öneri veya sonuç
+    yazılınca eski sayfalar kendiliğinden geçersiz olur.
+    """
+
+    def __init__(self, db_path: str = "performance.db"):
+        self.db_path = db_path
+        self._tracker = None
+        self._pages = {}
+        self._lock = threading.Lock()
+
+    def _db_version(self) -> tuple:
+        try:
+            st = os.stat(self.db_path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return (0, 0)
+
+    def page(self, limit: int, cursor: str = None, **filters) -> tuple:
+        filter_key = tuple(sorted(filters.items()))
+        key = (self._db_version(), limit, cursor, filter_key)
+        with self._lock:
+            cached = self._pages.get(key)
+            if cached is not None:
+                return cached
+
+            if self._tracker is None:
+                from performance_tracker import PerformanceTracker
+                self._tracker = PerformanceTracker(self.db_path)
+                key = (self._db_version(), limit, cursor, filter_key)
+
+            page = self._tracker.get_history_page(limit=limit, cursor=cursor, **filters)
+            if len(self._pages) >= HISTORY_CACHE_MAX_PAGES:
+                self._pages.clear()
+            self._pages[key] = _encode(page)
+            return self._pages[key]
+
+
+_store = SnapshotStore()
+_history = HistoryView()
+
+
+def _stock_summary(stock: dict) -> dict:
+    return {
+        "ticker": stock.get("ticker"),
+        "score": stock.get("score", 0),
+        "final_score": stock.get("final_score"),
+        "rating": stock.get("rating"),
+        "sector": stock.get("sector"),
+        "current_price": stock.get("current_price"),
+        "error": stock.get("error"),
+    }
+
+
+def publish_run(stock_analysis: list, selected: list, recommendations: dict,
+                sector_scores: dict = None, write_snapshot: bool = True):
+    """
+    Bir çalıştırmanın sonucunu API için yayınlar. JSON'lar burada bir kez
+    üretilir; istekler sadece hazır baytları döndürür.
+    """
+    generated_at = datetime.now().isoformat(timespec="seconds")
+    payloads = {
+        "/api/scores": {
+            "generated_at": generated_at,
+            "market_mood": (recommendations or {}).get("market_mood"),
+            "sector_scores": sector_scores or {},
+            "selected": [s.get("ticker") for s in selected],
+            "stocks": [_stock_summary(s) for s in stock_analysis],
+        }
+    }
+    for stock in stock_analysis:
+        ticker = stock.get("ticker")
+        if not ticker:
+            continue
+        snapshot = {k: v for k, v in stock.items() if k != "dataframe"}
+        snapshot["generated_at"] = generated_at
+        payloads[f"/api/tickers/{ticker}"] = snapshot
+
+    _store.replace(payloads)
+
+    if write_snapshot:
+        # Ayrı süreçte çalışan API için diske de yaz (atomik)
+        try:
+            os.makedirs(os.path.dirname(config.API_SNAPSHOT_PATH) or ".", exist_ok=True)
+            tmp = f"{config.API_SNAPSHOT_PATH}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(payloads, f, ensure_ascii=False, default=_json_default)
+            os.replace(tmp, config.API_SNAPSHOT_PATH)
+        except OSError as e:
+            print(f"[API] Snapshot yazılamadı: {e}")
+
+
+def respond(path: str, query: str = "") -> tuple:
+    """
+    Bir GET isteğini cevaplar.
+    Döndürür: (HTTP durum kodu, JSON gövdesi, ETag veya None)
+    """
+    if path == "/api/history":
+        from performance_tracker import decode_history_cursor
+
+        params = {k: v[0] for k, v in parse_qs(query).items()}
+        filters = {
+            "ticker": params.get("ticker"),
+            "sector": params.get("sector"),
+            "rating": params.get("rating"),
+            "start_date": params.get("from"),
+            "end_date": params.get("to"),
+        }
+        filters = {k: v for k, v in filters.items() if v}
+        cursor = params.get("cursor") or None
+        try:
+            limit = int(params.get("limit", "20"))
+            if "horizon" in params:
+                filters["horizon"] = int(params["horizon"])
+            if cursor:
+                decode_history_cursor(cursor)
+        except ValueError:
+            return 400, _encode({"error": "geçersiz limit/horizon/cursor"})[0], None
+        limit = max(1, min(limit, HISTORY_MAX_LIMIT))
+        body, etag = _history.page(limit, cursor, **filters)
+        return 200, body, etag
+
+    if path.startswith("/api/tickers/"):
+        path = "/api/tickers/" + unquote(path[len("/api/tickers/"):]).upper()
+
+    entry = _store.get(path)
+    if entry is None:
+        if path == "/api/scores" or path.startswith("/api/tickers/"):
+            return 404, _encode({"error": "henüz sonuç yok veya hisse bulunamadı"})[0], None
+        return 404, _encode({"error": "bulunamadı"})[0], None
+    body, etag = entry
+    return 200, body, etag
+
+
+def handle_get(handler: BaseHTTPRequestHandler):
+    """Herhangi bir BaseHTTPRequestHandler üzerinden /api/* isteğini yazar."""
+    url = urlparse(handler.path)
+    status, body, etag = respond(url.path, url.query)
+
+    if etag is not None and handler.headers.get("If-None-Match") == etag:
+        handler.send_response(304)
+        handler.send_header("ETag", etag)
+        handler.end_headers()
+        return
+
+    handler.send_response(status)
+    handler.send_header("Content-Type", "application/json; charset=utf-8")
+    handler.send_header("Content-Length", str(len(body)))
+    if etag is not None:
+        handler.send_header("ETag", etag)
+        handler.send_header("Cache-Control", "no-cache")
+    handler.end_headers()
+    handler.wfile.write(body)
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        handle_get(self)
+
+    def log_message(self, format, *args):
+        pass  # Sık sorgulayan dashboard'lar konsolu doldurmasın
+
+
+def serve(host: str = None, port: int = None):
+    """API'yi ayrı süreçte, diskteki son snapshot üzerinden sunar."""
+    host = host or config.API_HOST
+    port = config.API_PORT if port is None else port
+    server = ThreadingHTTPServer((host, port), ApiHandler)
+    print(f"🌐 Okuma API'si: http://{host}:{port}/api/scores")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 API durduruluyor...")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Borsa Bot okuma API'si")
+    parser.add_argument("--host", type=str, default=None,
+                        help=f"Dinlenecek adres (varsayılan: {config.API_HOST})")
+    parser.add_argument("--port", type=int, default=None,
+                        help=f"Port (varsayılan: {config.API_PORT})")
+    args = parser.parse_args()
+
+    serve(args.host, args.port)
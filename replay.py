@@ -0,0 +1,171 @@
+# ============================================================
+# replay.py — Kayıt / Tekrar Oynatma (Offline Replay)
+# ============================================================
+# Bu modül:
+# 1) Bir çalıştırmadaki tüm dış yanıtları (Yahoo, NewsAPI, SendGrid)
+#    bir fixture klasörüne kaydeder
+# 2) Sonraki çalıştırmada aynı yanıtları ağa çıkmadan geri verir
+# 3) Kayıt anının saatini saklar; replay sırasında "şimdi" bu andır
+#
+# Kullanım:
+#   python main_bot.py --mode test --record fixtures/ornek
+#   python main_bot.py --mode test --replay fixtures/ornek
+# ============================================================
+
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+
+MODE_OFF = "off"
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+
+MANIFEST_FILE = "manifest.json"
+
+
+class FixtureBundle:
+    """
+    Dış çağrı yanıtlarının saklandığı klasör.
+    Her yanıt <root>/<kind>/<hash>.(parquet|json) olarak yazılır: DataFrame'ler
+    Parquet, diğerleri JSON (pickle yok: pandas sürümünden bağımsız ve
+    başka makineden gelen bir paketi yüklemek kod çalıştırmaz).
+    manifest.json anahtarların okunabilir halini ve kayıt zamanını tutar.
+    Replay'de bulunamayan kayıtlar misses listesinde toplanır.
+    """
+
+    def __init__(self, root: str, mode: str):
+        self.root = root
+        self.mode = mode
+        self.manifest = {"recorded_at": time.time(), "calls": {}}
+        self.misses = []
+
+        manifest_path = os.path.join(root, MANIFEST_FILE)
+        if mode == MODE_REPLAY:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        else:
+            os.makedirs(root, exist_ok=True)
+
+    @staticmethod
+    def _hash(key_parts: list) -> str:
+        raw = json.dumps(key_parts, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+    def _path(self, kind: str, digest: str, frame: bool) -> str:
+        return os.path.join(self.root, kind, f"{digest}.{'parquet' if frame else 'json'}")
+
+    def record(self, kind: str, key_parts: list, value, frame: bool = False):
+        digest = self._hash(key_parts)
+        path = self._path(kind, digest, frame)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        if frame:
+            value.to_parquet(path)
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(value, f, ensure_ascii=False)
+
+        self.manifest["calls"].setdefault(kind, {})[digest] = key_parts
+        self._write_manifest()
+
+    def load(self, kind: str, key_parts: list, default=None, frame: bool = False):
+        digest = self._hash(key_parts)
+        path = self._path(kind, digest, frame)
+        if not os.path.exists(path):
+            self.misses.append([kind, key_parts])
+            print(f"[Replay] Kayıt bulunamadı: {kind} {key_parts}")
+            return default
+
+        if frame:
+            import pandas as pd
+            return pd.read_parquet(path)
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_manifest(self):
+        tmp_path = os.path.join(self.root, f".{MANIFEST_FILE}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, os.path.join(self.root, MANIFEST_FILE))
+
+
+_bundle = None
+_counters = {}
+
+
+def start_recording(root: str) -> FixtureBundle:
+    """Bu süreçteki dış yanıtları root klasörüne kaydetmeye başlar."""
+    global _bundle
+    _bundle = FixtureBundle(root, MODE_RECORD)
+    _counters.clear()
+    return _bundle
+
+
+def start_replay(root: str) -> FixtureBundle:
+    """Dış çağrıları root klasöründeki kayıtlardan yanıtlar (ağ kullanılmaz)."""
+    global _bundle
+    _bundle = FixtureBundle(root, MODE_REPLAY)
+    _counters.clear()
+    return _bundle
+
+
+def stop():
+    global _bundle
+    _bundle = None
+
+
+def mode() -> str:
+    return _bundle.mode if _bundle is not None else MODE_OFF
+
+
+def is_recording() -> bool:
+    return mode() == MODE_RECORD
+
+
+def is_replaying() -> bool:
+    return mode() == MODE_REPLAY
+
+
+def record(kind: str, key_parts: list, value, frame: bool = False):
+    """
+    Kayıt modundaysa yanıtı saklar; değilse hiçbir şey yapmaz.
+    frame=True: value bir DataFrame'dir, Parquet olarak yazılır.
+    """
+    if is_recording():
+        _bundle.record(kind, key_parts, value, frame)
+
+
+def load(kind: str, key_parts: list, default=None, frame: bool = False):
+    """Replay modunda kayıtlı yanıtı döndürür (yoksa default)."""
+    return _bundle.load(kind, key_parts, default, frame)
+
+
+def take_misses() -> list:
+    """Replay'de bulunamayan kayıtlar ([kind, anahtar]); liste boşaltılır."""
+    if _bundle is None:
+        return []
+    misses, _bundle.misses = _bundle.misses, []
+    return misses
+
+
+def sequence_key(kind: str, key_parts: list) -> list:
+    """
+    Aynı anahtarla birden fazla kez yapılan çağrılar (ör. mail gönderimi)
+    için sıra numaralı anahtar üretir.
+    """
+    base = json.dumps([kind, key_parts], ensure_ascii=False, default=str)
+    _counters[base] = _counters.get(base, 0) + 1
+    return list(key_parts) + [_counters[base]]
+
+
+def now_ts() -> float:
+    """Replay'de kayıt anı, diğer durumlarda gerçek zaman (unix)."""
+    if is_replaying():
+        return _bundle.manifest.get("recorded_at", time.time())
+    return time.time()
+
+
+def now() -> datetime:
+    return datetime.fromtimestamp(now_ts())
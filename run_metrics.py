@@ -0,0 +1,179 @@
+# ============================================================
+# run_metrics.py — Çalıştırma Ölçümleri (Instrumentation)
+# ============================================================
+# Bu modül:
+# 1) Pipeline aşamalarının (haber, indirme, skor, grafik, mail) süresini ölçer
+# 2) Hisse başına süre, indirilen veri boyutu ve tekrar denemeleri sayar
+# 3) Tepe bellek kullanımını kaydeder
+# 4) Her çalıştırma için yapılandırılmış bir JSON kaydı yazar
+#
+# Diğer modüller add_bytes / add_retry / ticker_timer fonksiyonlarını
+# çağırır; aktif bir çalıştırma yoksa bu çağrılar hiçbir şey yapmaz.
+# ============================================================
+
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+import config
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_memory_mb() -> float:
+    """Sürecin tepe bellek kullanımı (MB). Ölçülemiyorsa None."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux KB, macOS byte döndürür
+    if sys.platform == "darwin":
+        return round(peak / (1024 * 1024), 1)
+    return round(peak / 1024, 1)
+
+
+class RunMetrics:
+    """
+    Tek bir çalıştırmanın ölçümleri.
+    """
+
+    def __init__(self, name: str = "run_full_analysis"):
+        self.name = name
+        self.started_at = datetime.now()
+        self._t0 = time.perf_counter()
+        self.stages = []
+        self.tickers = {}
+        self.bytes = {}
+        self.retries = {}
+        self.extra = {}
+        self.total_seconds = None
+
+    @contextmanager
+    def stage(self, name: str):
+        """Bir pipeline aşamasının süresini ve sonucunu kaydeder."""
+        t0 = time.perf_counter()
+        status = "ok"
+        try:
+            yield
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            self.stages.append({
+                "name": name,
+                "seconds": round(time.perf_counter() - t0, 4),
+                "status": status,
+                "peak_memory_mb": peak_memory_mb(),
+            })
+
+    @contextmanager
+    def ticker(self, ticker: str):
+        """Bir hissenin indirme + analiz süresini kaydeder."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry = self.tickers.setdefault(ticker, {"seconds": 0.0, "bytes": 0})
+            entry["seconds"] = round(entry["seconds"] + time.perf_counter() - t0, 4)
+
+    def add_bytes(self, source: str, count: int, ticker: str = None):
+        self.bytes[source] = self.bytes.get(source, 0) + int(count)
+        if ticker is not None:
+            entry = self.tickers.setdefault(ticker, {"seconds": 0.0, "bytes": 0})
+            entry["bytes"] += int(count)
+
+    def add_retry(self, source: str):
+        self.retries[source] = self.retries.get(source, 0) + 1
+
+    def finish(self, **extra):
+        """Çalıştırmayı kapatır; extra alanlar kayda eklenir."""
+        self.total_seconds = round(time.perf_counter() - self._t0, 4)
+        self.extra.update(extra)
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "started_at": self.started_at.strftime("%Y-%m-%d %H:%M:%S"),
+            "total_seconds": self.total_seconds,
+            "peak_memory_mb": peak_memory_mb(),
+            "stages": self.stages,
+            "tickers": self.tickers,
+            "bytes": self.bytes,
+            "retries": self.retries,
+            **self.extra,
+        }
+
+    def write(self, directory: str = None) -> str:
+        """
+        JSON kaydını runs/run_YYYYmmdd_HHMMSS.json olarak yazar ve
+        günler arası karşılaştırma için runs/runs.jsonl dosyasına ekler.
+        """
+        directory = directory or config.RUN_LOG_DIR
+        os.makedirs(directory, exist_ok=True)
+        record = self.to_dict()
+
+        path = os.path.join(directory, f"run_{self.started_at.strftime('%Y%m%d_%H%M%S')}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False, indent=2)
+
+        with open(os.path.join(directory, "runs.jsonl"), "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+        return path
+
+    def print_summary(self):
+        """Aşama sürelerini terminalde gösterir."""
+        print(f"  ⏱️  Toplam süre: {self.total_seconds or 0:.2f} sn")
+        for stage in self.stages:
+            mark = "✅" if stage["status"] == "ok" else "❌"
+            print(f"     {mark} {stage['name']:12s} {stage['seconds']:8.2f} sn")
+        slowest = sorted(self.tickers.items(), key=lambda x: x[1]["seconds"], reverse=True)[:3]
+        if slowest:
+            print("     En yavaş hisseler: " + ", ".join(f"{t} ({v['seconds']:.2f} sn)" for t, v in slowest))
+        memory = peak_memory_mb()
+        if memory is not None:
+            print(f"     Tepe bellek: {memory} MB")
+
+
+_current = None
+
+
+def start_run(name: str = "run_full_analysis") -> RunMetrics:
+    """Yeni bir çalıştırma başlatır ve aktif ölçüm nesnesi yapar."""
+    global _current
+    _current = RunMetrics(name)
+    return _current
+
+
+def end_run():
+    """Aktif çalıştırmayı bırakır."""
+    global _current
+    _current = None
+
+
+def current() -> RunMetrics:
+    """Aktif ölçüm nesnesi (yoksa None)."""
+    return _current
+
+
+def add_bytes(source: str, count: int, ticker: str = None):
+    if _current is not None:
+        _current.add_bytes(source, count, ticker)
+
+
+def add_retry(source: str):
+    if _current is not None:
+        _current.add_retry(source)
+
+
+@contextmanager
+def ticker_timer(ticker: str):
+    if _current is None:
+        yield
+        return
+    with _current.ticker(ticker):
+        yield
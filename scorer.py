@@ -125,16 +125,24 @@ def calculate_final_score(ticker: str, technical_score: float,
 
 
 def select_top_stocks(all_analysis: list, sector_scores: dict,
-                      max_count: int = 3) -> list:
+                      max_count: int = 3, mode: str = None) -> list:
     """
     Tüm hisseleri skor alarak en iyi 1-3'ünü seçer.
 
     Seçim kriterleri:
     1) Nihai skor en yüksek olanlar
     2) Minimum skor threshold'u: 50 (altında olan hiçbiri seçilmez)
-    3) Sektör çeşitlendirmesi: Aynı sektörden max 1 hisse
+    3) Çeşitlendirme (mode, varsayılan config.SELECTION_MODE):
+       - "sector": Aynı sektörden max 1 hisse
+       - "correlation": Seçilenlerle getiri korelasyonu
+         config.CORRELATION_MAX_PAIRWISE'ı aşan hisse alınmaz
+       - "both": İkisi birden
     4) Rating'i "AL" veya yukarısı olmalı
     """
+    mode = mode or config.SELECTION_MODE
+    if mode not in ("sector", "correlation", "both"):
+        raise ValueError(f"Bilinmeyen seçim modu: {mode}")
+
     # Her hisse için nihai skor hesapla
     scored = []
     for stock in all_analysis:
@@ -151,7 +159,13 @@ def select_top_stocks(all_analysis: list, sector_scores: dict,
     # Final score'a göre sort
     scored.sort(key=lambda x: x.get("final_score", 0), reverse=True)
 
-    # Sektör çeşitlendirmesi ile seç
+    # Korelasyon matrisi tüm adaylar için bir kez hesaplanır
+    correlations = None
+    if mode in ("correlation", "both"):
+        from correlation import correlation_matrix
+        correlations = correlation_matrix(scored)
+
+    # Çeşitlendirme ile seç
     selected = []
     used_sectors = set()
 
@@ -170,9 +184,17 @@ def select_top_stocks(all_analysis: list, sector_scores: dict,
 
         # Sektör çeşitlendirmesi
         sector = stock.get("sector", "")
-        if sector in used_sectors:
+        if mode in ("sector", "both") and sector in used_sectors:
             continue  # Bu sektörden zaten seçtik
 
+        # Korelasyon çeşitlendirmesi (bilinmeyen korelasyon engellemez)
+        if correlations is not None:
+            max_corr = correlations.max_with(stock.get("ticker"), [s.get("ticker") for s in selected])
+            if max_corr > config.CORRELATION_MAX_PAIRWISE:
+                continue  # Seçilenlerden biriyle fazla birlikte hareket ediyor
+            if max_corr == max_corr:
+                stock["max_correlation"] = round(max_corr, 2)
+
         selected.append(stock)
         used_sectors.add(sector)
 
@@ -186,7 +208,8 @@ def select_top_stocks(all_analysis: list, sector_scores: dict,
 
 
 def generate_recommendation_text(selected: list, sector_scores: dict,
-                                  news_summary: list = None) -> dict:
+                                  news_summary: list = None,
+                                  sector_weights: dict = None) -> dict:
     """
     Son kullanıcı için okunabilir önerileri oluşturur.
     """
@@ -236,17 +259,26 @@ def generate_recommendation_text(selected: list, sector_scores: dict,
     return {
         "recommendations": recommendations,
         "total_selected": len(selected),
-        "market_mood": determine_market_mood(sector_scores),
+        "market_mood": determine_market_mood(sector_scores, sector_weights),
         "analysis_date": None  # Sonra doldurulacak
     }
 
 
-def determine_market_mood(sector_scores: dict) -> str:
-    """Genel piyasa duygu analizi."""
+def determine_market_mood(sector_scores: dict, sector_weights: dict = None) -> str:
+    """
+    Genel piyasa duygu analizi.
+    sector_weights verilirse (haber toplayıcısının sönümlü ağırlıkları),
+    sektör ortalamaları düz ortalama yerine bu ağırlıklarla birleştirilir.
+    """
     if not sector_scores:
         return "⚪ Belirsiz"
 
-    avg_all = sum(sector_scores.values()) / len(sector_scores)
+    total_weight = sum((sector_weights or {}).get(s, 0.0) for s in sector_scores)
+    if total_weight > 0:
+        avg_all = sum(score * sector_weights.get(s, 0.0)
+                      for s, score in sector_scores.items()) / total_weight
+    else:
+        avg_all = sum(sector_scores.values()) / len(sector_scores)
 
     if avg_all >= 0.3:
         return "🟢 Çok Olumlu - Piyasalar yukarı baskı altında"
@@ -0,0 +1,115 @@
+# ============================================================
+# sentiment_aggregator.py — Sektörel Sentiment Toplayıcı
+# ============================================================
+# Bu modül:
+# 1) Her haberi yayın zamanına (publishedAt) göre üstel sönümle tartar
+# 2) Kaynağa göre ağırlık uygular (Reuters > bilinmeyen blog gibi)
+# 3) Sektör başına sönümlü toplam, ağırlık ve haber sayısı tutar
+# 4) Her güncelleme O(1), her sorgu O(sektör sayısı)
+# ============================================================
+
+import math
+import time
+from typing import Dict, List
+import config
+
+
+class SectorSentimentAggregator:
+    """
+    Zaman sönümlü, kaynak ağırlıklı sektör sentiment toplayıcısı.
+
+    Her sektör için [weighted_sum, weight_total, article_count, anchor_ts]
+    tutulur. Toplamlar anchor_ts (sektördeki en yeni haber) anına göre
+    saklanır; sorgu anında ortak bir sönüm çarpanı uygulanır. Böylece sıra
+    dışı gelen haberler de O(1) eklenir.
+
+    Geçmişe dönük sorgular için haberler zaman sırasıyla eklenip arada
+    sorgulanmalıdır: at_ts, eklenen en yeni haberden önce olamaz.
+    """
+
+    def __init__(self, half_life_hours: float = None,
+                 source_weights: Dict[str, float] = None):
+        self.half_life_hours = half_life_hours or config.NEWS_DECAY_HALF_LIFE_HOURS
+        self._decay_rate = math.log(2) / (self.half_life_hours * 3600.0)
+
+        weights = config.NEWS_SOURCE_WEIGHTS if source_weights is None else source_weights
+        self.source_weights = {name.lower(): w for name, w in weights.items()}
+        self._state = {}
+
+    def source_weight(self, source: str) -> float:
+        """Kaynak ağırlığı; listede olmayan kaynaklar varsayılan ağırlığı alır."""
+        if not source:
+            return config.NEWS_DEFAULT_SOURCE_WEIGHT
+        return self.source_weights.get(source.lower(), config.NEWS_DEFAULT_SOURCE_WEIGHT)
+
+    def add(self, score: float, sectors: List[str], published_ts: float,
+            source: str = None):
+        """Bir haberin skorunu ilgili sektörlere O(1) ekler."""
+        base_weight = self.source_weight(source)
+        if base_weight <= 0:
+            return
+
+        for sector in sectors:
+            state = self._state.get(sector)
+            if state is None:
+                self._state[sector] = [base_weight * score, base_weight, 1, published_ts]
+                continue
+
+            weighted_sum, weight_total, count, anchor_ts = state
+            if published_ts > anchor_ts:
+                factor = math.exp(-self._decay_rate * (published_ts - anchor_ts))
+                weighted_sum *= factor
+                weight_total *= factor
+                anchor_ts = published_ts
+                weight = base_weight
+            else:
+                weight = base_weight * math.exp(-self._decay_rate * (anchor_ts - published_ts))
+
+            state[0] = weighted_sum + weight * score
+            state[1] = weight_total + weight
+            state[2] = count + 1
+            state[3] = anchor_ts
+
+    def _decay(self, anchor_ts: float, at_ts: float) -> float:
+        return math.exp(-self._decay_rate * max(0.0, at_ts - anchor_ts))
+
+    def weights(self, at_ts: float = None) -> Dict[str, float]:
+        """Sektörlerin at_ts anındaki sönümlü toplam ağırlıkları."""
+        if at_ts is None:
+            at_ts = time.time()
+        return {
+            sector: state[1] * self._decay(state[3], at_ts)
+            for sector, state in self._state.items()
+        }
+
+    def counts(self) -> Dict[str, int]:
+        """Sektör başına toplam haber sayısı (sönümsüz)."""
+        return {sector: state[2] for sector, state in self._state.items()}
+
+    def scores(self, at_ts: float = None, min_weight: float = None) -> Dict[str, float]:
+        """
+        Sektörlerin at_ts anındaki sönümlü ağırlıklı ortalama skorları.
+        Ağırlığı min_weight altına düşen (bayat) sektörler dahil edilmez.
+        """
+        if at_ts is None:
+            at_ts = time.time()
+        if min_weight is None:
+            min_weight = config.NEWS_MIN_SECTOR_WEIGHT
+
+        scores = {}
+        for sector, (weighted_sum, weight_total, _, anchor_ts) in self._state.items():
+            if weight_total <= 0:
+                continue
+            if weight_total * self._decay(anchor_ts, at_ts) < min_weight:
+                continue
+            scores[sector] = round(weighted_sum / weight_total, 3)
+
+        return scores
+
+    def to_rows(self) -> list:
+        """Kalıcı saklama için (sector, weighted_sum, weight_total, count, anchor_ts) satırları."""
+        return [(sector, *state) for sector, state in self._state.items()]
+
+    def load_rows(self, rows: list):
+        """to_rows() çıktısından durumu geri yükler."""
+        self._state = {row[0]: list(row[1:]) for row in rows}
@@ -0,0 +1,235 @@
+# ============================================================
+# signals.py — Vektörel Bar Bazlı Sinyal Paneli
+# ============================================================
+# Bu modül:
+# 1) score_technical'ın göstergelerini (indicators.py kaydı) tüm
+#    hisseler ve HER BAR için tek geçişte hesaplar; son bardaki değer
+#    score_technical(df)["score"] ile aynıdır
+# 2) Evreni tarih × hisse hizalı numpy matrislerine (SignalPanel)
+#    çevirir; fiyatlar cache'ten bir kez okunur
+# 3) Eşik / gösterge ağırlığı / nihai skor ağırlığı parametreleriyle skor
+#    matrisini üretir: walk-forward optimizasyonu her parametre seti
+#    için veriyi tekrar okumaz, sadece matris işlemi yapar
+#
+# Parametre varsayılanları (DEFAULT_PARAMS) gösterge kaydındaki eşikler,
+# config.INDICATOR_WEIGHTS ve calculate_final_score'daki sabitlerdir.
+# ============================================================
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+import config
+import indicators
+from indicators import MIN_BARS
+
+FIBONACCI_LOOKBACK = 60
+SUPPORT_LEVEL, RESISTANCE_LEVEL = 0.382, 0.618  # backtest'teki fib_0.382 / fib_0.618
+
+DEFAULT_PARAMS = {
+    # gösterge eşikleri ve w_<gösterge> ağırlıkları (puanlarla çarpılır)
+    **indicators.default_params(),
+    # calculate_final_score ağırlıkları (teknik = teknik + temel proxy)
+    "weight_technical": (config.WEIGHT_TECHNICAL + config.WEIGHT_FUNDAMENTAL) / 100.0,
+    "weight_news": config.WEIGHT_NEWS_SENTIMENT / 100.0,
+    "weight_momentum": config.WEIGHT_MOMENTUM / 100.0,
+    # backtest alım eşiği
+    "buy_threshold": 55.0,
+}
+
+# Her göstergenin puanını etkileyen parametreler (blok cache anahtarı)
+BLOCK_PARAMS = {ind.name: tuple(ind.params) for ind in indicators.scoring_indicators()}
+
+# Sadece nihai skoru etkileyen parametreler; geri kalanı teknik skoru etkiler
+FINAL_PARAM_KEYS = ("weight_technical", "weight_news", "weight_momentum", "buy_threshold")
+TECHNICAL_PARAM_KEYS = tuple(k for k in DEFAULT_PARAMS if k not in FINAL_PARAM_KEYS)
+
+INDICATOR_KEYS = ["close"] + list(dict.fromkeys(
+    key for ind in indicators.scoring_indicators() for key in ind.score_keys))
+# Portföy simülasyonu için: gün içi fiyatlar ve o barın Fibonacci seviyeleri
+PRICE_KEYS = ["open", "high", "low", "support", "resistance"]
+
+
+def _panel_arrays(data: dict) -> dict:
+    """
+    Sağa hizalı toplu veriden (indicators.stack_frames) puanlama girdileri,
+    gün içi fiyatlar ve her bar itibarıyla calculate_fibonacci_levels'ın
+    destek (fib_0.382) / direnç (fib_0.618) seviyeleri.
+    """
+    values = indicators.compute(data, list(BLOCK_PARAMS))
+    arrays = {key: values[key] for key in INDICATOR_KEYS}
+
+    window_high = data["high"].rolling(window=FIBONACCI_LOOKBACK, min_periods=1).max().to_numpy()
+    window_low = data["low"].rolling(window=FIBONACCI_LOOKBACK, min_periods=1).min().to_numpy()
+    diff = window_high - window_low
+    arrays.update({
+        "open": data["open"].to_numpy(),
+        "high": data["high"].to_numpy(),
+        "low": data["low"].to_numpy(),
+        "support": window_low + diff * SUPPORT_LEVEL,
+        "resistance": window_low + diff * RESISTANCE_LEVEL,
+    })
+    arrays["valid"] = data["row"] >= MIN_BARS - 1
+    return arrays
+
+
+def indicator_arrays(df: pd.DataFrame) -> dict:
+    """
+    Bir hissenin tüm barları için score_technical girdilerini hesaplar.
+    Döndürür: {anahtar: (N,) float64 dizi} + "valid" (en az MIN_BARS bar)
+    """
+    arrays = _panel_arrays(indicators.stack_frames([df]))
+    return {key: arrays[key][:, 0] for key in INDICATOR_KEYS + ["valid"]}
+
+
+def block_bonus(block: str, ind: dict, params: dict) -> np.ndarray:
+    """
+    Tek bir göstergenin puanını her hücre için hesaplar.
+    ind dizileri herhangi bir şekilde (N,) veya (T, H) olabilir.
+    """
+    if block not in BLOCK_PARAMS:
+        raise ValueError(f"Bilinmeyen blok: {block}")
+    return indicators.indicator_bonus(block, ind, params)
+
+
+def technical_scores(ind: dict, params: dict = None, block_cache: dict = None) -> np.ndarray:
+    """
+    score_technical skorunu her hücre için hesaplar (0-100, yetersiz veri 0).
+    block_cache verilirse blok puanları parametre değerlerine göre saklanır;
+    sadece ağırlıkları farklı parametre setleri blokları yeniden hesaplamaz.
+    """
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    return indicators.total_score(ind, params, block_cache, valid=ind["valid"])
+
+
+def final_scores(tech: np.ndarray, sector_norm, params: dict = None) -> np.ndarray:
+    """
+    calculate_final_score formülü, vektörel.
+    sector_norm: sektör haber skoru 0-1 aralığında (nötr = 0.5)
+    """
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    wt, wn, wm = params["weight_technical"], params["weight_news"], params["weight_momentum"]
+    total = wt + wn + wm
+    final = (tech / 100.0 * wt + sector_norm * wn + 0.5 * wm) / total * 100.0
+    return np.clip(final, 0, 100)
+
+
+class SignalPanel:
+    """
+    Tarih × hisse hizalı gösterge matrisleri. Hissenin işlem görmediği
+    günler NaN / valid=False'tur. Göstergeler her hissenin kendi bar
+    serisi üzerinde hesaplanır (tatiller farklı olsa bile pencereler kaymaz).
+
+    dates:      (T,) datetime64[D]
+    tickers:    H hisse
+    ind:        INDICATOR_KEYS + PRICE_KEYS + "valid" → (T, H)
+    fwd:        (T, H) horizon bar sonraki kapanışa göre getiri (%)
+    sector_norm:(T, H) o günün başı itibarıyla sektör haber skoru (0-1)
+    """
+
+    def __init__(self, dates, tickers: list, ind: dict, fwd: np.ndarray,
+                 sector_norm: np.ndarray, horizon: int):
+        self.dates = dates
+        self.tickers = list(tickers)
+        self.ind = ind
+        self.fwd = fwd
+        self.sector_norm = sector_norm
+        self.horizon = horizon
+
+    @property
+    def shape(self) -> tuple:
+        return self.fwd.shape
+
+    def rows(self, start: str = None, end: str = None) -> slice:
+        """[start, end] tarih aralığına düşen satırlar."""
+        lo = 0 if start is None else int(np.searchsorted(self.dates, np.datetime64(start), "left"))
+        hi = len(self.dates) if end is None else int(np.searchsorted(self.dates, np.datetime64(end), "right"))
+        return slice(lo, hi)
+
+    def window(self, rows: slice) -> "SignalPanel":
+        """Satır aralığının görünümü (kopya yok)."""
+        return SignalPanel(self.dates[rows], self.tickers,
+                           {k: v[rows] for k, v in self.ind.items()},
+                           self.fwd[rows], self.sector_norm[rows], self.horizon)
+
+    def technical(self, params: dict = None, block_cache: dict = None) -> np.ndarray:
+        return technical_scores(self.ind, params, block_cache)
+
+    def final(self, params: dict = None, block_cache: dict = None) -> np.ndarray:
+        return final_scores(self.technical(params, block_cache), self.sector_norm, params)
+
+    # ─── OLUŞTURMA ─────────────────────────────────────────
+
+    @classmethod
+    def from_frames(cls, frames: dict, horizon: int = 7,
+                    news_archive=None) -> "SignalPanel":
+        """
+        {ticker: OHLCV DataFrame} sözlüğünden panel kurar.
+        news_archive verilirse her gün için sektör skorları arşivden
+        (o günün başı itibarıyla) alınır; yoksa nötr 0.5.
+        """
+        tickers = [t for t, df in frames.items() if df is not None and not df.empty]
+        index = pd.DatetimeIndex([])
+        for t in tickers:
+            index = index.union(frames[t].index)
+        dates = index.values.astype("datetime64[D]")
+
+        n_dates, n_tickers = len(dates), len(tickers)
+        ind = {k: np.full((n_dates, n_tickers), np.nan) for k in INDICATOR_KEYS + PRICE_KEYS}
+        ind["valid"] = np.zeros((n_dates, n_tickers), dtype=bool)
+        fwd = np.full((n_dates, n_tickers), np.nan)
+
+        # Göstergeler tüm hisseler için tek seferde (bar hizalı) hesaplanır,
+        # sonra her hissenin barları kendi tarihlerine yerleştirilir
+        data = indicators.stack_frames([frames[t] for t in tickers])
+        stacked = _panel_arrays(data)
+        offsets = len(data["row"]) - data["lengths"]
+        del data
+
+        for j, ticker in enumerate(tickers):
+            df = frames[ticker]
+            pos = np.searchsorted(dates, df.index.values.astype("datetime64[D]"))
+            arrays = {key: values[offsets[j]:, j] for key, values in stacked.items()}
+            for key, values in arrays.items():
+                ind[key][pos, j] = values
+
+            # sinyal barının kapanışından horizon bar sonraki kapanışa getiri
+            close = arrays["close"]
+            if len(close) > horizon:
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    fwd[pos[:-horizon], j] = (close[horizon:] / close[:-horizon] - 1) * 100
+
+        sector_norm = np.full((n_dates, n_tickers), 0.5)
+        if news_archive is not None and news_archive.available():
+            from scorer import map_sector_score_to_stock
+
+            for i, day in enumerate(dates):
+                scores = news_archive.sector_scores_asof(str(day))
+                if scores:
+                    sector_norm[i] = [(map_sector_score_to_stock(t, scores) + 1.0) / 2.0
+                                      for t in tickers]
+
+        return cls(dates, tickers, ind, fwd, sector_norm, horizon)
+
+    @classmethod
+    def build(cls, tickers: list, start: str, end: str, horizon: int = 7,
+              news_archive=None, lookback_days: int = 200) -> "SignalPanel":
+        """
+        Fiyatları cache'ten (gerekirse tek indirmeyle) okuyup panel kurar.
+        Göstergelerin ısınması için start'tan lookback_days önce, çıkış
+        fiyatları için end'den sonra birkaç hafta veri yüklenir.
+        """
+        from price_cache import load_prices, prefetch
+
+        data_start = datetime.strptime(start, "%Y-%m-%d") - timedelta(days=lookback_days)
+        data_end = datetime.strptime(end, "%Y-%m-%d") + timedelta(days=horizon * 2 + 7)
+        prefetch(tickers, data_start, data_end)
+
+        frames = {}
+        for ticker in tickers:
+            try:
+                frames[ticker] = load_prices(ticker, data_start, data_end)
+            except Exception as e:
+                print(f"  ⚠️  {ticker} yüklenemedi: {e}")
+        return cls.from_frames(frames, horizon=horizon, news_archive=news_archive)
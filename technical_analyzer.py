@@ -2,50 +2,55 @@
 # technical_analyzer.py — Teknik Analiz Engine
 # ============================================================
 # Bu modül:
-# 1) yfinance ile hisse verileri çeker
-# 2) RSI, MACD, Bollinger, SMA hesaplar
+# 1) yfinance ile hisse verileri çeker (paylaşımlı fiyat cache'i üzerinden)
+# 2) RSI, MACD, Bollinger, SMA hesaplar (skorlama indicators.py kaydı üzerinden)
 # 3) Fibonacci destek/direnç seviyelerini belirler
-# 4) Her hisse için 0-100 arası teknik skor üretir
+# 4) Her hisse için 0-100 arası teknik skor üretir (tüm hisseler toplu)
+# 5) Çoklu zaman dilimi modunda günlük veriden haftalık / aylık barlar
+#    türetir ve trend uyum skorunu hesaplar (ek indirme yok)
 # ============================================================
 
-import yfinance as yf
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import config
+import run_metrics
+import replay
+from price_cache import load_prices
 
 
 def download_stock_data(ticker: str, period_days: int = 200) -> pd.DataFrame:
     """
     Bir hisse için son N günsünün verisini çeker.
     Döndürür: OHLCV DataFrame
+    Replay modunda veri fixture klasöründen okunur, ağa çıkılmaz.
     """
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=period_days)
-
-    try:
-        df = yf.download(
-            ticker,
-            start=start_date.strftime("%Y-%m-%d"),
-            end=end_date.strftime("%Y-%m-%d"),
-            progress=False,
-            auto_adjust=True
-        )
-
-        if df.empty:
+    replay_key = [ticker, period_days]
+    if replay.is_replaying():
+        df = replay.load("yahoo", replay_key, default=None, frame=True)
+        if df is None or df.empty:
             print(f"[⚠️] {ticker} için veri bulunamadı.")
             return pd.DataFrame()
+        return df
 
-        # Column flatten (yfinance bazen multi-index döndürür)
-        if isinstance(df.columns, pd.MultiIndex):
-            df.columns = df.columns.get_level_values(0)
+    df = _download_live(ticker, period_days)
+    replay.record("yahoo", replay_key, df, frame=True)
+    return df
 
-        return df
 
-    except Exception as e:
-        print(f"[❌] {ticker} veri çekme hatası: {e}")
+def _download_live(ticker: str, period_days: int) -> pd.DataFrame:
+    """Paylaşımlı fiyat cache'i üzerinden (gerekirse Yahoo'dan) veri çeker."""
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=period_days)
+
+    df = load_prices(ticker, start_date, end_date)
+
+    if df.empty:
+        print(f"[⚠️] {ticker} için veri bulunamadı.")
         return pd.DataFrame()
 
+    return df
+
 
 def calculate_rsi(prices: pd.Series, period: int = 14) -> pd.Series:
     """RSI (Relative Strength Index) hesaplar."""
@@ -120,6 +125,25 @@ def calculate_fibonacci_levels(df: pd.DataFrame, lookback: int = 60) -> dict:
     return levels
 
 
+def _fibonacci_batch(data: dict, lookback: int = 60) -> list:
+    """calculate_fibonacci_levels'ın toplu hali (indicators.stack_frames verisi üzerinde)."""
+    high = np.nanmax(data["high"].to_numpy()[-lookback:], axis=0)
+    low = np.nanmin(data["low"].to_numpy()[-lookback:], axis=0)
+    diff = high - low
+    close = data["close"].to_numpy()[-1]
+
+    levels = [{} for _ in range(len(close))]
+    for level in config.FIBONACCI_LEVELS:
+        values = low + (diff * level)
+        for col, value in enumerate(values):
+            levels[col][f"fib_{level}"] = round(float(value), 2)
+    for col in range(len(close)):
+        levels[col]["high"] = round(float(high[col]), 2)
+        levels[col]["low"] = round(float(low[col]), 2)
+        levels[col]["current"] = round(float(close[col]), 2)
+    return levels
+
+
 def calculate_momentum(prices: pd.Series, period: int = 10) -> float:
     """
     Momentum: Son N gün fiyat değişimi (yüzde).
@@ -138,160 +162,218 @@ def score_technical(df: pd.DataFrame) -> dict:
     Bir hisse için teknik skor hesaplar (0-100 arası).
     Yüksek skor = daha olumlu teknik görüntü.
 
-    Skor kriterleri:
+    Skor kriterleri (indicators.py kaydı, ağırlıklar config.INDICATOR_WEIGHTS):
     - RSI: 30-70 arası normal → 30 altı oversold (alım sinyali) → 70 üstü overbought
     - MACD: Histogram pozitif = bullish
     - Bollinger: Fiyat bant altında = potansiyel alım, üstünde = potansiyel satım
     - SMA: Fiyat > SMA50 = yukarı trend
     - Momentum: Pozitif momentum olumlu
+    - OBV / Hacim z-skoru / VWAP / A/D: hacim teyidi, yarım ağırlık (0.5)
+    - ADX / Stokastik: varsayılan ağırlık 0 (sadece detay)
     """
-    if df.empty or len(df) < 60:
-        return {"score": 0, "details": {}, "signals": []}
-
-    close = df["Close"].squeeze()
-    score = 50  # Başlangıç neutralize noktası
-    signals = []
-
-    # --- RSI Analizi (max ±15 puan) ---
-    rsi = calculate_rsi(close, config.RSI_PERIOD)
-    current_rsi = float(rsi.iloc[-1]) if not pd.isna(rsi.iloc[-1]) else 50
-
-    if current_rsi < 30:
-        rsi_bonus = 15  # Oversold → potansiyel alım
-        signals.append(f"RSI {current_rsi:.1f} → Oversold (Alım Sinyali)")
-    elif current_rsi < 45:
-        rsi_bonus = 8
-        signals.append(f"RSI {current_rsi:.1f} → Düşük Bölge")
-    elif current_rsi > 70:
-        rsi_bonus = -15  # Overbought → dikkatli ol
-        signals.append(f"RSI {current_rsi:.1f} → Overbought (Dikkat)")
-    elif current_rsi > 55:
-        rsi_bonus = 3
-        signals.append(f"RSI {current_rsi:.1f} → Normal-Güçlü")
-    else:
-        rsi_bonus = 0
-        signals.append(f"RSI {current_rsi:.1f} → Neutral")
-
-    score += rsi_bonus
-
-    # --- MACD Analizi (max ±15 puan) ---
-    macd = calculate_macd(close, config.MACD_FAST, config.MACD_SLOW, config.MACD_SIGNAL)
-    hist_current = float(macd["histogram"].iloc[-1]) if not pd.isna(macd["histogram"].iloc[-1]) else 0
-    hist_prev = float(macd["histogram"].iloc[-2]) if len(macd["histogram"]) > 1 else 0
-
-    if hist_current > 0 and hist_prev > 0:
-        macd_bonus = 15  # Bullish
-        signals.append("MACD → Güçlü Bullish (Histogram pozitif)")
-    elif hist_current > 0 and hist_prev <= 0:
-        macd_bonus = 12  # Bullish crossover
-        signals.append("MACD → Bullish Crossover (Alım Sinyali)")
-    elif hist_current < 0 and hist_prev > 0:
-        macd_bonus = -12  # Bearish crossover
-        signals.append("MACD → Bearish Crossover (Satım Sinyali)")
-    elif hist_current < 0:
-        macd_bonus = -8
-        signals.append("MACD → Bearish")
-    else:
-        macd_bonus = 0
-
-    score += macd_bonus
-
-    # --- Bollinger Band Analizi (max ±10 puan) ---
-    bollinger = calculate_bollinger_bands(close, config.BOLLINGER_PERIOD)
-    current_price = float(close.iloc[-1])
-    upper = float(bollinger["upper"].iloc[-1]) if not pd.isna(bollinger["upper"].iloc[-1]) else current_price
-    lower = float(bollinger["lower"].iloc[-1]) if not pd.isna(bollinger["lower"].iloc[-1]) else current_price
-
-    if current_price < lower:
-        bb_bonus = 10  # Alt bantın altında → alım
-        signals.append("Bollinger → Fiyat Alt Bantın Altında (Alım Potansiyeli)")
-    elif current_price < lower * 1.02:
-        bb_bonus = 5
-        signals.append("Bollinger → Alt Bant Yakınında")
-    elif current_price > upper:
-        bb_bonus = -8  # Üst bantın üstünde → dikkat
-        signals.append("Bollinger → Fiyat Üst Bantın Üstünde (Dikkat)")
-    else:
-        bb_bonus = 0
-        signals.append("Bollinger → Band İçinde (Normal)")
-
-    score += bb_bonus
-
-    # --- SMA Analizi (max ±10 puan) ---
-    sma_short = float(close.rolling(window=config.SMA_SHORT).mean().iloc[-1]) if len(close) >= config.SMA_SHORT else current_price
-    sma_long = float(close.rolling(window=config.SMA_LONG).mean().iloc[-1]) if len(close) >= config.SMA_LONG else current_price
-
-    if current_price > sma_long and sma_short > sma_long:
-        sma_bonus = 10  # Güçlü yukarı trend
-        signals.append("SMA → Güçlü Yukarı Trend (Fiyat > SMA20 > SMA50)")
-    elif current_price > sma_long:
-        sma_bonus = 5
-        signals.append("SMA → Yukarı Trend")
-    elif current_price < sma_long:
-        sma_bonus = -5
-        signals.append("SMA → Aşağı Trend")
-    else:
-        sma_bonus = 0
-
-    score += sma_bonus
-
-    # --- Momentum Analizi (max ±10 puan) ---
-    momentum = calculate_momentum(close, 10)
-    if momentum > 5:
-        mom_bonus = 10
-        signals.append(f"Momentum → Güçlü Pozitif ({momentum:+.1f}%)")
-    elif momentum > 0:
-        mom_bonus = 5
-        signals.append(f"Momentum → Pozitif ({momentum:+.1f}%)")
-    elif momentum < -5:
-        mom_bonus = -10
-        signals.append(f"Momentum → Güçlü Negatif ({momentum:+.1f}%)")
-    elif momentum < 0:
-        mom_bonus = -3
-        signals.append(f"Momentum → Negatif ({momentum:+.1f}%)")
-    else:
-        mom_bonus = 0
+    return score_technical_batch([df])[0]
 
-    score += mom_bonus
 
-    # Skoru 0-100 arası sınırla
-    score = max(0, min(100, score))
+def _round_score(score: float):
+    # Tam sayı ağırlıklarla skor tam sayıdır (mail / grafikte "57/100" görünür)
+    score = float(score)
+    return int(score) if score.is_integer() else round(score, 1)
 
-    # Fibonacci
-    fib = calculate_fibonacci_levels(df)
 
-    return {
-        "score": round(score, 1),
-        "rsi": round(current_rsi, 1),
-        "macd_histogram": round(hist_current, 4),
-        "bollinger_position": "alt" if current_price < lower else "üst" if current_price > upper else "orta",
-        "momentum_pct": round(momentum, 2),
-        "sma_short": round(sma_short, 2),
-        "sma_long": round(sma_long, 2),
-        "fibonacci": fib,
-        "signals": signals,
-        "current_price": round(current_price, 2)
-    }
+def score_technical_batch(frames: list, history: list = None) -> list:
+    """
+    score_technical'ın toplu hali: tüm göstergeler tüm hisseler için tek
+    seferde hesaplanır. Sonuç listesi frames ile aynı sıradadır.
+    history: frames ile aynı sırada daha uzun günlük veri verilirse
+    haftalık / aylık göstergeler ve trend uyum skoru eklenir.
+    """
+    import indicators
+
+    results = [{"score": 0, "details": {}, "signals": []} for _ in frames]
+    usable = [i for i, df in enumerate(frames) if not df.empty and len(df) >= indicators.MIN_BARS]
+    if not usable:
+        return results
+
+    data = indicators.stack_frames([frames[i] for i in usable])
+    values = indicators.compute(data)
+    fibonacci = _fibonacci_batch(data)
+    params = indicators.default_params()
+    scores = indicators.total_score({k: v[-1] for k, v in values.items()}, params)
+    legacy = {"rsi", "macd", "bollinger", "sma", "momentum"}
+    extra_keys = [key for ind in indicators.REGISTRY.values() if ind.name not in legacy
+                  for key in ind.outputs]
+
+    for col, i in enumerate(usable):
+        last = {key: float(arr[-1, col]) for key, arr in values.items()}
+        signals = [text for ind in indicators.scoring_indicators()
+                   if params[f"w_{ind.name}"] != 0
+                   for text in [ind.signal(last, params)] if text]
+
+        current_price = last["close"]
+        current_rsi = last["rsi"] if not pd.isna(last["rsi"]) else 50
+        upper = last["bb_upper"] if not pd.isna(last["bb_upper"]) else current_price
+        lower = last["bb_lower"] if not pd.isna(last["bb_lower"]) else current_price
+
+        results[i] = {
+            "score": _round_score(scores[col]),
+            "rsi": round(current_rsi, 1),
+            "macd_histogram": round(last["hist"], 4),
+            "bollinger_position": "alt" if current_price < lower else "üst" if current_price > upper else "orta",
+            "momentum_pct": round(last["momentum"], 2),
+            "sma_short": round(last["sma_short"], 2),
+            "sma_long": round(last["sma_long"], 2),
+            "indicators": {key: None if pd.isna(last[key]) else round(last[key], 4) for key in extra_keys},
+            "fibonacci": fibonacci[col],
+            "signals": signals,
+            "current_price": round(current_price, 2)
+        }
+
+    if history is not None:
+        timeframes = multi_timeframe_batch([history[i] for i in usable])
+        daily_trend = _trend_direction({k: v[-1] for k, v in values.items()})
+        for col, i in enumerate(usable):
+            _merge_timeframes(results[i], float(daily_trend[col]), timeframes[col])
+
+    return results
+
+
+# ─── ÇOKLU ZAMAN DİLİMİ ────────────────────────────────────
+
+# Ay sonu kuralı pandas 2.2'de "M" → "ME" oldu; requirements pandas>=2.0 izin veriyor
+_MONTH_END = "ME" if tuple(int(p) for p in pd.__version__.split(".")[:2]) >= (2, 2) else "M"
+TIMEFRAMES = {"weekly": "W-FRI", "monthly": _MONTH_END}
+TIMEFRAME_LABELS = {"daily": "G", "weekly": "H", "monthly": "A"}
+_RESAMPLE_RULES = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+
+
+def _column(df: pd.DataFrame, column: str) -> pd.Series:
+    if column not in df:
+        return pd.Series(np.nan, index=df.index)
+    values = df[column]
+    return values.iloc[:, 0] if values.ndim > 1 else values  # yfinance çoklu kolon başlığı
+
+
+def resample_batch(frames: list, rule: str) -> dict:
+    """
+    Günlük OHLCV listesini haftalık ("W-FRI") / aylık (ay sonu) barlara çevirir.
+    Tüm hisseler tek bir geniş tabloda, kolon başına tek resample çağrısıyla işlenir.
+    Döndürür: indicators.stack_matrices verisi (tarih hizalı)
+    """
+    import indicators
+
+    columns = {}
+    for column, how in _RESAMPLE_RULES.items():
+        wide = pd.concat([_column(df, column) for df in frames], axis=1, keys=range(len(frames)))
+        columns[column.lower()] = wide.resample(rule).agg(how)
+    # İşlem görmeyen dönemlerde hacim toplamı 0 değil NaN olmalı
+    columns["volume"] = columns["volume"].where(columns["close"].notna())
+    return indicators.stack_matrices(columns)
+
+
+def _trend_direction(last: dict) -> np.ndarray:
+    """
+    Trend yönü (-1 … +1): fiyat / SMA kısa, SMA kısa / SMA uzun ve MACD
+    histogramı işaretlerinin ortalaması. Hesaplanamayan bileşen atlanır.
+    """
+    parts = np.sign(np.vstack([last["close"] - last["sma_short"],
+                               last["sma_short"] - last["sma_long"],
+                               last["hist"]]))
+    known = ~np.isnan(parts)
+    with np.errstate(invalid="ignore"):
+        return np.where(known, parts, 0.0).sum(axis=0) / known.sum(axis=0)
+
+
+def multi_timeframe_batch(histories: list) -> list:
+    """
+    Her hisse için haftalık / aylık göstergeler ve trend yönü; tüm evren
+    zaman dilimi başına tek seferde hesaplanır.
+    Döndürür: [{"weekly": {...}, "monthly": {...}}] (histories ile aynı sırada)
+    """
+    import indicators
+
+    params = indicators.default_params()
+    results = [{} for _ in histories]
+    for name, rule in TIMEFRAMES.items():
+        data = resample_batch(histories, rule)
+        values = indicators.compute(data)
+        close = values["close"]
+        if close.size == 0:
+            continue
+
+        # Her hissenin son geçerli barı (işlemi erken bitenler için de)
+        has_bar = ~np.isnan(close)
+        rows = len(close) - 1 - has_bar[::-1].argmax(axis=0)
+        cols = np.arange(close.shape[1])
+        last = {key: arr[rows, cols] for key, arr in values.items()}
+        trend = _trend_direction(last)
+        scores = indicators.total_score(last, params)
+        bars = data["row"][rows, cols] + 1
+
+        for j in range(len(histories)):
+            if not has_bar[:, j].any():
+                continue
+            results[j][name] = {
+                "bars": int(bars[j]),
+                "trend": None if np.isnan(trend[j]) else round(float(trend[j]), 2),
+                "score": _round_score(scores[j]) if bars[j] >= indicators.MIN_BARS else None,
+                "rsi": None if np.isnan(last["rsi"][j]) else round(float(last["rsi"][j]), 1),
+                "macd_histogram": round(float(last["hist"][j]), 4),
+                "sma_short": None if np.isnan(last["sma_short"][j]) else round(float(last["sma_short"][j]), 2),
+                "sma_long": None if np.isnan(last["sma_long"][j]) else round(float(last["sma_long"][j]), 2),
+            }
+    return results
+
+
+def _merge_timeframes(result: dict, daily_trend: float, timeframes: dict):
+    """
+    Günlük / haftalık / aylık trendleri config.MTF_WEIGHTS ile trend uyum
+    skoruna (0-100) çevirir ve teknik skora MTF_ALIGNMENT_WEIGHT oranında karıştırır.
+    """
+    trends = {"daily": daily_trend, **{n: tf["trend"] for n, tf in timeframes.items()}}
+    trends = {n: t for n, t in trends.items() if t is not None and t == t}
+    weights = {n: config.MTF_WEIGHTS.get(n, 0.0) for n in trends}
+    total = sum(weights.values())
+    if total <= 0:
+        return
+
+    alignment = 50 + 50 * sum(weights[n] * trends[n] for n in trends) / total
+    if len(trends) > 1 and all(t > 0 for t in trends.values()):
+        label = "Uyumlu Yukarı Trend"
+    elif len(trends) > 1 and all(t < 0 for t in trends.values()):
+        label = "Uyumlu Aşağı Trend"
+    else:
+        label = "Karışık"
+
+    result["timeframes"] = {"daily": {"trend": round(daily_trend, 2)}, **timeframes}
+    result["trend_alignment"] = {"score": round(alignment, 1), "label": label}
+
+    weight = config.MTF_ALIGNMENT_WEIGHT
+    result["score"] = _round_score((1 - weight) * result["score"] + weight * alignment)
+    arrows = " ".join(f"{TIMEFRAME_LABELS[n]}{'↑' if t > 0 else '↓' if t < 0 else '→'}"
+                      for n, t in trends.items())
+    result["signals"].append(f"Çoklu Zaman → {arrows} ({label})")
 
 
 def analyze_stock(ticker: str) -> dict:
     """Bir hisse için tam teknik analiz yapar."""
     print(f"  📈 {ticker} analiz edildi...")
-    df = download_stock_data(ticker, period_days=200)
+    with run_metrics.ticker_timer(ticker):
+        df = download_stock_data(ticker, period_days=200)
 
-    if df.empty:
-        return {"ticker": ticker, "score": 0, "error": "Veri bulunamadı"}
+        if df.empty:
+            return {"ticker": ticker, "score": 0, "error": "Veri bulunamadı"}
 
-    result = score_technical(df)
-    result["ticker"] = ticker
-    result["dataframe"] = df  # Grafik için sakla
+        result = score_technical(df)
+        result["ticker"] = ticker
+        result["dataframe"] = df  # Grafik için sakla
 
     return result
 
 
 def analyze_all_stocks(tickers: list = None) -> list:
     """
-    Tüm hisseleri analiz eder.
+    Tüm hisseleri analiz eder: veriler hisse hisse çekilir, göstergeler
+    tüm hisseler için tek seferde (score_technical_batch) hesaplanır.
     Döndürür: Score'a göre sıralanmış analiz listesi
     """
     if tickers is None:
@@ -299,9 +381,36 @@ def analyze_all_stocks(tickers: list = None) -> list:
 
     print(f"\n📊 {len(tickers)} hisse analiz başlıyor...\n")
 
+    multi_timeframe = config.MULTI_TIMEFRAME
+    period_days = config.MTF_LOOKBACK_DAYS if multi_timeframe else 200
+
+    frames = {}
+    for ticker in tickers:
+        print(f"  📈 {ticker} analiz edildi...")
+        with run_metrics.ticker_timer(ticker):
+            frames[ticker] = download_stock_data(ticker, period_days=period_days)
+
+    history = None
+    if multi_timeframe:
+        # Tek indirme: günlük skor yine son 200 günden, uzun geçmiş sadece
+        # haftalık / aylık barlar için kullanılır
+        history = frames
+        daily_start = pd.Timestamp((datetime.now() - timedelta(days=200)).date())
+        frames = {t: df[df.index >= daily_start] for t, df in history.items()}
+
+    available = [t for t in tickers if not frames[t].empty]
+    scored = dict(zip(available, score_technical_batch(
+        [frames[t] for t in available],
+        history=[history[t] for t in available] if history is not None else None)))
+
     results = []
     for ticker in tickers:
-        result = analyze_stock(ticker)
+        if ticker not in scored:
+            results.append({"ticker": ticker, "score": 0, "error": "Veri bulunamadı"})
+            continue
+        result = scored[ticker]
+        result["ticker"] = ticker
+        result["dataframe"] = frames[ticker]  # Grafik için sakla
         results.append(result)
 
     # Score'a göre azalan sıra
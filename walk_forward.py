@@ -0,0 +1,322 @@
+# ============================================================
+# walk_forward.py — Walk-Forward Optimizasyonu
+# ============================================================
+# Bu modül:
+# 1) Tarih aralığını kayan eğitim/test pencerelerine böler
+# 2) Her eğitim penceresinde score_technical / calculate_final_score
+#    eşik ve ağırlıklarını (config.WALK_FORWARD_GRID) ızgara aramasıyla
+#    seçer, seçilen parametreleri hemen sonraki test penceresinde
+#    örneklem dışı (out-of-sample) değerlendirir
+# 3) Fiyatlar cache'ten bir kez okunur, göstergeler SignalPanel'de bir
+#    kez hesaplanır; her parametre seti sadece matris işlemidir
+# 4) Pencereler birbirinden bağımsızdır → ProcessPool ile paralel
+#
+# Seçim kuralı: nihai skor eşiği geçen en iyi 3 hisse, sinyal barının
+# kapanışında giriş, `horizon` (7) bar sonraki kapanışta çıkış.
+# backtest_single_day'den farklıdır: orada giriş test gününden önceki
+# kapanış, çıkış test gününden sonraki 7. bardır (test günü işlem
+# günüyse 8 bar). "Varsayılan" satırı aynı panel kuralıyla varsayılan
+# parametrelerdir; run_backtest sonuçlarıyla doğrudan karşılaştırılamaz.
+# Eğitim penceresinin son `horizon` günü atılır (embargo); böylece
+# eğitim etiketleri test penceresinin fiyatlarını görmez.
+#
+# Kullanım:
+#   python backtest.py --walk-forward --start 2020-01-01 --end 2025-01-01
+# ============================================================
+
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import config
+from signals import SignalPanel, DEFAULT_PARAMS, TECHNICAL_PARAM_KEYS, technical_scores, final_scores
+
+# İşçi süreçlerde paylaşılan durum (_init_worker ile bir kez kurulur)
+_worker = {}
+
+
+def outcome_of(return_pct: float) -> str:
+    """backtest_single_day ile aynı sınıflandırma."""
+    if return_pct >= 5:
+        return "SUCCESS"
+    if return_pct >= 0:
+        return "NEUTRAL"
+    return "LOSS"
+
+
+def trade_stats(returns) -> dict:
+    """İşlem getirilerinden (%) run_backtest ile aynı özet istatistikler."""
+    returns = np.asarray(returns, dtype="float64")
+    total = int(returns.size)
+    if total == 0:
+        return {"total": 0, "success": 0, "neutral": 0, "loss": 0,
+                "win_rate": 0.0, "avg_return": 0.0}
+    success = int((returns >= 5).sum())
+    loss = int((returns < 0).sum())
+    return {
+        "total": total,
+        "success": success,
+        "neutral": total - success - loss,
+        "loss": loss,
+        "win_rate": success / total * 100,
+        "avg_return": float(returns.mean()),
+    }
+
+
+def param_grid(grid: dict = None) -> list:
+    """
+    Izgaradaki tüm kombinasyonlar (varsayılanlarla birleştirilmiş).
+    Teknik skoru etkileyen anahtarlar dış döngüdedir: ardışık setler aynı
+    teknik skoru paylaşır, teknik matris sadece değiştiğinde hesaplanır.
+    """
+    grid = grid if grid is not None else config.WALK_FORWARD_GRID
+    unknown = set(grid) - set(DEFAULT_PARAMS)
+    if unknown:
+        raise ValueError(f"Bilinmeyen parametre(ler): {', '.join(sorted(unknown))}")
+
+    keys = sorted(grid, key=lambda k: (k not in TECHNICAL_PARAM_KEYS, list(DEFAULT_PARAMS).index(k)))
+    return [
+        {**DEFAULT_PARAMS, **dict(zip(keys, values))}
+        for values in itertools.product(*(grid[k] for k in keys))
+    ]
+
+
+def pick_top(final: np.ndarray, eligible: np.ndarray, top_n: int) -> tuple:
+    """
+    Her satırda (gün) uygun hücreler arasından en yüksek top_n skoru seçer.
+    Döndürür: (satır indeksleri, sütun indeksleri)
+    """
+    if final.size == 0:
+        return np.empty(0, dtype=int), np.empty(0, dtype=int)
+    masked = np.where(eligible, final, -np.inf)
+    k = min(top_n, masked.shape[1])
+    idx = np.argpartition(-masked, k - 1, axis=1)[:, :k]
+    picked = np.take_along_axis(masked, idx, axis=1)
+    ok = np.isfinite(picked)
+    return np.nonzero(ok)[0], idx[ok]
+
+
+def picks(panel: SignalPanel, params: dict, tech: np.ndarray = None,
+          top_n: int = 3, block_cache: dict = None) -> tuple:
+    """
+    Parametre setine göre her günün seçimlerini ve getirilerini döndürür.
+    Vadesi dolmamış (getirisi bilinmeyen) seçimler backtest'teki gibi atılır.
+    Döndürür: (satırlar, sütunlar, getiriler, nihai skorlar)
+    """
+    if tech is None:
+        tech = technical_scores(panel.ind, params, block_cache)
+    final = final_scores(tech, panel.sector_norm, params)
+    eligible = (tech > 0) & (final >= params["buy_threshold"])
+    rows, cols = pick_top(final, eligible, top_n)
+    returns = panel.fwd[rows, cols]
+    known = np.isfinite(returns)
+    return rows[known], cols[known], returns[known], final[rows[known], cols[known]]
+
+
+def objective(stats: dict, min_trades: int) -> float:
+    """Eğitimde maksimize edilen değer: ortalama getiri (yeterli işlem varsa)."""
+    if stats["total"] < min_trades:
+        return -np.inf
+    return stats["avg_return"]
+
+
+def fit(panel: SignalPanel, grid: list, top_n: int = 3, min_trades: int = None) -> tuple:
+    """
+    Izgaradaki en iyi parametre setini bulur.
+    Döndürür: (parametreler, eğitim istatistikleri)
+    """
+    min_trades = config.WALK_FORWARD_MIN_TRADES if min_trades is None else min_trades
+    block_cache = {}
+    best = (-np.inf, DEFAULT_PARAMS, None)
+    last_key, tech = None, None
+
+    for params in grid:
+        key = tuple(params[k] for k in TECHNICAL_PARAM_KEYS)
+        if key != last_key:
+            tech = technical_scores(panel.ind, params, block_cache)
+            last_key = key
+        _, _, returns, _ = picks(panel, params, tech, top_n)
+        stats = trade_stats(returns)
+        value = objective(stats, min_trades)
+        if value > best[0]:
+            best = (value, params, stats)
+
+    if best[2] is None:
+        # Hiçbir set yeterli işlem üretmedi → varsayılanlar
+        _, _, returns, _ = picks(panel, DEFAULT_PARAMS, top_n=top_n)
+        return DEFAULT_PARAMS, trade_stats(returns)
+    return best[1], best[2]
+
+
+def make_windows(rows: slice, train: int, test: int, embargo: int) -> list:
+    """
+    Kayan pencereler: [(eğitim satırları, test satırları), ...]
+    Adım = test boyu; son test penceresi kısa kalabilir.
+    """
+    windows = []
+    start = rows.start
+    while start + train < rows.stop:
+        train_rows = slice(start, start + train - embargo)
+        test_rows = slice(start + train, min(start + train + test, rows.stop))
+        windows.append((train_rows, test_rows))
+        start += test
+    return windows
+
+
+def _trades(panel: SignalPanel, rows, cols, returns, scores) -> list:
+    trades = []
+    for i, j, ret, score in zip(rows, cols, returns, scores):
+        entry = float(panel.ind["close"][i, j])
+        trades.append({
+            "date": str(panel.dates[i]),
+            "ticker": panel.tickers[j],
+            "entry": entry,
+            "exit": entry * (1 + ret / 100),
+            "return": float(ret),
+            "outcome": outcome_of(ret),
+            "score": round(float(score), 1),
+        })
+    return trades
+
+
+def run_window(panel: SignalPanel, grid: list, train_rows: slice, test_rows: slice,
+               top_n: int = 3, min_trades: int = None) -> dict:
+    """Tek pencere: eğitimde uydur, testte örneklem dışı değerlendir."""
+    params, train_stats = fit(panel.window(train_rows), grid, top_n, min_trades)
+
+    test = panel.window(test_rows)
+    test_trades = _trades(test, *picks(test, params, top_n=top_n))
+    baseline_trades = _trades(test, *picks(test, DEFAULT_PARAMS, top_n=top_n))
+
+    return {
+        "train": [str(panel.dates[train_rows.start]), str(panel.dates[train_rows.stop - 1])],
+        "test": [str(panel.dates[test_rows.start]), str(panel.dates[test_rows.stop - 1])],
+        "params": {k: v for k, v in params.items() if v != DEFAULT_PARAMS[k]},
+        "train_stats": train_stats,
+        "test_stats": trade_stats([t["return"] for t in test_trades]),
+        "baseline_stats": trade_stats([t["return"] for t in baseline_trades]),
+        "test_trades": test_trades,
+        "baseline_trades": baseline_trades,
+    }
+
+
+def _init_worker(panel: SignalPanel, grid: list, top_n: int, min_trades: int):
+    _worker.update(panel=panel, grid=grid, top_n=top_n, min_trades=min_trades)
+
+
+def _run_window_worker(window: tuple) -> dict:
+    return run_window(_worker["panel"], _worker["grid"], *window,
+                      top_n=_worker["top_n"], min_trades=_worker["min_trades"])
+
+
+def walk_forward(panel: SignalPanel, start: str = None, end: str = None,
+                 train_days: int = None, test_days: int = None, grid: dict = None,
+                 workers: int = None, top_n: int = 3, min_trades: int = None) -> dict:
+    """
+    Hazır bir panel üzerinde walk-forward çalıştırır.
+    Döndürür: {"windows": [...], "oos": örneklem dışı toplam istatistikler,
+               "baseline": aynı pencerelerde varsayılan parametreler, ...}
+    """
+    train_days = train_days or config.WALK_FORWARD_TRAIN_DAYS
+    test_days = test_days or config.WALK_FORWARD_TEST_DAYS
+    combos = param_grid(grid)
+    windows = make_windows(panel.rows(start, end), train_days, test_days, panel.horizon)
+    if not windows:
+        raise ValueError(f"Aralık en az bir pencere için yetersiz "
+                         f"(eğitim {train_days} + test 1 işlem günü gerekli)")
+
+    workers = workers or config.WALK_FORWARD_WORKERS or os.cpu_count() or 1
+    workers = min(workers, len(windows))
+    print(f"  🪟 {len(windows)} pencere × {len(combos)} parametre seti "
+          f"({workers} işçi)")
+
+    if workers <= 1:
+        results = [run_window(panel, combos, *w, top_n=top_n, min_trades=min_trades)
+                   for w in windows]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(panel, combos, top_n, min_trades)) as pool:
+            results = list(pool.map(_run_window_worker, windows))
+
+    oos_trades = [t for r in results for t in r["test_trades"]]
+    baseline_trades = [t for r in results for t in r["baseline_trades"]]
+    return {
+        "train_days": train_days,
+        "test_days": test_days,
+        "grid_size": len(combos),
+        "windows": results,
+        "oos": trade_stats([t["return"] for t in oos_trades]),
+        "baseline": trade_stats([t["return"] for t in baseline_trades]),
+        "oos_trades": oos_trades,
+        "latest_params": results[-1]["params"],
+    }
+
+
+def print_walk_forward(result: dict):
+    print("\n" + "=" * 70)
+    print("  🧭 WALK-FORWARD SONUÇLARI (örneklem dışı)")
+    print("=" * 70)
+    print(f"\n     {'Test Penceresi':<25} {'İşlem':>6} {'Başarı %':>9} {'Ort.':>8}"
+          f" {'Varsayılan':>11}  Değişen Parametreler")
+    print("     " + "-" * 90)
+    for w in result["windows"]:
+        test, base = w["test_stats"], w["baseline_stats"]
+        changed = ", ".join(f"{k}={v}" for k, v in w["params"].items()) or "-"
+        print(f"     {w['test'][0]} → {w['test'][1]:<10} {test['total']:>6} "
+              f"{test['win_rate']:>8.1f}% {test['avg_return']:>+7.2f}% "
+              f"{base['avg_return']:>+10.2f}%  {changed}")
+
+    oos, base = result["oos"], result["baseline"]
+    print(f"\n  🎯 Örneklem dışı : {oos['total']} işlem, başarı {oos['win_rate']:.2f}%, "
+          f"ort. getiri {oos['avg_return']:+.2f}%")
+    print(f"  ⚖️  Varsayılan    : {base['total']} işlem, başarı {base['win_rate']:.2f}%, "
+          f"ort. getiri {base['avg_return']:+.2f}%")
+    print(f"\n  🔧 Son pencerenin parametreleri: "
+          f"{json.dumps(result['latest_params'], ensure_ascii=False)}")
+    print("=" * 70)
+
+
+def run_walk_forward(start_date: str, end_date: str, tickers: list = None,
+                     news_archive=None, train_days: int = None, test_days: int = None,
+                     workers: int = None, output: str = None, bootstrap: int = None) -> dict:
+    """
+    backtest.py --walk-forward giriş noktası: paneli kurar, pencereleri
+    çalıştırır, sonucu yazdırır (output verilirse JSON olarak kaydeder).
+    bootstrap: örneklem dışı işlemlerin güven aralığı örneklem sayısı (0 → kapalı).
+    İlk eğitim penceresi start_date'te başlar (öncesindeki barlar sadece
+    göstergelerin ısınması için kullanılır); ilk test penceresi
+    start_date'ten train_days işlem günü sonra başlar.
+    """
+    tickers = tickers or config.ALL_STOCKS
+    if news_archive is not None and not news_archive.available():
+        print(f"  ⚠️  Haber arşivi bulunamadı ({news_archive.root}), nötr haber skoru kullanılacak")
+        news_archive = None
+
+    print("\n" + "=" * 70)
+    print("  🧭 WALK-FORWARD OPTİMİZASYONU")
+    print(f"  📅 Tarih Aralığı: {start_date} → {end_date}")
+    print(f"  📊 Hisse Sayısı: {len(tickers)}")
+    print("=" * 70)
+
+    print(f"\n  💾 Fiyatlar yükleniyor ve göstergeler hesaplanıyor...")
+    panel = SignalPanel.build(tickers, start_date, end_date, news_archive=news_archive)
+    print(f"  ✅ Panel: {panel.shape[0]} gün × {panel.shape[1]} hisse")
+
+    result = walk_forward(panel, start_date, end_date, train_days, test_days,
+                          workers=workers)
+    print_walk_forward(result)
+
+    if bootstrap != 0:
+        from bootstrap import bootstrap_trades, print_confidence
+        result["confidence"] = bootstrap_trades(result["oos_trades"], n_resamples=bootstrap)
+        print_confidence(result["confidence"])
+
+    if output:
+        os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\n  💾 Sonuç kaydedildi: {output}")
+    return result